@@ -3,58 +3,565 @@ SQL main logic code, including add/modify/delete database operations
 """
 import sqlite3
 import os
-from Utils.global_var import ensure_writable_db
+import threading
+from datetime import date, datetime
+from Utils.global_var import ensure_writable_db, DEFAULT_PROFILE
+
+
+# SQL expression equal to date.toordinal() (julianday of 0001-01-01 is 1721425.5)
+_SQL_ORDINAL = "CAST(julianday({col}) - 1721424.5 AS INTEGER)"
+
+
+# Item history (item_events.kind):
+# - added: new item
+# - consumed: purged from the trash, thrown away before its expiry date
+# - discarded: purged from the trash after its expiry date (wasted)
+# - expired: passed its expiry date while still in the inventory
+EVENT_KINDS = ("added", "consumed", "discarded", "expired")
+
+# SQL date of an event, local time
+_SQL_TODAY = "date('now', 'localtime')"
+
+
+# Active inventory profile (each profile is its own .db file)
+ACTIVE_PROFILE = DEFAULT_PROFILE
 
 
 def _db_path():
     """
-    Get writable database path (persisted in %APPDATA%)
+    Get writable database path of the active profile (persisted in %APPDATA%)
     """
-    return ensure_writable_db()
-DB_PATH = _db_path()
+    return DB_PATH
+DB_PATH = ensure_writable_db(ACTIVE_PROFILE)
+
+
+# Connection bound to the current thread (set by the DB worker while it runs a job)
+_local = threading.local()
 
 
-def setup_database():
+class _SharedConnection:
+    """
+    Thread-bound connection handed to a helper:
+    close() keeps it open, everything else is the real connection
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def open_connection(path=None):
+    """
+    Open a connection to a profile database (default: active profile)
+    """
+    return sqlite3.connect(path or DB_PATH, timeout=10)
+
+
+def bind_thread_connection(conn):
+    """
+    Make every helper called on this thread reuse conn (None to unbind)
+    """
+    _local.conn = conn
+
+
+def thread_connection():
+    """
+    Connection bound to this thread by bind_thread_connection (None if unbound)
+    """
+    return getattr(_local, "conn", None)
+
+
+def _connect():
+    """
+    Connection for one helper call:
+    - On the DB worker thread: the worker's own long-lived connection
+    - Elsewhere: a fresh connection to the active profile
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return _SharedConnection(conn)
+    return open_connection()
+
+
+def set_active_profile(profile):
+    """
+    Switch every SQL function in the app to another profile database
+    (created / migrated on first use)
+    """
+    global ACTIVE_PROFILE, DB_PATH
+    ACTIVE_PROFILE = profile
+    DB_PATH = ensure_writable_db(profile)
+    setup_database()
+
+
+def setup_database(db_path=None):
     """
     Initialize database (only items table required)
+    Older databases are migrated in place (missing columns / indexes added)
+    :param db_path: database to set up (default: active profile)
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path or DB_PATH)
     cur = conn.cursor()
 
+    # WAL: readers (DB worker, backup) never block on the writer and vice versa
+    cur.execute("PRAGMA journal_mode=WAL")
+
     cur.execute("""
         CREATE TABLE IF NOT EXISTS items (
             item_id INTEGER PRIMARY KEY AUTOINCREMENT,
             item_name TEXT,
             expired_day TEXT,
-            bar_name TEXT DEFAULT NULL
+            bar_name TEXT DEFAULT NULL,
+            deleted_at TEXT DEFAULT NULL,
+            expiry_ord INTEGER DEFAULT NULL,
+            quantity INTEGER NOT NULL DEFAULT 1
         )
     """)
 
+    _add_missing_column(cur, "items", "deleted_at", "TEXT DEFAULT NULL")
+    _add_missing_column(cur, "items", "expiry_ord", "INTEGER DEFAULT NULL")
+    _add_missing_column(cur, "items", "quantity", "INTEGER NOT NULL DEFAULT 1")
+
+    _setup_expiry_index(cur)
+
+    # Trash (soft-deleted rows) is read newest first straight from this index.
+    # Partial, so live-row queries (deleted_at IS NULL) never pick it over the expiry indexes.
+    cur.execute("DROP INDEX IF EXISTS idx_items_deleted_at")
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_trash
+        ON items(deleted_at, item_id) WHERE deleted_at IS NOT NULL
+    """)
+
+    _setup_search_index(cur)
+    _setup_event_log(cur)
+
     conn.commit()
     conn.close()
 
 
+def _setup_expiry_index(cur):
+    """
+    Normalized expiry column for range queries:
+    - expiry_ord = date.toordinal() of expired_day (NULL if the date is invalid)
+    - Filled by insert code; triggers cover any other writer
+    - Partial indexes only hold live (not trashed) rows
+    """
+    cur.execute(f"""
+        UPDATE items
+        SET expiry_ord = {_SQL_ORDINAL.format(col="expired_day")}
+        WHERE expiry_ord IS NULL AND expired_day IS NOT NULL
+    """)
+
+    cur.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS items_expiry_ai AFTER INSERT ON items
+        WHEN new.expiry_ord IS NULL BEGIN
+            UPDATE items SET expiry_ord = {_SQL_ORDINAL.format(col="new.expired_day")}
+            WHERE item_id = new.item_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS items_expiry_au AFTER UPDATE OF expired_day ON items BEGIN
+            UPDATE items SET expiry_ord = {_SQL_ORDINAL.format(col="new.expired_day")}
+            WHERE item_id = new.item_id;
+        END;
+
+        CREATE INDEX IF NOT EXISTS idx_items_live_expiry
+        ON items(expiry_ord) WHERE deleted_at IS NULL;
+
+        CREATE INDEX IF NOT EXISTS idx_items_live_bar_expiry
+        ON items(bar_name, expiry_ord) WHERE deleted_at IS NULL;
+
+        CREATE INDEX IF NOT EXISTS idx_items_live_entry
+        ON items(item_name, expired_day, bar_name) WHERE deleted_at IS NULL;
+    """)
+
+
+def day_ordinal(expired_day):
+    """
+    'YYYY-MM-DD' → date ordinal (same value as the expiry_ord column)
+    :return: int, or None if the text is not a valid date
+    """
+    try:
+        return datetime.strptime(expired_day, "%Y-%m-%d").date().toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def _setup_search_index(cur):
+    """
+    Full-text index over item / bar names (search box)
+    - FTS5 external-content table kept in sync by triggers
+    - If this SQLite build has no FTS5, fall back to a NOCASE name index (prefix LIKE)
+    """
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_name_nocase
+        ON items(item_name COLLATE NOCASE)
+    """)
+
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'")
+    if cur.fetchone():
+        return
+
+    try:
+        cur.execute("""
+            CREATE VIRTUAL TABLE items_fts USING fts5(
+                item_name, bar_name,
+                content = 'items', content_rowid = 'item_id',
+                prefix = '1 2 3'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return  # No FTS5 in this build
+
+    cur.executescript("""
+        CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts(rowid, item_name, bar_name)
+            VALUES (new.item_id, new.item_name, new.bar_name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, item_name, bar_name)
+            VALUES ('delete', old.item_id, old.item_name, old.bar_name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF item_name, bar_name ON items BEGIN
+            INSERT INTO items_fts(items_fts, rowid, item_name, bar_name)
+            VALUES ('delete', old.item_id, old.item_name, old.bar_name);
+            INSERT INTO items_fts(rowid, item_name, bar_name)
+            VALUES (new.item_id, new.item_name, new.bar_name);
+        END;
+    """)
+
+    # Index rows that existed before the FTS table
+    cur.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+
+
+def _setup_event_log(cur):
+    """
+    Append-only item history for waste analytics:
+    - item_events: one row per event (EVENT_KINDS) of quantity units, never updated or deleted
+    - item_events_daily / item_events_monthly: units per (period, timeline, kind),
+      kept current by a trigger on every event insert, so reports never scan the log
+    - waste_by_bar_month: report view over the monthly rollup
+    Timeline '' = left area (rollup keys cannot be NULL)
+    """
+    cur.executescript("""
+        CREATE TABLE IF NOT EXISTS item_events (
+            event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER,
+            item_name TEXT,
+            bar_name TEXT,
+            kind TEXT NOT NULL,
+            event_day TEXT NOT NULL,
+            expired_day TEXT,
+            quantity INTEGER NOT NULL DEFAULT 1
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_item_events_kind_item
+        ON item_events(kind, item_id);
+
+        CREATE TABLE IF NOT EXISTS item_events_daily (
+            day TEXT NOT NULL,
+            bar_name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, bar_name, kind)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS item_events_monthly (
+            month TEXT NOT NULL,
+            bar_name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, bar_name, kind)
+        ) WITHOUT ROWID;
+
+        CREATE VIEW IF NOT EXISTS waste_by_bar_month AS
+        SELECT month, bar_name,
+               SUM(CASE WHEN kind = 'added' THEN count ELSE 0 END) AS added,
+               SUM(CASE WHEN kind = 'consumed' THEN count ELSE 0 END) AS consumed,
+               SUM(CASE WHEN kind = 'discarded' THEN count ELSE 0 END) AS discarded,
+               SUM(CASE WHEN kind = 'expired' THEN count ELSE 0 END) AS expired
+        FROM item_events_monthly
+        GROUP BY month, bar_name;
+    """)
+
+    # Older logs: one unit per event (the rollup trigger is replaced by the unit-summing one)
+    _add_missing_column(cur, "item_events", "quantity", "INTEGER NOT NULL DEFAULT 1")
+    cur.executescript("""
+        DROP TRIGGER IF EXISTS item_events_rollup;
+
+        CREATE TRIGGER IF NOT EXISTS item_events_rollup_units AFTER INSERT ON item_events BEGIN
+            INSERT INTO item_events_daily(day, bar_name, kind, count)
+            VALUES (new.event_day, COALESCE(new.bar_name, ''), new.kind, new.quantity)
+            ON CONFLICT(day, bar_name, kind) DO UPDATE SET count = count + new.quantity;
+
+            INSERT INTO item_events_monthly(month, bar_name, kind, count)
+            VALUES (substr(new.event_day, 1, 7), COALESCE(new.bar_name, ''), new.kind, new.quantity)
+            ON CONFLICT(month, bar_name, kind) DO UPDATE SET count = count + new.quantity;
+        END;
+    """)
+
+
+def _add_missing_column(cur, table, column, decl):
+    """
+    Add a column to an existing table if an older database lacks it
+    """
+    cur.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in cur.fetchall()]:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
 def insert_products(item_name, expired_day):
     """
-    Insert new item into SQL
+    Insert new item into SQL (and its "added" event)
+    :return: item_id of the new row
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("""
+        INSERT INTO items(item_name, expired_day, bar_name, expiry_ord)
+        VALUES (?, ?, NULL, ?)
+    """, (item_name, expired_day, day_ordinal(expired_day)))
+    item_id = cur.lastrowid
+
+    cur.execute(f"""
+        INSERT INTO item_events(item_id, item_name, bar_name, kind, event_day, expired_day)
+        VALUES (?, ?, NULL, 'added', {_SQL_TODAY}, ?)
+    """, (item_id, item_name, expired_day))
+
+    conn.commit()
+    conn.close()
+
+    return item_id
+
+
+def insert_products_many(rows):
+    """
+    Add many items in one transaction (and their "added" events).
+    Identical (item_name, expired_day, bar_name) rows are one entry: their units
+    go onto the live entry already holding them, or onto one new row
+    :param rows: (item_name, expired_day, bar_name[, quantity]) tuples
+    :return: item_id each input row landed in, in input order
+    """
+    units = {}   # entry key → units, in first-seen order
+    keys = []
+    for row in rows:
+        key = (row[0], row[1], row[2] or None)
+        keys.append(key)
+        units[key] = units.get(key, 0) + (row[3] if len(row) > 3 else 1)
+    if not keys:
+        return []
+
+    conn = _connect()
+    cur = conn.cursor()
+
+    # Entries already in stock (idx_items_live_entry)
+    ids = {}
+    for key in units:
+        found = cur.execute(_FIND_ENTRY, key).fetchone()
+        if found is not None:
+            ids[key] = found[0]
+    cur.executemany("UPDATE items SET quantity = quantity + ? WHERE item_id = ?",
+                    [(units[key], item_id) for key, item_id in ids.items()])
+
+    new = [key for key in units if key not in ids]
+    if new:
+        cur.executemany("""
+            INSERT INTO items(item_name, expired_day, bar_name, expiry_ord, quantity)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(name, day, bar, day_ordinal(day), units[(name, day, bar)]) for name, day, bar in new])
+
+        # AUTOINCREMENT ids of one transaction are consecutive
+        last = cur.execute("SELECT last_insert_rowid()").fetchone()[0]
+        ids.update(zip(new, range(last - len(new) + 1, last + 1)))
+
+    cur.executemany(f"""
+        INSERT INTO item_events(item_id, item_name, bar_name, kind, event_day, expired_day, quantity)
+        VALUES (?, ?, ?, 'added', {_SQL_TODAY}, ?, ?)
+    """, [(ids[key], key[0], key[2], key[1], n) for key, n in units.items()])
+
+    conn.commit()
+    conn.close()
+
+    return [ids[key] for key in keys]
+
+
+# Live entry holding (item_name, expired_day, bar_name)
+_FIND_ENTRY = """
+    SELECT item_id, quantity
+    FROM items
+    WHERE deleted_at IS NULL AND item_name = ? AND expired_day = ? AND bar_name IS ?
+    ORDER BY item_id
+    LIMIT 1
+"""
+
+
+def stock_item(item_name, expired_day, quantity=1, bar_name=None):
+    """
+    Add units of an item: onto the live entry with the same name, expiry date and
+    timeline if there is one (one ball with a count), else as a new entry
+    :return: (item_id, quantity of the entry now, True if the entry is new)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    found = cur.execute(_FIND_ENTRY, (item_name, expired_day, bar_name)).fetchone()
+    if found is not None:
+        item_id, total = found[0], found[1] + quantity
+        cur.execute("UPDATE items SET quantity = ? WHERE item_id = ?", (total, item_id))
+    else:
+        cur.execute("""
+            INSERT INTO items(item_name, expired_day, bar_name, expiry_ord, quantity)
+            VALUES (?, ?, ?, ?, ?)
+        """, (item_name, expired_day, bar_name, day_ordinal(expired_day), quantity))
+        item_id, total = cur.lastrowid, quantity
+
+    cur.execute(f"""
+        INSERT INTO item_events(item_id, item_name, bar_name, kind, event_day, expired_day, quantity)
+        VALUES (?, ?, ?, 'added', {_SQL_TODAY}, ?, ?)
+    """, (item_id, item_name, bar_name, expired_day, quantity))
+
+    conn.commit()
+    conn.close()
+
+    return item_id, total, found is None
+
+
+def adjust_quantity(item_id, delta):
+    """
+    Add (or with a negative delta, remove) units of a live entry
+    (undo / redo of units stocked onto an existing entry)
+    :return: quantity now, or None if the entry is gone
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("""
+        UPDATE items
+        SET quantity = MAX(1, quantity + ?)
+        WHERE item_id = ? AND deleted_at IS NULL
+    """, (delta, item_id))
+    row = cur.execute("SELECT quantity FROM items WHERE item_id = ?", (item_id,)).fetchone()
+
+    conn.commit()
+    conn.close()
+
+    return row[0] if row else None
+
+
+def take_units(item_id, units=1, trash_id=None):
+    """
+    Trash some units of a live entry: they become their own trashed row (restorable,
+    purged and logged like any trashed item); the entry keeps the rest
+    :param trash_id: item_id for the trashed row (redo reuses the first one)
+    :return: item_id of the trashed row, or None if the entry does not hold more than units
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cur = conn.cursor()
 
     cur.execute("""
-        INSERT INTO items(item_name, expired_day, bar_name)
-        VALUES (?, ?, NULL)
-    """, (item_name, expired_day))
+        UPDATE items
+        SET quantity = quantity - ?
+        WHERE item_id = ? AND deleted_at IS NULL AND quantity > ?
+    """, (units, item_id, units))
+    if cur.rowcount == 0:
+        conn.rollback()   # End the UPDATE's transaction (a shared connection stays open)
+        conn.close()
+        return None
+
+    cur.execute("""
+        INSERT INTO items(item_id, item_name, expired_day, bar_name, expiry_ord, quantity, deleted_at)
+        SELECT ?, item_name, expired_day, bar_name, expiry_ord, ?,
+               strftime('%Y-%m-%d %H:%M:%f', 'now')
+        FROM items
+        WHERE item_id = ?
+    """, (trash_id, units, item_id))
+    trash_id = cur.lastrowid
 
     conn.commit()
     conn.close()
 
+    return trash_id
+
+
+def return_units(item_id, trash_id):
+    """
+    Undo of take_units: the trashed row's units go back onto the entry
+    :return: quantity of the entry now; 0 if the entry is gone (the units stay in
+             the trash, restorable from there); None if the trashed row is gone
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    row = cur.execute(
+        "SELECT quantity FROM items WHERE item_id = ? AND deleted_at IS NOT NULL", (trash_id,)
+    ).fetchone()
+    if row is None:
+        conn.close()
+        return None
+
+    cur.execute("""
+        UPDATE items
+        SET quantity = quantity + ?
+        WHERE item_id = ? AND deleted_at IS NULL
+    """, (row[0], item_id))
+    if cur.rowcount == 0:
+        conn.rollback()
+        conn.close()
+        return 0
+
+    cur.execute("DELETE FROM items WHERE item_id = ?", (trash_id,))
+    total = cur.execute("SELECT quantity FROM items WHERE item_id = ?", (item_id,)).fetchone()
+
+    conn.commit()
+    conn.close()
+
+    return total[0]
+
+
+def split_units(item_id, units, new_id, bar_name):
+    """
+    Undo of a fold (see _land_rows): units of a live entry go back to their own
+    row new_id on bar_name (the folded row's item_id); the entry keeps the rest
+    :return: new_id, or None if the entry does not hold more than units
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("""
+        UPDATE items
+        SET quantity = quantity - ?
+        WHERE item_id = ? AND deleted_at IS NULL AND quantity > ?
+    """, (units, item_id, units))
+    if cur.rowcount == 0:
+        conn.rollback()
+        conn.close()
+        return None
+
+    cur.execute("""
+        INSERT INTO items(item_id, item_name, expired_day, bar_name, expiry_ord, quantity)
+        SELECT ?, item_name, expired_day, ?, expiry_ord, ?
+        FROM items
+        WHERE item_id = ?
+    """, (new_id, bar_name, units, item_id))
+
+    conn.commit()
+    conn.close()
+
+    return new_id
+
 
 def update_item_bar_name(item_name, bar_name):
     """
     Update item's bar_name (when attached or moved back to left side)
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cur = conn.cursor()
 
     cur.execute("""
@@ -67,11 +574,158 @@ def update_item_bar_name(item_name, bar_name):
     conn.close()
 
 
+def update_item_bar(item_id, bar_name):
+    """
+    Move a single live item to a timeline by item_id (bar_name None = left area);
+    it folds into an identical entry there (see _land_rows)
+    :return: moved row as dict (see _land_rows), or None if the item is not live
+    """
+    moved = update_items_bar([item_id], bar_name)
+    return moved[0] if moved else None
+
+
+# Ids per "item_id IN (...)" statement (SQLite allows 999 parameters in older builds)
+_ID_CHUNK = 500
+
+
+def _id_chunks(item_ids):
+    item_ids = list(item_ids)
+    for i in range(0, len(item_ids), _ID_CHUNK):
+        yield item_ids[i:i + _ID_CHUNK]
+
+
+def update_items_bar(item_ids, bar_name):
+    """
+    Move many live items to one timeline (bar_name None = left area) in one
+    transaction; items identical to an entry there fold into it (see _land_rows)
+    :return: moved rows as dicts (see _land_rows)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    _open_landing(cur)
+    for chunk in _id_chunks(item_ids):
+        cur.execute(f"""
+            INSERT OR IGNORE INTO landing(item_id, item_name, expired_day, bar_name, quantity)
+            SELECT item_id, item_name, expired_day, ?, quantity
+            FROM items
+            WHERE deleted_at IS NULL AND item_id IN ({",".join("?" * len(chunk))})
+        """, (bar_name, *chunk))
+    moved = _land_rows(cur)
+
+    conn.commit()
+    conn.close()
+
+    return moved
+
+
+def rename_bar_items(old_name, new_name):
+    """
+    Move every row of a timeline to another name (rename, or merge when new_name
+    already exists: live items identical to an entry there fold into it, see
+    _land_rows); trashed rows follow in one UPDATE, so a restore lands there too
+    :return: moved live rows as dicts (see _land_rows)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    _open_landing(cur)
+    cur.execute("""
+        INSERT INTO landing(item_id, item_name, expired_day, bar_name, quantity)
+        SELECT item_id, item_name, expired_day, ?, quantity
+        FROM items
+        WHERE bar_name = ? AND deleted_at IS NULL
+        ORDER BY item_id
+    """, (new_name, old_name))
+    moved = _land_rows(cur)
+
+    cur.execute("""
+        UPDATE items
+        SET bar_name = ?
+        WHERE bar_name = ? AND deleted_at IS NOT NULL
+    """, (new_name, old_name))
+
+    conn.commit()
+    conn.close()
+
+    return moved
+
+
+def move_bar_items(bar_name, new_name, first_day=None, last_day=None, name_filter=None):
+    """
+    Move the live rows of a timeline that match every given filter in one
+    transaction (split; no filter moves them all), folding items identical to an
+    entry on new_name into it (see _land_rows). Served by idx_items_live_bar_expiry
+    :param new_name: target timeline (None = left area)
+    :param first_day / last_day: expiry day ordinals, inclusive
+    :param name_filter: substring of item_name (case-sensitive)
+    :return: moved rows as dicts (see _land_rows)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    where = ["bar_name = ?", "deleted_at IS NULL"]
+    params = [new_name, bar_name]
+    if first_day is not None:
+        where.append("expiry_ord >= ?")
+        params.append(first_day)
+    if last_day is not None:
+        where.append("expiry_ord <= ?")
+        params.append(last_day)
+    if name_filter:
+        where.append("instr(item_name, ?) > 0")
+        params.append(name_filter)
+
+    _open_landing(cur)
+    cur.execute(f"""
+        INSERT INTO landing(item_id, item_name, expired_day, bar_name, quantity)
+        SELECT item_id, item_name, expired_day, ?, quantity
+        FROM items
+        WHERE {" AND ".join(where)}
+        ORDER BY item_id
+    """, params)
+    moved = _land_rows(cur)
+
+    conn.commit()
+    conn.close()
+
+    return moved
+
+
+def insert_item_with_id(item_id, item_name, expired_day, bar_name=None, quantity=1):
+    """
+    Re-insert an item under its original item_id (redo of an add)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("""
+        INSERT INTO items(item_id, item_name, expired_day, bar_name, expiry_ord, quantity)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (item_id, item_name, expired_day, bar_name, day_ordinal(expired_day), quantity))
+
+    conn.commit()
+    conn.close()
+
+
+def delete_item_by_id(item_id):
+    """
+    Permanently delete a single item by item_id (undo of an add)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("DELETE FROM items WHERE item_id = ?", (item_id,))
+
+    conn.commit()
+    conn.close()
+
+
 def delete_item(item_name):
     """
     Delete a single item (used when dumping into trash bin)
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cur = conn.cursor()
 
     cur.execute("DELETE FROM items WHERE item_name = ?", (item_name,))
@@ -82,14 +736,15 @@ def delete_item(item_name):
 
 def load_all_items():
     """
-    Load all items
+    Load all items (trashed items excluded)
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cur = conn.cursor()
 
     cur.execute("""
-        SELECT item_id, item_name, expired_day, bar_name
+        SELECT item_id, item_name, expired_day, bar_name, quantity
         FROM items
+        WHERE deleted_at IS NULL
     """)
 
     rows = cur.fetchall()
@@ -100,17 +755,283 @@ def load_all_items():
             "item_id": r[0],
             "item_name": r[1],
             "expired_day": r[2],
-            "bar_name": r[3]
+            "bar_name": r[3],
+            "quantity": r[4]
         }
         for r in rows
     ]
 
 
+def trash_item(item_id):
+    """
+    Soft delete: mark item as trashed (dragged into trash bin)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("""
+        UPDATE items
+        SET deleted_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+        WHERE item_id = ?
+    """, (item_id,))
+
+    conn.commit()
+    conn.close()
+
+
+def trash_items(item_ids):
+    """
+    Soft delete many items at once (selection dragged into trash bin), one transaction
+    :return: number of trashed rows (rows already in the trash are left as they are)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    count = 0
+    for chunk in _id_chunks(item_ids):
+        cur.execute(f"""
+            UPDATE items
+            SET deleted_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+            WHERE deleted_at IS NULL AND item_id IN ({",".join("?" * len(chunk))})
+        """, chunk)
+        count += cur.rowcount
+
+    conn.commit()
+    conn.close()
+
+    return count
+
+
+def _open_landing(cur):
+    """
+    Empty temp table of rows about to land on a timeline (filled by the caller,
+    settled by _land_rows); seq keeps the caller's order
+    """
+    cur.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS landing (
+            seq INTEGER PRIMARY KEY,
+            item_id INTEGER UNIQUE,
+            item_name TEXT,
+            expired_day TEXT,
+            bar_name TEXT,
+            quantity INTEGER,
+            into_id INTEGER
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS temp.idx_landing_entry ON landing(item_name, expired_day, bar_name)")
+    cur.execute("CREATE INDEX IF NOT EXISTS temp.idx_landing_into ON landing(into_id)")
+    cur.execute("DELETE FROM landing")
+
+
+def _land_rows(cur):
+    """
+    Put the rows listed in landing live onto their timelines (bar_name None = left area)
+    in three statements, whatever the row count. Identical (item_name, expired_day,
+    bar_name) rows are one entry: a row adds its units to the live entry already
+    holding them (idx_items_live_entry), else to the lowest landing row of its kind,
+    and is deleted
+    :return: landed rows as dicts (item_id, item_name, expired_day, bar_name,
+             quantity, into) in landing order; into: live entry that took the
+             units, None if the row itself landed
+    """
+    cur.execute("""
+        UPDATE landing
+        SET into_id = COALESCE(
+            (SELECT MIN(e.item_id) FROM items e
+             WHERE e.deleted_at IS NULL AND e.item_name = landing.item_name
+               AND e.expired_day = landing.expired_day AND e.bar_name IS landing.bar_name
+               AND e.item_id NOT IN (SELECT item_id FROM landing)),
+            (SELECT MIN(l.item_id) FROM landing l
+             WHERE l.item_name = landing.item_name AND l.expired_day = landing.expired_day
+               AND l.bar_name IS landing.bar_name)
+        )
+    """)
+    cur.execute("UPDATE landing SET into_id = NULL WHERE into_id = item_id")
+
+    cur.execute("""
+        UPDATE items
+        SET quantity = quantity + (SELECT SUM(quantity) FROM landing WHERE into_id = items.item_id)
+        WHERE item_id IN (SELECT into_id FROM landing)
+    """)
+    cur.execute("DELETE FROM items WHERE item_id IN (SELECT item_id FROM landing WHERE into_id IS NOT NULL)")
+    cur.execute("""
+        UPDATE items
+        SET deleted_at = NULL,
+            bar_name = (SELECT bar_name FROM landing WHERE item_id = items.item_id)
+        WHERE item_id IN (SELECT item_id FROM landing WHERE into_id IS NULL)
+    """)
+
+    cur.execute("""
+        SELECT item_id, item_name, expired_day, bar_name, quantity, into_id
+        FROM landing
+        ORDER BY seq
+    """)
+    landed = [
+        {
+            "item_id": r[0],
+            "item_name": r[1],
+            "expired_day": r[2],
+            "bar_name": r[3],
+            "quantity": r[4],
+            "into": r[5]
+        }
+        for r in cur.fetchall()
+    ]
+    cur.execute("DELETE FROM landing")
+    return landed
+
+
+def restore_items(items):
+    """
+    Restore many trashed items, each to its own timeline (undo of a group trash)
+    :param items: (item_id, bar_name) pairs; rows not in the trash are skipped
+    :return: restored rows as dicts (see _land_rows)
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    _open_landing(cur)
+    cur.executemany("""
+        INSERT OR IGNORE INTO landing(item_id, item_name, expired_day, bar_name, quantity)
+        SELECT item_id, item_name, expired_day, ?, quantity
+        FROM items
+        WHERE item_id = ? AND deleted_at IS NOT NULL
+    """, [(bar_name, item_id) for item_id, bar_name in items])
+    restored = _land_rows(cur)
+
+    conn.commit()
+    conn.close()
+
+    return restored
+
+
+def restore_item(item_id, bar_name=None):
+    """
+    Restore a single trashed item (single-step undo of a trash)
+    :return: restored row as dict (see _land_rows), or None if the item is not in the trash
+    """
+    restored = restore_items([(item_id, bar_name)])
+    return restored[0] if restored else None
+
+
+def restore_trash():
+    """
+    Restore every trashed item to the left area, in one transaction
+    :return: restored rows as dicts (see _land_rows), oldest trashed first
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    _open_landing(cur)
+    cur.execute("""
+        INSERT INTO landing(item_id, item_name, expired_day, bar_name, quantity)
+        SELECT item_id, item_name, expired_day, NULL, quantity
+        FROM items
+        WHERE deleted_at IS NOT NULL
+        ORDER BY deleted_at, item_id
+    """)
+    restored = _land_rows(cur)
+
+    conn.commit()
+    conn.close()
+
+    return restored
+
+
+def empty_trash():
+    """
+    Permanently delete every trashed item in one DELETE
+    Each row is first logged as consumed / discarded (trashed before / after its
+    expiry date), on the day it was trashed and under the timeline it came from
+    :return: number of deleted rows
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    trashed_ord = _SQL_ORDINAL.format(col="deleted_at, 'localtime'")
+    cur.execute(f"""
+        INSERT INTO item_events(item_id, item_name, bar_name, kind, event_day, expired_day, quantity)
+        SELECT item_id, item_name, bar_name,
+               CASE WHEN expiry_ord < {trashed_ord} THEN 'discarded' ELSE 'consumed' END,
+               date(deleted_at, 'localtime'), expired_day, quantity
+        FROM items
+        WHERE deleted_at IS NOT NULL
+        ORDER BY deleted_at, item_id
+    """)
+    cur.execute("DELETE FROM items WHERE deleted_at IS NOT NULL")
+    count = cur.rowcount
+
+    conn.commit()
+    conn.close()
+
+    return count
+
+
+def log_expired_items():
+    """
+    Log an "expired" event for every live item past its expiry date that has none yet
+    (idle batch: startup / before a report; served by idx_items_live_expiry)
+    :return: number of new events
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    cur.execute("""
+        INSERT INTO item_events(item_id, item_name, bar_name, kind, event_day, expired_day, quantity)
+        SELECT item_id, item_name, bar_name, 'expired', date(expired_day, '+1 day'), expired_day, quantity
+        FROM items
+        WHERE deleted_at IS NULL AND expiry_ord < ?
+          AND NOT EXISTS (
+              SELECT 1 FROM item_events e
+              WHERE e.kind = 'expired' AND e.item_id = items.item_id
+          )
+        ORDER BY expiry_ord, item_id
+    """, (date.today().toordinal(),))
+    count = cur.rowcount
+
+    conn.commit()
+    conn.close()
+
+    return count
+
+
+def load_trash_page(limit=100, offset=0, before=None):
+    """
+    Read one page of trashed items, newest first (served by idx_items_trash)
+    :param before: keyset paging, only rows older than this (deleted_at, item_id)
+    :return: (rows, total) rows as [(item_id, item_name, expired_day, deleted_at, quantity), ...]
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    where = "deleted_at IS NOT NULL"
+    params = []
+    if before is not None:
+        where += " AND (deleted_at, item_id) < (?, ?)"
+        params += list(before)
+
+    cur.execute(f"""
+        SELECT item_id, item_name, expired_day, deleted_at, quantity
+        FROM items
+        WHERE {where}
+        ORDER BY deleted_at DESC, item_id DESC
+        LIMIT ? OFFSET ?
+    """, params + [limit, offset])
+    rows = cur.fetchall()
+
+    cur.execute("SELECT COUNT(*) FROM items WHERE deleted_at IS NOT NULL")
+    total = cur.fetchone()[0]
+
+    conn.close()
+
+    return rows, total
+
+
 def clear_all_items():
     """
     Clear entire table (Menu → Clear Database)
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cur = conn.cursor()
 
     cur.execute("DELETE FROM items")
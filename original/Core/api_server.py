@@ -0,0 +1,449 @@
+"""
+Local HTTP/JSON API over the active profile database (standard library only)
+- Reads: a pool of read-only connections (WAL: they never wait on the writer)
+- Writes: one DBWorker thread, so writes are serialized like in the app
+- Paged lists (opaque "next" cursor) and ETag / If-None-Match: an unchanged
+  database answers 304 from two stat() calls, without touching SQL
+- No authentication: binds to localhost unless another host is given
+  (python cli.py serve --host 0.0.0.0 to share it on the LAN)
+
+    GET    /items?bar=Fridge|left=1&within=7|expired=1&limit=100&cursor=...
+    GET    /items/<id>
+    POST   /items              {"item_name", "expired_day", "bar_name", "quantity"} or a list of them
+    PATCH  /items/<id>         {"bar_name": ...}
+    POST   /items/move         {"item_ids": [...], "bar_name": ...}
+    DELETE /items/<id>         move to the trash
+    GET    /bars
+    GET    /stats
+    GET    /trash?limit=100&cursor=...
+    POST   /trash/<id>/restore {"bar_name": ...} (optional)
+    DELETE /trash              empty the trash
+
+The app's canvas shows changes made here on its next reload / start
+"""
+import base64
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from Core import add_item_sql
+from Core.add_item_sql import (
+    day_ordinal, insert_products_many, update_item_bar, update_items_bar,
+    trash_items, restore_item, empty_trash, load_trash_page
+)
+from Core.sql_stats import ALL_BARS, bucket_counts, inventory_summary, items_expiring_between
+from Core.db_worker import DBWorker
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Read connections (concurrent GET requests served at once)
+READERS = 4
+
+# Page size when the client gives none, and the largest one allowed
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+
+# Largest accepted request body (bytes)
+MAX_BODY = 16 * 1024 * 1024
+
+# Seconds a request waits for a read connection / for its write
+WAIT_TIMEOUT = 30
+
+
+class ApiError(Exception):
+    """Answered as {"error": message} with the given HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReadPool:
+    """
+    Fixed set of read-only connections to one database, shared by handler threads
+    """
+
+    def __init__(self, path, size=READERS):
+        self._idle = queue.Queue()
+        self._conns = []
+        uri = "file:" + os.path.abspath(path).replace("\\", "/") + "?mode=ro"
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA query_only=1")
+            self._conns.append(conn)
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection; add_item_sql helpers called meanwhile on this thread use it
+        """
+        try:
+            conn = self._idle.get(timeout=WAIT_TIMEOUT)
+        except queue.Empty:
+            raise ApiError(503, "server busy")
+        add_item_sql.bind_thread_connection(conn)
+        try:
+            yield conn
+        finally:
+            add_item_sql.bind_thread_connection(None)
+            self._idle.put(conn)
+
+    def close(self):
+        for conn in self._conns:
+            conn.close()
+
+
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ApiError(400, "invalid cursor")
+    if not isinstance(values, list) or len(values) != 2:
+        raise ApiError(400, "invalid cursor")
+    return tuple(values)
+
+
+def _item_json(row):
+    item_id, name, expired_day, bar_name, remaining, quantity = row
+    return {
+        "item_id": item_id,
+        "item_name": name,
+        "expired_day": expired_day,
+        "bar_name": bar_name,
+        "quantity": quantity,
+        "remaining_days": remaining,
+    }
+
+
+def _new_item(obj):
+    """Request object → (item_name, expired_day, bar_name, quantity) row for insert_products_many"""
+    if not isinstance(obj, dict):
+        raise ApiError(400, "item must be an object")
+    name = obj.get("item_name")
+    expired_day = obj.get("expired_day")
+    bar_name = obj.get("bar_name")
+    if not isinstance(name, str) or not name:
+        raise ApiError(400, "item_name is required")
+    if not isinstance(expired_day, str) or day_ordinal(expired_day) is None:
+        raise ApiError(400, f"invalid expired_day {expired_day!r} (expected YYYY-MM-DD)")
+    if bar_name is not None and not isinstance(bar_name, str):
+        raise ApiError(400, "bar_name must be a string or null")
+    quantity = obj.get("quantity", 1)
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        raise ApiError(400, "quantity must be a whole number of at least 1")
+    return name, expired_day, bar_name or None, quantity
+
+
+def _bar_field(obj):
+    """Target timeline of a move / restore (null = left area)"""
+    if not isinstance(obj, dict) or "bar_name" not in obj \
+            or not isinstance(obj["bar_name"], (str, type(None))):
+        raise ApiError(400, "bar_name (string, or null for the left area) is required")
+    return obj["bar_name"] or None
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    HTTP server bound to one database file:
+    - readers: size of the read connection pool
+    - serve_forever() / shutdown() as any socketserver; close() also stops the
+      writer and closes the pool
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, readers=READERS):
+        self.db_path = add_item_sql._db_path()
+        add_item_sql.setup_database()   # WAL mode, tables and indexes
+
+        self.pool = ReadPool(self.db_path, readers)
+        self.writer = DBWorker()
+        self.writer.start()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        super().__init__((host, port), ApiHandler)
+
+    def write(self, fn, *args):
+        """Run a SQL helper on the single writer thread and wait for its result"""
+        result = self.writer.submit(fn, *args).result(timeout=WAIT_TIMEOUT)
+        with self._writes_lock:
+            self._writes += 1
+        return result
+
+    def version(self):
+        """
+        Changes whenever the database does, whoever writes it: every commit grows
+        or rewrites the -wal file, a checkpoint rewrites the main file
+        """
+        parts = [self._writes]
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+                parts += [st.st_mtime_ns, st.st_size]
+            except OSError:
+                parts += [0, 0]
+        return parts
+
+    def close(self):
+        self.server_close()
+        self.writer.stop()
+        self.writer.join(timeout=5)
+        self.pool.close()
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Routes requests to the handle_* methods below"""
+
+    server_version = "TrackerAPI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = [
+        ("GET", re.compile(r"/items"), "get_items"),
+        ("GET", re.compile(r"/items/(\d+)"), "get_item"),
+        ("POST", re.compile(r"/items"), "post_items"),
+        ("POST", re.compile(r"/items/move"), "move_items"),
+        ("PATCH", re.compile(r"/items/(\d+)"), "patch_item"),
+        ("DELETE", re.compile(r"/items/(\d+)"), "delete_item"),
+        ("GET", re.compile(r"/bars"), "get_bars"),
+        ("GET", re.compile(r"/stats"), "get_stats"),
+        ("GET", re.compile(r"/trash"), "get_trash"),
+        ("POST", re.compile(r"/trash/(\d+)/restore"), "restore_item"),
+        ("DELETE", re.compile(r"/trash"), "delete_trash"),
+    ]
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        pass   # Quiet: scripts poll this server
+
+    # ---- plumbing ----
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+
+        try:
+            allowed = []
+            for route_method, pattern, name in self.ROUTES:
+                match = pattern.fullmatch(path)
+                if match is None:
+                    continue
+                if route_method != method:
+                    allowed.append(route_method)
+                    continue
+                if method == "GET":
+                    self._get(getattr(self, "handle_" + name), *match.groups())
+                else:
+                    status, value = getattr(self, "handle_" + name)(*match.groups())
+                    self._send(status, value)
+                return
+            if allowed:
+                raise ApiError(405, f"use {', '.join(allowed)} on {path}")
+            raise ApiError(404, f"no such resource {path}")
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)})
+        except (sqlite3.Error, TimeoutError) as e:
+            self._send(503, {"error": str(e)})
+        except Exception as e:
+            # A bug, not bad input: answer anyway instead of dropping the connection
+            self._send(500, {"error": f"internal error: {e}"})
+
+    def _get(self, handler, *groups):
+        """Reads: ETag from the database version, 304 if the client's copy is current"""
+        etag = '"' + hashlib.sha1(json.dumps([self.server.version(), self.path]).encode()).hexdigest() + '"'
+        if etag in (t.strip() for t in self.headers.get("If-None-Match", "").split(",")):
+            self._send(304, None, etag)
+            return
+        with self.server.pool.connection():
+            value = handler(*groups)
+        self._send(200, value, etag)
+
+    def _send(self, status, value, etag=None):
+        body = b"" if value is None else json.dumps(value, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if value is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _body(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ApiError(400, "invalid Content-Length header")
+        if length > MAX_BODY:
+            raise ApiError(413, "request body too large")
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            raise ApiError(400, "body is not valid JSON")
+
+    def _int(self, name, default=None, low=None, high=None):
+        value = self.query.get(name)
+        if value is None:
+            return default
+        try:
+            value = int(value)
+        except ValueError:
+            raise ApiError(400, f"{name} must be an integer")
+        if low is not None and value < low:
+            raise ApiError(400, f"{name} must be at least {low}")
+        return value if high is None else min(value, high)
+
+    def _limit(self):
+        return self._int("limit", PAGE_SIZE, low=1, high=MAX_PAGE_SIZE)
+
+    # ---- reads (run with a pooled read connection bound) ----
+
+    def handle_get_items(self):
+        if "left" in self.query:
+            bar_name = None
+        else:
+            bar_name = self.query.get("bar", ALL_BARS)
+        end_day = -1 if "expired" in self.query else self._int("within")
+        limit = self._limit()
+        cursor = self.query.get("cursor")
+        after = _decode_cursor(cursor) if cursor else None
+
+        rows = items_expiring_between(None, end_day, bar_name, limit=limit + 1, after=after)
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [_item_json(r) for r in rows],
+            "next": _encode_cursor([day_ordinal(rows[-1][2]), rows[-1][0]]) if more else None,
+        }
+
+    def handle_get_item(self, item_id):
+        row = add_item_sql._connect().execute("""
+            SELECT item_id, item_name, expired_day, bar_name, quantity, deleted_at
+            FROM items
+            WHERE item_id = ?
+        """, (int(item_id),)).fetchone()
+        if row is None:
+            raise ApiError(404, f"no item {item_id}")
+        return dict(zip(("item_id", "item_name", "expired_day", "bar_name", "quantity", "deleted_at"), row))
+
+    def handle_get_bars(self):
+        totals = {}
+        for (_, bar_name), count in bucket_counts().items():
+            totals[bar_name] = totals.get(bar_name, 0) + count
+        return {
+            "bars": [{"bar_name": b, "count": n} for b, n in sorted(totals.items(), key=lambda kv: kv[0] or "")
+                     if b is not None],
+            "left": totals.get(None, 0),
+        }
+
+    def handle_get_stats(self):
+        return inventory_summary()
+
+    def handle_get_trash(self):
+        limit = self._limit()
+        cursor = self.query.get("cursor")
+        before = _decode_cursor(cursor) if cursor else None
+
+        rows, total = load_trash_page(limit + 1, before=before)
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [
+                {"item_id": i, "item_name": n, "expired_day": d, "quantity": q, "deleted_at": at}
+                for i, n, d, at, q in rows
+            ],
+            "total": total,
+            "next": _encode_cursor([rows[-1][3], rows[-1][0]]) if more else None,
+        }
+
+    # ---- writes (serialized on the writer thread) → (status, body) ----
+
+    def handle_post_items(self):
+        body = self._body()
+        many = isinstance(body, list)
+        rows = [_new_item(obj) for obj in (body if many else [body])]
+        item_ids = self.server.write(insert_products_many, rows)
+        return 201, {"item_ids": item_ids} if many else {"item_id": item_ids[0]}
+
+    def handle_move_items(self):
+        body = self._body()
+        item_ids = body.get("item_ids") if isinstance(body, dict) else None
+        if not isinstance(item_ids, list) or not all(isinstance(i, int) for i in item_ids):
+            raise ApiError(400, "item_ids must be a list of integers")
+        bar_name = _bar_field(body)
+        moved = self.server.write(update_items_bar, item_ids, bar_name)
+        return 200, {
+            "moved": len(moved),
+            "bar_name": bar_name,
+            "folded": [[r["item_id"], r["into"]] for r in moved if r["into"] is not None]
+        }
+
+    def handle_patch_item(self, item_id):
+        bar_name = _bar_field(self._body())
+        item = self.server.write(update_item_bar, int(item_id), bar_name)
+        if item is None:
+            raise ApiError(404, f"no live item {item_id}")
+        return 200, item
+
+    def handle_delete_item(self, item_id):
+        if not self.server.write(trash_items, [int(item_id)]):
+            raise ApiError(404, f"no live item {item_id}")
+        return 200, {"trashed": int(item_id)}
+
+    def handle_restore_item(self, item_id):
+        body = self._body()
+        bar_name = None if body is None else _bar_field(body)
+        item = self.server.write(restore_item, int(item_id), bar_name)
+        if item is None:
+            raise ApiError(404, f"no trashed item {item_id}")
+        return 200, item
+
+    def handle_delete_trash(self):
+        return 200, {"deleted": self.server.write(empty_trash)}
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, readers=READERS):
+    """
+    Run the API over the active profile until interrupted (Ctrl+C)
+    :param port: 0 picks a free port (printed on start)
+    """
+    server = ApiServer(host, port, readers)
+    print(json.dumps({"serving": f"http://{server.server_address[0]}:{server.server_address[1]}/",
+                      "db_path": server.db_path}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
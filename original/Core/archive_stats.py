@@ -0,0 +1,132 @@
+"""
+Aggregation over a directory of archived tracker databases (Export DB / cli.py export)
+- Each file is read in a worker process, opened read-only and immutable
+  (no locks, no -wal / -shm files created next to the archive)
+- A worker returns the file's monthly counts per (month, timeline, kind): a few
+  hundred tuples, whatever the size of the file; the parent only merges them
+- Standard library and no Core imports, so worker processes start cheaply
+
+Merging:
+- "max" (default): the files are snapshots of one inventory. The item history is
+  append-only, so the newest snapshot holding a month has its final count, which
+  is also the largest one
+- "sum": the files are different inventories (profiles, households)
+"""
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import repeat
+
+# Event kinds counted (same names as add_item_sql.EVENT_KINDS)
+KINDS = ("added", "consumed", "discarded", "expired")
+
+# Below this many files the work is done in-process (pool start-up costs more)
+MIN_PARALLEL_FILES = 4
+
+
+def find_archives(directory):
+    """Tracker database files directly inside directory, sorted by name"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(".db") and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def _open_immutable(path):
+    uri = "file:" + os.path.abspath(path).replace("\\", "/") + "?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True)
+
+
+def scan_archive(path, since=None, until=None):
+    """
+    Monthly counts of one archive (runs in a worker process)
+    - Files with the item history: its monthly rollup, read as is
+    - Older files (items table only): items past their expiry date on the day the
+      file was written count as "expired" in their expiry month
+    :param since / until: 'YYYY-MM' bounds (inclusive), None = open
+    :return: (path, [(month, bar_name, kind, count), ...], error message or None)
+             bar_name '' = left area
+    """
+    try:
+        conn = _open_immutable(path)
+        try:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if "item_events_monthly" in tables:
+                rows = conn.execute("""
+                    SELECT month, bar_name, kind, count
+                    FROM item_events_monthly
+                    WHERE month >= ? AND month <= ?
+                """, (since or "", until or "9999-99")).fetchall()
+            elif "items" in tables:
+                written = date.fromtimestamp(os.path.getmtime(path)).isoformat()
+                rows = conn.execute("""
+                    SELECT substr(expired_day, 1, 7) AS month, COALESCE(bar_name, ''), 'expired', COUNT(*)
+                    FROM items
+                    WHERE expired_day < ? AND month >= ? AND month <= ?
+                    GROUP BY 1, 2
+                """, (written, since or "", until or "9999-99")).fetchall()
+            else:
+                return path, [], "not a tracker database (no items table)"
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return path, [], str(e)
+
+    return path, rows, None
+
+
+def merge_counts(results, merge="max"):
+    """
+    Merge scan_archive results
+    :return: ({(month, bar_name, kind): count}, [(path, error), ...])
+    """
+    combine = max if merge == "max" else (lambda a, b: a + b)
+    totals = {}
+    failed = []
+    for path, rows, error in results:
+        if error is not None:
+            failed.append((path, error))
+            continue
+        for month, bar_name, kind, count in rows:
+            key = (month, bar_name, kind)
+            totals[key] = combine(totals[key], count) if key in totals else count
+    return totals, failed
+
+
+def aggregate_archives(paths, merge="max", since=None, until=None, workers=None):
+    """
+    Scan many archives in parallel and merge their monthly counts
+    :param workers: worker processes (default: one per CPU)
+    :return: {"files", "failed": [{"path", "error"}],
+              "months": {month: {kind: count}},
+              "rows": [{"month", "bar_name", "kind", "count"}]}   bar_name None = left area
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+
+    if len(paths) < MIN_PARALLEL_FILES or workers == 1:
+        results = [scan_archive(p, since, until) for p in paths]
+    else:
+        workers = min(workers, len(paths))
+        # A few chunks per worker: little IPC, still balanced when file sizes differ
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(scan_archive, paths, repeat(since), repeat(until), chunksize=chunksize))
+
+    totals, failed = merge_counts(results, merge)
+
+    months = {}
+    for (month, _, kind), count in totals.items():
+        per_kind = months.setdefault(month, dict.fromkeys(KINDS, 0))
+        per_kind[kind] = per_kind.get(kind, 0) + count
+
+    return {
+        "files": len(paths),
+        "failed": [{"path": p, "error": e} for p, e in failed],
+        "months": dict(sorted(months.items())),
+        "rows": [
+            {"month": month, "bar_name": bar_name or None, "kind": kind, "count": count}
+            for (month, bar_name, kind), count in sorted(totals.items())
+        ],
+    }
@@ -0,0 +1,80 @@
+"""
+SQLite online backup / restore code
+No tkinter imports here, so it can run in a worker thread or headless
+"""
+import sqlite3
+from Core.add_item_sql import _db_path, setup_database, thread_connection
+
+# Pages copied per backup step (4 KiB pages → ~1 MiB per step)
+PAGES_PER_STEP = 256
+
+
+def _progress_adapter(progress):
+    """
+    Convert sqlite3 backup progress (status, remaining, total)
+    into progress(done_pages, total_pages)
+    """
+    if progress is None:
+        return None
+
+    def _inner(status, remaining, total):
+        progress(total - remaining, total)
+
+    return _inner
+
+
+def _check_tracker_db(conn):
+    """
+    Make sure the file is a tracker database (has the items table)
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items'")
+    if cur.fetchone() is None:
+        raise ValueError("Selected file is not a tracker database (no items table)")
+
+
+def backup_to(dest_path, progress=None, pages=PAGES_PER_STEP):
+    """
+    Copy the live database into dest_path with the SQLite backup API.
+    The copy is consistent even while the app keeps writing.
+    :param dest_path: target .db file (overwritten)
+    :param progress: optional callback progress(done_pages, total_pages)
+    :param pages: pages copied per step
+    """
+    src = sqlite3.connect(_db_path())
+    dst = sqlite3.connect(dest_path)
+    try:
+        src.backup(dst, pages=pages, progress=_progress_adapter(progress))
+    finally:
+        dst.close()
+        src.close()
+
+
+def restore_from(src_path, progress=None, pages=PAGES_PER_STEP):
+    """
+    Restore src_path into the live database with the SQLite backup API.
+    Open connections see the new content; no file is replaced underneath them.
+    Run as a DB worker job, the copy goes through the worker's own connection,
+    so no queued write can land between two backup steps.
+    :param src_path: source .db file
+    :param progress: optional callback progress(done_pages, total_pages)
+    :param pages: pages copied per step
+    """
+    src = sqlite3.connect(src_path)
+    try:
+        _check_tracker_db(src)
+
+        dst = thread_connection()
+        own = dst is None
+        if own:
+            dst = sqlite3.connect(_db_path())
+        try:
+            src.backup(dst, pages=pages, progress=_progress_adapter(progress))
+        finally:
+            if own:
+                dst.close()
+    finally:
+        src.close()
+
+    # Imported file may come from an older version
+    setup_database()
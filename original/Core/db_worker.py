@@ -0,0 +1,207 @@
+"""
+Background database worker
+- One thread owns one SQLite connection and runs SQL jobs in submission order
+- Tk code submits jobs and gets results back on the Tk thread via after()
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from Core import add_item_sql
+
+# How often the Tk thread collects finished jobs (ms)
+POLL_MS = 15
+
+# Latency samples kept for metrics
+LATENCY_WINDOW = 512
+
+_worker = None
+
+
+class DBWorker(threading.Thread):
+    """
+    Dedicated SQL thread:
+    - submit(fn, *args, on_done=..., on_error=...) → concurrent.futures.Future
+    - Jobs run in FIFO order, so a read submitted after a write sees the write
+    - While a job runs, every add_item_sql helper uses this thread's connection
+    - on_done / on_error callbacks are executed on the Tk thread
+    """
+
+    def __init__(self, root=None):
+        super().__init__(name="DBWorker", daemon=True)
+        self.root = root
+
+        self._jobs = queue.Queue()
+        self._done = queue.Queue()
+
+        self._conn = None
+        self._conn_path = None
+
+        # Metrics
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)  # (wait_ms, run_ms)
+        self.completed = 0
+        self.failed = 0
+
+        if root is not None:
+            root.after(POLL_MS, self._drain)
+
+    # ---- Tk side ----
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) for the worker thread
+        :return: Future with the result
+        """
+        future = Future()
+        self._jobs.put((fn, args, kwargs, future, on_done, on_error, time.perf_counter()))
+        return future
+
+    def _drain(self):
+        """Run finished-job callbacks on the Tk thread, then re-arm"""
+        try:
+            while True:
+                callback, value = self._done.get_nowait()
+                try:
+                    callback(value)
+                except Exception as e:
+                    print("DB callback error:", e)
+        except queue.Empty:
+            pass
+
+        if self.root is not None and self.is_alive():
+            self.root.after(POLL_MS, self._drain)
+
+    def stop(self):
+        """Finish queued jobs, then close the connection and exit"""
+        self._jobs.put(None)
+
+    def metrics(self):
+        """
+        Queue depth and latency of recent jobs (milliseconds)
+        - wait: time spent queued, run: time spent executing
+        """
+        with self._lock:
+            samples = list(self._latencies)
+            completed, failed = self.completed, self.failed
+
+        def summary(values):
+            if not values:
+                return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+            ordered = sorted(values)
+            return {
+                "avg": sum(ordered) / len(ordered),
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max": ordered[-1],
+            }
+
+        return {
+            "queue_depth": self._jobs.qsize(),
+            "completed": completed,
+            "failed": failed,
+            "wait_ms": summary([w for w, _ in samples]),
+            "run_ms": summary([r for _, r in samples]),
+        }
+
+    # ---- worker side ----
+
+    def _connection(self):
+        """
+        Worker connection for the active profile (reopened after a profile switch)
+        """
+        path = add_item_sql._db_path()
+        if self._conn is None or self._conn_path != path:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = add_item_sql.open_connection(path)
+            self._conn_path = path
+        return self._conn
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fn, args, kwargs, future, on_done, on_error, queued_at = job
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.perf_counter()
+            try:
+                add_item_sql.bind_thread_connection(self._connection())
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                future.set_exception(e)
+                self._finish(queued_at, started, ok=False)
+                if on_error is not None:
+                    self._done.put((on_error, e))
+                else:
+                    print("DB worker error:", e)
+                continue
+            finally:
+                add_item_sql.bind_thread_connection(None)
+
+            future.set_result(result)
+            self._finish(queued_at, started, ok=True)
+            if on_done is not None:
+                self._done.put((on_done, result))
+
+        if self._conn is not None:
+            self._conn.close()
+
+    def _finish(self, queued_at, started, ok):
+        now = time.perf_counter()
+        with self._lock:
+            self._latencies.append(((started - queued_at) * 1000, (now - started) * 1000))
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+
+def start_worker(root):
+    """Start the app-wide worker (results delivered through root.after)"""
+    global _worker
+    _worker = DBWorker(root)
+    _worker.start()
+    return _worker
+
+
+def stop_worker():
+    """Stop the app-wide worker after its queue is empty"""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker.join(timeout=5)
+        _worker = None
+
+
+def get_worker():
+    """App-wide worker, or None when running without one (headless / tests)"""
+    return _worker
+
+
+def run_async(fn, *args, on_done=None, on_error=None, **kwargs):
+    """
+    Run a SQL helper on the worker if one is running, else right away.
+    Without a worker, on_done is called synchronously with the result.
+    """
+    if _worker is not None:
+        return _worker.submit(fn, *args, on_done=on_done, on_error=on_error, **kwargs)
+
+    future = Future()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+        if on_error is None:
+            raise
+        on_error(e)
+        return future
+
+    future.set_result(result)
+    if on_done is not None:
+        on_done(result)
+    return future
@@ -1,207 +1,286 @@
 """
 Core code for generating items
 """
-import tkinter as tk
+import sys
 from datetime import datetime, date
-from Core.dragdrop.tooltip import Tooltip
-from Core.add_item_sql import insert_products
-from .trash_bin import TrashBin
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def _remaining_days(expired_day, today):
+    """
+    Remaining days of an expiry date (cached: most items share a few hundred dates)
+    :param today: date.today() ordinal, part of the key so the cache turns over at midnight
+    """
+    try:
+        return datetime.strptime(expired_day, "%Y-%m-%d").date().toordinal() - today
+    except (TypeError, ValueError):
+        return 30
 
 
 class DraggableBall:
     """
-    Timeline system Ball:
+    Timeline system Ball, split into a compact record and an optional view:
+    - item_id (SQL row id, identity used for reconciliation)
     - name (item name)
     - expired_day (expiration date)
     - remaining_days (used for timeline mapping)
+    - quantity (units of one entry: identical items share one ball, labelled "name ×n")
+    - x, y: logical center, kept whether or not the ball is drawn
+    - ball_id / text_id: canvas items, only while the ball is near the viewport
+      (DragDropManager.refresh_visible creates / drops them)
+    - Mouse events are bound once on the "ball" tag by the manager, and the tooltip
+      is shared, so a view costs two canvas items and no Tcl commands
     - Ball color is fixed: blue, does not change based on days
+
+    Memory: about 310 bytes of Python objects per item at 100k items (record,
+    name string, ball_index / items entries; measured with tracemalloc),
+    plus two canvas items for visible balls only
     """
 
     RADIUS = 18
     COLOR = "#2196f3"   # Fixed blue
+    OVERLAY_COLOR = "#b0bec5"   # Grey: item of an overlaid (read-only) profile
+    TAG = "ball"        # Tag shared by every ball canvas item (event bindings)
 
-    def __init__(self, canvas, manager, name, expired_day, initial_x=100, initial_y=100):
-        self.canvas = canvas
+    __slots__ = (
+        "manager", "item_id", "read_only", "name", "expired_day", "remaining_days",
+        "quantity", "current_bar", "x", "y", "ball_id", "text_id",
+    )
+
+    def __init__(self, manager, name, expired_day, item_id=None, read_only=False, quantity=1):
         self.manager = manager
 
+        self.item_id = item_id
+        self.read_only = read_only
         self.name = name
-        self.expired_day = expired_day
+        self.expired_day = _intern(expired_day)
         self.remaining_days = self._compute_remaining_days()
+        self.quantity = quantity
 
         # Belonging timeline
         self.current_bar = None
 
-        # Graphic IDs
+        # Logical position (set by the layout, drawn or not)
+        self.x = 0
+        self.y = 0
+
+        # Graphic IDs (None while not drawn)
         self.ball_id = None
         self.text_id = None
 
-        self.create_graphics(initial_x, initial_y)
-
-        # Drag events
-        self.canvas.tag_bind(self.ball_id, "<ButtonPress-1>", self._on_press)
-        self.canvas.tag_bind(self.ball_id, "<B1-Motion>", self._on_drag)
-        self.canvas.tag_bind(self.ball_id, "<ButtonRelease-1>", self._on_release)
-
-        self.canvas.tag_bind(self.text_id, "<ButtonPress-1>", self._on_press)
-        self.canvas.tag_bind(self.text_id, "<B1-Motion>", self._on_drag)
-        self.canvas.tag_bind(self.text_id, "<ButtonRelease-1>", self._on_release)
-
-        # Tooltip on hover
-        self.canvas.tag_bind(self.ball_id, "<Enter>", self._on_hover)
-        self.canvas.tag_bind(self.ball_id, "<Leave>", self._on_leave)
-
-        self.canvas.tag_bind(self.text_id, "<Enter>", self._on_hover)
-        self.canvas.tag_bind(self.text_id, "<Leave>", self._on_leave)
-
 
     def _compute_remaining_days(self):
         """
         Compute remaining days
         :return: days
         """
-        try:
-            d = datetime.strptime(self.expired_day, "%Y-%m-%d").date()
-            return (d - date.today()).days
-        except:
-            return 30
+        return _remaining_days(self.expired_day, date.today().toordinal())
 
 
-    def create_graphics(self, x, y):
+    def update_data(self, name, expired_day):
         """
-        Generate item graphics
-        :param x: x position
-        :param y: y position
-        :return: None
+        Apply changed name / expiration date from SQL
+        :return: True if remaining days changed (ball needs repositioning)
         """
-        # Tooltip text
-        self.tooltip = Tooltip(
-            self.canvas.winfo_toplevel(),
-            self._tooltip_text()
-        )
+        old_days = self.remaining_days
 
-        r = self.RADIUS
+        self.name = name
+        self.expired_day = _intern(expired_day)
+        self.remaining_days = self._compute_remaining_days()
 
-        self.ball_id = self.canvas.create_oval(
-            x - r, y - r, x + r, y + r,
-            fill=self.COLOR, outline="black", width=2
-        )
+        if self.text_id is not None:
+            self.manager.canvas.itemconfig(self.text_id, text=self.label())
 
-        self.text_id = self.canvas.create_text(
-            x, y,
-            text=self.name,
-            font=("Arial", 10, "bold")
-        )
+        return self.remaining_days != old_days
 
-        self.canvas.tag_raise(self.ball_id)
-        self.canvas.tag_raise(self.text_id)
+    def set_quantity(self, quantity):
+        """Units of the entry changed (label updated if drawn)"""
+        self.quantity = quantity
+        if self.text_id is not None:
+            self.manager.canvas.itemconfig(self.text_id, text=self.label())
 
+    def label(self):
+        return entry_label(self.name, self.quantity)
 
-    def _on_press(self, event):
-        """
-        Drag logic (press)
-        """
-        self.drag_start_x = event.x
-        self.drag_start_y = event.y
 
-    def _on_drag(self, event):
+    # ---- view ----
+
+    def show(self):
         """
-        Drag logic (move)
+        Create the canvas items at the logical position (no-op if already drawn)
         """
-        self.canvas.tag_raise(self.ball_id)
-        self.canvas.tag_raise(self.text_id)
-
-        dx = event.x - self.drag_start_x
-        dy = event.y - self.drag_start_y
+        if self.ball_id is not None:
+            return
+        canvas = self.manager.canvas
+        x, y, r = self.x, self.y, self.RADIUS
 
-        self.canvas.move(self.ball_id, dx, dy)
-        self.canvas.move(self.text_id, dx, dy)
+        outline, width = self._outline()
+        tags = (self.TAG, self.manager.SELECT_TAG) if self in self.manager.selection else (self.TAG,)
+        self.ball_id = canvas.create_oval(
+            x - r, y - r, x + r, y + r,
+            fill=self.OVERLAY_COLOR if self.read_only else self.COLOR,
+            outline=outline,
+            width=width,
+            tags=tags + ("search_hit",) if self.item_id in self.manager.highlighted else tags
+        )
 
-        self.drag_start_x = event.x
-        self.drag_start_y = event.y
+        self.text_id = canvas.create_text(
+            x, y,
+            text=self.label(),
+            font=("Arial", 10, "bold"),
+            tags=tags
+        )
 
+        self.manager.views[self.ball_id] = self
+        self.manager.views[self.text_id] = self
+        self.manager.shown.add(self)
+
+    def _outline(self):
+        """Outline color and width: selected, search hit, or plain"""
+        manager = self.manager
+        if self in manager.selection:
+            return manager.SELECT_COLOR, 4
+        if self.item_id in manager.highlighted:
+            return manager.HIGHLIGHT_COLOR, 4
+        return "black", 2
+
+    def restyle(self):
+        """Apply a selection change to the drawn items (no-op while not drawn)"""
+        if self.ball_id is None:
+            return
+        canvas = self.manager.canvas
+        tag = self.manager.SELECT_TAG
+        for item in (self.ball_id, self.text_id):
+            if self in self.manager.selection:
+                canvas.addtag_withtag(tag, item)
+            else:
+                canvas.dtag(item, tag)
+        outline, width = self._outline()
+        canvas.itemconfig(self.ball_id, outline=outline, width=width)
+
+    def hide(self):
+        """
+        Drop the canvas items (the record keeps its position)
+        """
+        if self.ball_id is None:
+            return
+        views = self.manager.views
+        views.pop(self.ball_id, None)
+        views.pop(self.text_id, None)
+        self.manager.shown.discard(self)
+        self.manager.canvas.delete(self.ball_id, self.text_id)
+        self.ball_id = None
+        self.text_id = None
 
-    def _on_release(self, event):
+    def set_position(self, x, y, drawn=True):
         """
-        Release item logic
+        Set item position (drawn only if it lands near the viewport)
+        :param drawn: False while the ball is merged into a timeline's count badge
         """
+        self.x = x
+        self.y = y
 
-        # Try snapping to timeline
-        if self.manager.try_snap_to_bar(self):
+        if not drawn or not self.manager.in_view(y):
+            self.hide()
             return
-
-        # Try snapping to trash
-        if self.manager.try_snap_to_trash(self):
+        if self.ball_id is None:
+            self.show()
             return
 
-        # If both fail, return to left side
-        self.manager.return_ball_to_left(self)
-
-
-    def set_position(self, x, y):
-        """
-        Set item position
-        """
         r = self.RADIUS
-        self.canvas.coords(self.ball_id, x - r, y - r, x + r, y + r)
-        self.canvas.coords(self.text_id, x, y)
+        canvas = self.manager.canvas
+        canvas.coords(self.ball_id, x - r, y - r, x + r, y + r)
+        canvas.coords(self.text_id, x, y)
 
         # Ensure ball stays above after timeline redraw
-        self.canvas.tag_raise(self.ball_id)
-        self.canvas.tag_raise(self.text_id)
+        canvas.tag_raise(self.ball_id)
+        canvas.tag_raise(self.text_id)
 
     def _center(self):
         """
         Get item center coordinates
         """
-        x1, y1, x2, y2 = self.canvas.coords(self.ball_id)
-        return (x1 + x2) / 2, (y1 + y2) / 2
+        return self.x, self.y
 
     def delete_graphics(self):
         """
         Delete item graphical elements
         """
-        if self.ball_id:
-            self.canvas.delete(self.ball_id)
-        if self.text_id:
-            self.canvas.delete(self.text_id)
+        self.hide()
+
+
+    # ---- mouse (dispatched by DragDropManager from the "ball" tag) ----
+
+    def on_press(self, event):
+        """
+        Drag logic (press)
+        """
+        if self.read_only:
+            return
+        self.manager.drag_from = (event.x, event.y)
 
-    def rebuild_graphics(self):
+    def on_drag(self, event):
         """
-        Restore from trash
+        Drag logic (move)
         """
-        self.remaining_days = self._compute_remaining_days()
+        if self.read_only or self.manager.drag_from is None or self.ball_id is None:
+            return
+        canvas = self.manager.canvas
+        canvas.tag_raise(self.ball_id)
+        canvas.tag_raise(self.text_id)
+
+        last_x, last_y = self.manager.drag_from
+        dx = event.x - last_x
+        dy = event.y - last_y
 
-        # Create new graphics
-        self.create_graphics(80, 80)
+        canvas.move(self.ball_id, dx, dy)
+        canvas.move(self.text_id, dx, dy)
+        self.x += dx
+        self.y += dy
 
-        # Rebind events
-        for id in (self.ball_id, self.text_id):
-            self.canvas.tag_bind(id, "<ButtonPress-1>", self._on_press)
-            self.canvas.tag_bind(id, "<B1-Motion>", self._on_drag)
-            self.canvas.tag_bind(id, "<ButtonRelease-1>", self._on_release)
-            self.canvas.tag_bind(id, "<Enter>", self._on_hover)
-            self.canvas.tag_bind(id, "<Leave>", self._on_leave)
+        self.manager.drag_from = (event.x, event.y)
 
-    def _tooltip_text(self):
+
+    def on_release(self, event):
+        """
+        Release item logic
+        """
+        if self.read_only or self.manager.drag_from is None:
+            return
+        self.manager.drag_from = None
+
+        # Try snapping to timeline
+        if self.manager.try_snap_to_bar(self):
+            return
+
+        # Try snapping to trash
+        if self.manager.try_snap_to_trash(self):
+            return
+
+        # If both fail, return to left side
+        self.manager.return_ball_to_left(self)
+
+
+    def tooltip_text(self):
         """
         Tooltip content
         """
-        return (
+        text = (
             f"Name: {self.name}\n"
             f"Expiration Date: {self.expired_day}\n"
             f"Remaining Days: {self.remaining_days} days"
         )
+        if self.quantity > 1:
+            text += f"\nQuantity: {self.quantity} (drop on the trash to take one)"
+        return text
 
-    """Checking trash logic, abandoned"""
-    def _on_hover(self, event):
-        bx, by = self._center()
-        r = self.RADIUS
 
-        # Convert canvas coordinate to absolute screen coordinate
-        screen_x = self.canvas.winfo_rootx() + bx + r + 4
-        screen_y = self.canvas.winfo_rooty() + by + r + 4
+def entry_label(name, quantity):
+    """Display name of an entry: "Yogurt", or "Yogurt ×12" for several units"""
+    return name if quantity == 1 else f"{name} ×{quantity}"
 
-        self.tooltip.show(screen_x, screen_y)
 
-    def _on_leave(self, event):
-        self.tooltip.hide()
+def _intern(expired_day):
+    """Share one string object per date among all balls"""
+    return sys.intern(expired_day) if isinstance(expired_day, str) else expired_day
@@ -1,9 +1,12 @@
 """
 Timeline logic code
 """
+import itertools
 import tkinter as tk
-from tkinter import Menu
-from Core.add_item_sql import update_item_bar_name
+from Core.add_item_sql import update_item_bar, move_bar_items
+from Core.db_worker import run_async
+from Core.snapshot import timeline_x, timeline_layout
+from .journal import MoveItem, DeleteBar
 
 
 class TimelineBar:
@@ -13,11 +16,40 @@ class TimelineBar:
     - timeline width = canvasWidth - 400px
     - Color gradient: Green (>30) → Yellow (7~30) → Red (<7)
     - Ball horizontal position based on remaining days
+    - Canvas items carry the "bar" tag; the right-click menu is bound once on that
+      tag by DragDropManager (manager.views maps item ids back to the timeline)
+    - Graphics are created once: a width change updates coordinates,
+      a position change is one canvas.move on the timeline's own tag
+    - Level of detail: balls closer than CLUSTER_PX are merged into one count
+      badge once CLUSTER_MIN of them pile up; hovering a badge fans its balls out
+      (at most EXPAND_LIMIT). Canvas items per timeline are therefore bounded by
+      its width, not by its item count
     """
 
     LEFT_MARGIN = 200
     RIGHT_MARGIN = 200
     HEIGHT = 70
+    TAG = "bar"         # Tag shared by every timeline canvas item (event bindings)
+    SEGMENT_COUNT = 50  # Gradient segments
+
+    # Level of detail
+    CLUSTER_PX = 36       # Balls closer than one ball diameter overlap
+    CLUSTER_MIN = 4       # Smaller groups are drawn as stacked balls
+    BADGE_TAG = "badge"   # Tag shared by every count badge (hover binding)
+    BADGE_RADIUS = 16
+    BADGE_COLOR = "#455a64"
+    EXPAND_LIMIT = 15     # Balls fanned out by a hovered badge
+    EXPAND_COLUMNS = 5
+
+    # Tick labels, left to right, and their position along the timeline
+    TICKS = (
+        ("50+", 0.05),    # 50 days
+        ("30", 20 / 50),  # 30 days
+        ("7", 43 / 50),   # 7 days
+        ("0", 0.98),      # 0 days
+    )
+
+    _serial = itertools.count()
 
     def __init__(self, canvas, manager, y, bar_name):
         self.canvas = canvas
@@ -30,170 +62,245 @@ class TimelineBar:
         self.rect_ids = []
         self.text_ids = []
 
-        self._draw()
+        # Count badges of the last layout, balls hidden behind them,
+        # and the badge fanned out under the pointer (None if none)
+        self.clusters = []
+        self._clustered = set()
+        self.expanded = None
 
-        # Right-click menu
-        self.menu = Menu(self.canvas, tearoff=0)
-        self.menu.add_command(label="Delete This Bar", command=self._delete_self)
+        # Own tag: the whole timeline moves with one canvas.move
+        self.tag = f"bar{next(self._serial)}"
+        self.tags = (self.TAG, self.tag)
+        self._width = None
 
-        # Bind right-click
-        for rid in self.rect_ids:
-            self.canvas.tag_bind(rid, "<Button-3>", self._show_menu)
-        for tid in self.text_ids:
-            self.canvas.tag_bind(tid, "<Button-3>", self._show_menu)
+        self._draw()
 
 
     def _draw(self):
         """
-        Draw timeline
+        Create the timeline graphics (once; redraw / move_to update them in place)
         """
-        # Clear old graphics
-        for r in self.rect_ids:
-            self.canvas.delete(r)
-        for t in self.text_ids:
-            self.canvas.delete(t)
-        self.rect_ids.clear()
-        self.text_ids.clear()
-
-        # Get width
-        width = int(self.canvas.winfo_width())
-        if width < 500:
-            width = 800
-
-        timeline_left = self.LEFT_MARGIN
-        timeline_right = width - self.RIGHT_MARGIN
-        timeline_width = timeline_right - timeline_left
+        self._width = self._canvas_width()
+        geometry = self._geometry(self._width)
+        segments = geometry[1:1 + self.SEGMENT_COUNT]
+        ticks = geometry[-len(self.TICKS):]
 
         # Background bar (light gray)
         bar_bg = self.canvas.create_rectangle(
-            timeline_left, self.y,
-            timeline_right, self.y + self.HEIGHT,
-            fill="#eeeeee", outline="#aaaaaa"
+            *geometry[0],
+            fill="#eeeeee", outline="#aaaaaa", tags=self.tags
         )
         self.rect_ids.append(bar_bg)
 
         # Gradient (50 segments)
-        segment_count = 50
-        segment_width = timeline_width / segment_count
-
-        start_color = (76, 175, 80)  # Green (#4caf50)
-        mid_color = (255, 235, 59)  # Yellow (#ffeb3b)
-        end_color = (244, 67, 54)  # Red (#f44336)
-
-        def lerp(a, b, t):
-            return a + (b - a) * t
-
-        def blend(c1, c2, t):
-            """
-            Build single segment color
-            """
-            return (
-                int(lerp(c1[0], c2[0], t)),
-                int(lerp(c1[1], c2[1], t)),
-                int(lerp(c1[2], c2[2], t))
-            )
-
-        for i in range(segment_count):
-            t = i / (segment_count - 1)
-
-            # Left half: Green to Yellow
-            if t < 0.5:
-                local_t = t / 0.5
-                r, g, b = blend(start_color, mid_color, local_t)
-            # Right half: Yellow to Red
-            else:
-                local_t = (t - 0.5) / 0.5
-                r, g, b = blend(mid_color, end_color, local_t)
-
-            color_hex = f"#{r:02x}{g:02x}{b:02x}"
-
-            x1 = timeline_left + i * segment_width
-            x2 = x1 + segment_width
-
+        for coords, color_hex in zip(segments, _gradient(self.SEGMENT_COUNT)):
             rect = self.canvas.create_rectangle(
-                x1, self.y + 25,
-                x2, self.y + 45,
-                fill=color_hex, outline=""
+                *coords,
+                fill=color_hex, outline="", tags=self.tags
             )
             self.rect_ids.append(rect)
 
         # Timeline name
         title = self.canvas.create_text(
-            timeline_left,
-            self.y + 12,
+            *geometry[1 + self.SEGMENT_COUNT],
             text=self.bar_name,
             font=("Arial", 12, "bold"),
-            anchor="w"
+            anchor="w",
+            tags=self.tags
         )
         self.text_ids.append(title)
 
         # Ticks
-        tick_values = ["50+", "30", "7", "0"]  # Left to right
-        tick_positions = [
-            0.05,        # 50 days
-            20 / 50,     # 30 days
-            43 / 50,     # 7 days
-            0.98         # 0 days
-        ]
-
-        for value, pos in zip(tick_values, tick_positions):
-            x = timeline_left + pos * timeline_width
+        for coords, (value, _) in zip(ticks, self.TICKS):
             tick = self.canvas.create_text(
-                x, self.y + 55,
+                *coords,
                 text=f"{value} days",
                 font=("Arial", 9),
-                anchor="center"
+                anchor="center",
+                tags=self.tags
             )
             self.text_ids.append(tick)
 
-        # Rebind right-click
-        for rid in self.rect_ids:
-            self.canvas.tag_bind(rid, "<Button-3>", self._show_menu)
-        for tid in self.text_ids:
-            self.canvas.tag_bind(tid, "<Button-3>", self._show_menu)
-
-        # Reposition balls
-        for b in self.balls:
-            self._reposition_ball(b)
+        # Canvas id → timeline, for the shared right-click binding
+        for item in self.rect_ids + self.text_ids:
+            self.manager.views[item] = self
 
+    def _canvas_width(self):
+        width = int(self.canvas.winfo_width())
+        return width if width >= 500 else 800
 
-    def _compute_ball_x(self, remaining_days):
+    def _geometry(self, width):
         """
-        Map ball to timeline X coordinate
+        Coordinates of every timeline item, in rect_ids + text_ids order:
+        background, gradient segments, title, ticks
         """
-        width = int(self.canvas.winfo_width())
         timeline_left = self.LEFT_MARGIN
         timeline_right = width - self.RIGHT_MARGIN
         timeline_width = timeline_right - timeline_left
+        segment_width = timeline_width / self.SEGMENT_COUNT
+        y = self.y
 
-        # Clamp
-        days = max(0, min(remaining_days, 40))
+        coords = [(timeline_left, y, timeline_right, y + self.HEIGHT)]
+        for i in range(self.SEGMENT_COUNT):
+            x1 = timeline_left + i * segment_width
+            coords.append((x1, y + 25, x1 + segment_width, y + 45))
+        coords.append((timeline_left, y + 12))
+        for _, pos in self.TICKS:
+            coords.append((timeline_left + pos * timeline_width, y + 55))
+        return coords
 
-        ratio = 1 - days / 40
-        x = timeline_left + ratio * timeline_width
-        return x
+    def _compute_ball_x(self, remaining_days):
+        """
+        Map ball to timeline X coordinate (width of the drawn timeline)
+        """
+        return timeline_x(remaining_days, self.LEFT_MARGIN, self._width - self.RIGHT_MARGIN)
 
 
     def _reposition_ball(self, ball):
         """
-        Position ball on timeline
+        Position ball on timeline (its neighbours may merge into / out of a badge,
+        so the whole timeline is laid out again)
         """
-        x = self._compute_ball_x(ball.remaining_days)
-        baseline_y = self.y + 35
-
-        # Stacking detection
-        same_x_count = 0
-        for b in self.balls:
-            if b is ball:
-                continue
-            bx, by = b._center()
+        self._layout_balls()
 
-            if abs(bx - x) < 5:
-                same_x_count += 1
+    def _layout_balls(self):
+        """
+        Position every ball of the timeline: X of all balls in one array operation,
+        balls on the same day stacked (no per-ball scan of the others);
+        crowded groups are hidden behind a count badge
+        """
+        self.collapse()
+        self._clear_badges()
+        self._clustered = set()
+        if not self.balls:
+            return
+
+        xs, ranks = timeline_layout(
+            [b.remaining_days for b in self.balls],
+            self.LEFT_MARGIN, self._width - self.RIGHT_MARGIN
+        )
+        baseline_y = self.y + 35
 
-        y = baseline_y - same_x_count * 5
+        # Balls by X (at most one X per timeline day), then neighbouring X merged
+        by_x = {}
+        for i, x in enumerate(xs):
+            by_x.setdefault(x, []).append(i)
+        groups = []
+        for x in sorted(by_x):
+            if groups and x - groups[-1][0] < self.CLUSTER_PX:
+                groups[-1][1].extend(by_x[x])
+            else:
+                groups.append((x, list(by_x[x])))
+
+        for _, members in groups:
+            drawn = len(members) < self.CLUSTER_MIN
+            for i in members:
+                self.balls[i].set_position(xs[i], baseline_y - ranks[i] * 5, drawn)
+            if not drawn:
+                balls = [self.balls[i] for i in members]
+                x = sum(xs[i] for i in members) / len(members)
+                self._clustered.update(balls)
+                self._draw_badge(BallCluster(self, x, baseline_y, balls))
+
+    def drawn_balls(self):
+        """Balls of this timeline that have their own view (not behind a badge)"""
+        if not self._clustered:
+            return self.balls
+        return [b for b in self.balls if b not in self._clustered]
+
+    # ---- count badges ----
+
+    def _draw_badge(self, cluster):
+        x, y, r = cluster.x, cluster.y, self.BADGE_RADIUS
+        highlighted = not self.manager.highlighted.isdisjoint(b.item_id for b in cluster.balls)
+        tags = (self.BADGE_TAG, self.tag)
+
+        cluster.badge_ids = (
+            self.canvas.create_oval(
+                x - r, y - r, x + r, y + r,
+                fill=self.BADGE_COLOR,
+                outline=self.manager.HIGHLIGHT_COLOR if highlighted else "white",
+                width=4 if highlighted else 2,
+                tags=tags
+            ),
+            self.canvas.create_text(
+                x, y,
+                text=str(len(cluster.balls)),
+                fill="white",
+                font=("Arial", 10, "bold"),
+                tags=tags
+            ),
+        )
+        for item in cluster.badge_ids:
+            self.manager.views[item] = cluster
+        self.clusters.append(cluster)
+
+    def _clear_badges(self):
+        views = self.manager.views
+        for cluster in self.clusters:
+            for item in cluster.badge_ids:
+                views.pop(item, None)
+            self.canvas.delete(*cluster.badge_ids)
+        self.clusters = []
+
+    def highlight_badges(self):
+        """Outline the badges that hide a search hit (manager.highlighted)"""
+        highlighted = self.manager.highlighted
+        for cluster in self.clusters:
+            hit = not highlighted.isdisjoint(b.item_id for b in cluster.balls)
+            self.canvas.itemconfig(
+                cluster.badge_ids[0],
+                outline=self.manager.HIGHLIGHT_COLOR if hit else "white",
+                width=4 if hit else 2
+            )
 
-        ball.set_position(x, y)
+    def expand(self, cluster):
+        """
+        Fan the balls of a badge out above it (soonest to expire first),
+        so they can be hovered and dragged
+        """
+        if self.expanded is cluster:
+            return
+        self.manager.collapse_expanded()
+
+        shown = sorted(
+            (b for b in cluster.balls if b.current_bar is self),
+            key=lambda b: b.remaining_days
+        )[:self.EXPAND_LIMIT]
+        if not shown:
+            return
+        step = 2 * self.BADGE_RADIUS + 8
+        columns = min(self.EXPAND_COLUMNS, len(shown))
+        rows = (len(shown) + columns - 1) // columns
+        left = cluster.x - (columns - 1) * step / 2
+
+        cluster.home = [(b, b.x, b.y) for b in shown]
+        for k, ball in enumerate(shown):
+            row, column = divmod(k, columns)
+            self._clustered.discard(ball)
+            ball.set_position(left + column * step, cluster.y - step * (row + 1))
+
+        # Pointer area that keeps the fan open: the balls plus the badge
+        cluster.area = (
+            left - step / 2, cluster.y - step * (rows + 0.5),
+            left + (columns - 0.5) * step, cluster.y + self.BADGE_RADIUS
+        )
+        self.expanded = cluster
+        self.manager.expanded_bar = self
+
+    def collapse(self):
+        """Put the fanned-out balls back behind their badge"""
+        cluster, self.expanded = self.expanded, None
+        if cluster is None:
+            return
+        if self.manager.expanded_bar is self:
+            self.manager.expanded_bar = None
+        for ball, x, y in cluster.home:
+            # Balls dragged off meanwhile have been laid out elsewhere
+            if ball.current_bar is self and ball is not self.manager.dragging:
+                self._clustered.add(ball)
+                ball.set_position(x, y, drawn=False)
+        cluster.home = []
 
 
     def snap_ball(self, ball):
@@ -205,49 +312,87 @@ class TimelineBar:
         - Setting current_bar
         - Adding to this timeline
         - Repositioning ball based on remaining days
+        - Folding it into an identical entry already on this timeline
+        :return: fold record (see DragDropManager.fold_ball) if it folded, else None
         """
 
+        old_bar = ball.current_bar.bar_name if ball.current_bar else None
+        manager = self.manager
+
+        into = manager.fold_targets([ball], self).get(ball) if old_bar != self.bar_name else None
+        if into is not None:
+            merged = manager.fold_ball(ball, into)
+            manager.journal.record(MoveItem(ball.item_id, old_bar, self.bar_name, merged))
+            run_async(update_item_bar, ball.item_id, self.bar_name,
+                      on_done=lambda row: manager._landed({ball.item_id: into.item_id}, [row]))
+            return merged
+
+        self.attach_ball(ball)
+
+        if old_bar != self.bar_name:
+            manager.journal.record(MoveItem(ball.item_id, old_bar, self.bar_name))
+            run_async(update_item_bar, ball.item_id, self.bar_name,
+                      on_done=lambda row: manager._landed({ball.item_id: None}, [row]))
+
+        self._reposition_ball(ball)
+        return None
+
+    def attach_ball(self, ball):
+        """
+        Move ball onto this timeline (bookkeeping only, no SQL, no positioning).
+        Used by snap_ball and by scene reconciliation.
+        """
         if ball in self.manager.items:
             self.manager.items.remove(ball)
 
-        if ball.current_bar and ball.current_bar != self:
-            ball.current_bar.remove_ball(ball)
+        old_bar = ball.current_bar
+
+        if old_bar and old_bar != self:
+            old_bar.remove_ball(ball)
 
         if ball not in self.balls:
             self.balls.append(ball)
 
         ball.current_bar = self
-        update_item_bar_name(ball.name, self.bar_name)
 
-        self._reposition_ball(ball)
+        if old_bar is not self:
+            self.manager._ball_moved(ball, old_bar.bar_name if old_bar else None)
 
 
-    def _show_menu(self, event):
-        """
-        Show menu
-        """
-        self.menu.tk_popup(event.x_root, event.y_root)
-
     def _delete_self(self):
         """
         Delete timeline
         """
-        for b in self.balls:
-            b.current_bar = None
-            update_item_bar_name(b.name, None)
-            self.manager.return_ball_to_left(b)
-        self.balls.clear()
+        # Whole deletion is one undo step: one UPDATE, one relayout of the left area
+        with self.manager.journal.transaction():
+            self.manager.move_balls(self.balls, None, sql=(move_bar_items, self.bar_name, None))
 
-        self.manager._delete_bar(self)
+            # Overlaid (read-only) balls have no row in this profile: view only
+            for b in self.balls:
+                b.current_bar = None
+                self.manager.items.append(b)
+            self.balls = []
+
+            self.manager.journal.record(DeleteBar(self.bar_name))
+            self.manager._delete_bar(self)
+
+    def rename(self, bar_name):
+        """Relabel the timeline (balls keep their place)"""
+        self.bar_name = bar_name
+        if self.text_ids:
+            self.canvas.itemconfig(self.text_ids[0], text=bar_name)
 
     def delete_graphics(self):
         """
         Delete timeline graphics
         """
-        for rid in self.rect_ids:
-            self.canvas.delete(rid)
-        for tid in self.text_ids:
-            self.canvas.delete(tid)
+        self.collapse()
+        self._clear_badges()
+        views = self.manager.views
+        for item in self.rect_ids + self.text_ids:
+            views.pop(item, None)
+        if self.rect_ids or self.text_ids:
+            self.canvas.delete(*self.rect_ids, *self.text_ids)
 
     def remove_ball(self, ball):
         """
@@ -258,9 +403,109 @@ class TimelineBar:
             self.balls.remove(ball)
         ball.current_bar = None
 
+        # Badge counts are stale: one relayout per idle cycle, however many left
+        if self._clustered:
+            self._clustered.discard(ball)
+            self.manager.schedule_layout(self)
+
+    def detach_balls(self, balls):
+        """
+        Remove many balls in one pass over the timeline (group move / trash);
+        the caller lays the timeline out once afterwards
+        :param balls: set of balls
+        """
+        self.balls = [b for b in self.balls if b not in balls]
+        self._clustered.difference_update(balls)
+        for b in balls:
+            if b.current_bar is self:
+                b.current_bar = None
+
 
     def redraw(self):
         """
-        Redraw timeline
+        Fit the timeline to the canvas width (coordinates only, nothing is recreated)
         """
-        self._draw()
+        width = self._canvas_width()
+        if width == self._width:
+            return
+        self._width = width
+
+        for item, coords in zip(self.rect_ids + self.text_ids, self._geometry(width)):
+            self.canvas.coords(item, *coords)
+
+        # Ball X depends on the width
+        self._layout_balls()
+
+    def move_to(self, y):
+        """
+        Shift the timeline and its balls vertically (one tag move)
+        """
+        dy = y - self.y
+        if not dy:
+            return
+        self.collapse()
+        self.y = y
+        self.canvas.move(self.tag, 0, dy)   # Badges carry the tag too
+
+        for cluster in self.clusters:
+            cluster.y += dy
+        for b in self.balls:
+            b.set_position(b.x, b.y + dy, b not in self._clustered)
+
+
+class BallCluster:
+    """
+    Balls of one timeline merged into a count badge
+    - x, y: badge center; badge_ids: its canvas items (oval, count)
+    - home: logical position of each fanned-out ball while expanded
+    - area: pointer bbox that keeps the fan open
+    """
+
+    __slots__ = ("bar", "x", "y", "balls", "badge_ids", "home", "area")
+
+    def __init__(self, bar, x, y, balls):
+        self.bar = bar
+        self.x = x
+        self.y = y
+        self.balls = balls
+        self.badge_ids = ()
+        self.home = []
+        self.area = None
+
+
+def _gradient(segment_count):
+    """
+    Segment colors: Green (>30) → Yellow (7~30) → Red (<7)
+    """
+    start_color = (76, 175, 80)  # Green (#4caf50)
+    mid_color = (255, 235, 59)  # Yellow (#ffeb3b)
+    end_color = (244, 67, 54)  # Red (#f44336)
+
+    def lerp(a, b, t):
+        return a + (b - a) * t
+
+    def blend(c1, c2, t):
+        """
+        Build single segment color
+        """
+        return (
+            int(lerp(c1[0], c2[0], t)),
+            int(lerp(c1[1], c2[1], t)),
+            int(lerp(c1[2], c2[2], t))
+        )
+
+    colors = []
+    for i in range(segment_count):
+        t = i / (segment_count - 1)
+
+        # Left half: Green to Yellow
+        if t < 0.5:
+            local_t = t / 0.5
+            r, g, b = blend(start_color, mid_color, local_t)
+        # Right half: Yellow to Red
+        else:
+            local_t = (t - 0.5) / 0.5
+            r, g, b = blend(mid_color, end_color, local_t)
+
+        colors.append(f"#{r:02x}{g:02x}{b:02x}")
+    return colors
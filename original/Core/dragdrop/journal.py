@@ -0,0 +1,632 @@
+"""
+Operation journal: single-step undo / redo of canvas mutations
+"""
+import json
+from collections import deque
+from contextlib import contextmanager
+from Core.add_item_sql import (
+    _connect, insert_item_with_id, delete_item_by_id,
+    trash_item, restore_item, trash_items, restore_items,
+    adjust_quantity, take_units, return_units, split_units
+)
+from Core.db_worker import run_async
+from Core.events import UnitsTrashed, UnitsReturned
+
+
+class Command:
+    """
+    One recorded mutation.
+    apply() redoes it, revert() undoes it; both only touch the item(s) involved.
+    The canvas is updated immediately, SQL writes are queued on the DB worker.
+    """
+
+    __slots__ = ()
+    KIND = ""
+
+    def apply(self, manager):
+        raise NotImplementedError
+
+    def revert(self, manager):
+        raise NotImplementedError
+
+    def to_record(self):
+        """Compact JSON-able form (for the persisted journal)"""
+        return [self.KIND] + [getattr(self, name) for name in self.__slots__]
+
+
+class AddItem(Command):
+    """New item created in the left area"""
+
+    __slots__ = ("item_id", "item_name", "expired_day", "quantity")
+    KIND = "add"
+
+    def __init__(self, item_id, item_name, expired_day, quantity=1):
+        self.item_id = item_id
+        self.item_name = item_name
+        self.expired_day = expired_day
+        self.quantity = quantity
+
+    def apply(self, manager):
+        run_async(insert_item_with_id, self.item_id, self.item_name, self.expired_day, None, self.quantity)
+        manager.place_item({
+            "item_id": self.item_id,
+            "item_name": self.item_name,
+            "expired_day": self.expired_day,
+            "bar_name": None,
+            "quantity": self.quantity
+        })
+
+    def revert(self, manager):
+        manager.remove_item(self.item_id)
+        run_async(delete_item_by_id, self.item_id)
+
+
+class AddUnits(Command):
+    """Units added onto an existing entry (same name, date and timeline)"""
+
+    __slots__ = ("item_id", "units")
+    KIND = "add_units"
+
+    def __init__(self, item_id, units):
+        self.item_id = item_id
+        self.units = units
+
+    def apply(self, manager):
+        manager.add_units(self.item_id, self.units)
+        run_async(adjust_quantity, self.item_id, self.units)
+
+    def revert(self, manager):
+        manager.add_units(self.item_id, -self.units)
+        run_async(adjust_quantity, self.item_id, -self.units)
+
+
+class TrashUnits(Command):
+    """
+    Some units of an entry dropped into the trash bin: they became the trashed row
+    trash_id, the entry keeps the rest (redo re-creates the row under the same id).
+    Recorded before the row exists: take() attaches trash_id on the DB worker, so
+    an undo queued behind it already sees it
+    """
+
+    __slots__ = ("item_id", "trash_id", "units", "item_name", "expired_day", "bar_name")
+    KIND = "trash_units"
+
+    def __init__(self, item_id, trash_id, units, item_name, expired_day, bar_name):
+        self.item_id = item_id
+        self.trash_id = trash_id
+        self.units = units
+        self.item_name = item_name
+        self.expired_day = expired_day
+        self.bar_name = bar_name
+
+    def take(self):
+        """SQL side of apply (DB worker job): take the units, keep the trashed row's id"""
+        self.trash_id = take_units(self.item_id, self.units, self.trash_id)
+        return self.trash_id
+
+    def give_back(self):
+        """SQL side of revert (DB worker job), see return_units"""
+        return return_units(self.item_id, self.trash_id) if self.trash_id is not None else None
+
+    def apply(self, manager):
+        manager.add_units(self.item_id, -self.units)
+        run_async(self.take, on_done=lambda trash_id: self._taken(manager, trash_id))
+
+    def _taken(self, manager, trash_id):
+        if trash_id is None:   # Entry changed meanwhile: nothing was taken
+            manager.add_units(self.item_id, self.units)
+            return
+        manager.events.publish(UnitsTrashed(
+            self.item_id, trash_id, self.item_name, self.expired_day, self.bar_name, self.units
+        ))
+
+    def revert(self, manager):
+        manager.add_units(self.item_id, self.units)
+        run_async(self.give_back, on_done=lambda total: self._returned(manager, total))
+
+    def _returned(self, manager, total):
+        if total:
+            manager.events.publish(UnitsReturned(self.item_id, self.trash_id))
+            return
+        # Nothing came back: no unit was taken (None), or the entry is gone
+        # meanwhile and the units stayed in the trash (0)
+        manager.add_units(self.item_id, -self.units)
+        if total == 0:
+            manager.events.publish(UnitsTrashed(
+                self.item_id, self.trash_id, self.item_name, self.expired_day, self.bar_name, self.units
+            ))
+
+
+class MoveItem(Command):
+    """
+    Item snapped to a bar or returned to the left area (bar_name None)
+    merged: [into, units, item_name, expired_day] if it folded into an identical entry there
+    """
+
+    __slots__ = ("item_id", "old_bar", "new_bar", "merged")
+    KIND = "move"
+
+    def __init__(self, item_id, old_bar, new_bar, merged=None):
+        self.item_id = item_id
+        self.old_bar = old_bar
+        self.new_bar = new_bar
+        self.merged = merged
+
+    def apply(self, manager):
+        self.merged = manager.move_item(self.item_id, self.new_bar)
+
+    def revert(self, manager):
+        if self.merged:
+            split_item(manager, self.item_id, self.old_bar, *self.merged)
+        else:
+            manager.move_item(self.item_id, self.old_bar)
+
+
+class MoveItems(Command):
+    """
+    Selection dropped on a bar or the left area (one step, one SQL statement each way)
+    merged: [item_id, into, units, item_name, expired_day] for items that folded
+    into an identical entry there
+    """
+
+    __slots__ = ("item_ids", "old_bars", "new_bar", "merged")
+    KIND = "move_many"
+
+    def __init__(self, item_ids, old_bars, new_bar, merged=None):
+        self.item_ids = list(item_ids)
+        self.old_bars = list(old_bars)
+        self.new_bar = new_bar
+        self.merged = [list(m) for m in merged or ()]
+
+    def apply(self, manager):
+        self.merged = manager.move_items(self.item_ids, self.new_bar)
+
+    def revert(self, manager):
+        folded = {m[0]: m[1:] for m in self.merged}
+        by_bar = {}
+        for item_id, bar_name in zip(self.item_ids, self.old_bars):
+            if item_id in folded:
+                split_item(manager, item_id, bar_name, *folded[item_id])
+            else:
+                by_bar.setdefault(bar_name, []).append(item_id)
+        for bar_name, item_ids in by_bar.items():
+            manager.move_items(item_ids, bar_name)
+
+
+def split_item(manager, item_id, bar_name, into, units, item_name, expired_day):
+    """
+    Undo of a fold: units go back from entry into to their own item item_id on
+    bar_name (one ball again); the scene is re-read if SQL cannot split them
+    """
+    manager.add_units(into, -units)
+    manager.place_item({
+        "item_id": item_id,
+        "item_name": item_name,
+        "expired_day": expired_day,
+        "bar_name": bar_name,
+        "quantity": units
+    })
+    run_async(split_units, into, units, item_id, bar_name,
+              on_done=lambda new_id: new_id is None and manager.reconcile_async())
+
+
+class TrashItem(Command):
+    """
+    Item dragged into the trash bin (name / date kept so undo needs no SQL read)
+    into: live entry the last undo put its units on (an identical entry existed)
+    """
+
+    __slots__ = ("item_id", "old_bar", "item_name", "expired_day", "quantity", "into")
+    KIND = "trash"
+
+    def __init__(self, item_id, old_bar, item_name, expired_day, quantity=1, into=None):
+        self.item_id = item_id
+        self.old_bar = old_bar
+        self.item_name = item_name
+        self.expired_day = expired_day
+        self.quantity = quantity
+        self.into = into
+
+    def apply(self, manager):
+        if self.into is not None:
+            TrashUnits(self.into, self.item_id, self.quantity, self.item_name, self.expired_day,
+                       self.old_bar).apply(manager)
+            return
+        manager.remove_item(self.item_id, trashed=True)
+        run_async(trash_item, self.item_id)
+
+    def revert(self, manager):
+        manager.place_item({
+            "item_id": self.item_id,
+            "item_name": self.item_name,
+            "expired_day": self.expired_day,
+            "bar_name": self.old_bar,
+            "quantity": self.quantity
+        }, restored=True)
+        run_async(restore_item, self.item_id, self.old_bar, on_done=lambda row: self._restored(manager, row))
+
+    def _restored(self, manager, row):
+        self.into = row["into"] if row else None
+        if row:
+            manager.fold_restored([row])
+
+
+class RestoreItems(Command):
+    """
+    Undo All Trash (every trashed item back to the left area)
+    merged: [item_id, into] for rows whose units went onto an identical live entry
+    """
+
+    __slots__ = ("rows", "merged")
+    KIND = "restore"
+
+    def __init__(self, rows, merged=None):
+        # [item_id, item_name, expired_day(, quantity)] per restored item
+        self.rows = [list(r) for r in rows]
+        self.merged = [list(m) for m in merged or ()]
+
+    def apply(self, manager):
+        manager.place_items([
+            {
+                "item_id": item_id,
+                "item_name": item_name,
+                "expired_day": expired_day,
+                "bar_name": None,
+                "quantity": quantity[0] if quantity else 1
+            }
+            for item_id, item_name, expired_day, *quantity in self.rows
+        ], restored=True)
+        run_async(restore_items, [(r[0], None) for r in self.rows],
+                  on_done=lambda rows: self._restored(manager, rows))
+
+    def _restored(self, manager, rows):
+        self.merged = [[r["item_id"], r["into"]] for r in rows if r["into"] is not None]
+        manager.fold_restored(rows)
+
+    def revert(self, manager):
+        into = dict(self.merged)
+        # Merged units first: the entry they went onto may be restored in this step too
+        for item_id, item_name, expired_day, *quantity in self.rows:
+            if item_id in into:
+                TrashUnits(into[item_id], item_id, quantity[0] if quantity else 1,
+                           item_name, expired_day, None).apply(manager)
+        for item_id, *_ in self.rows:
+            if item_id not in into:
+                manager.remove_item(item_id, trashed=True)
+                run_async(trash_item, item_id)
+
+
+class TrashItems(Command):
+    """
+    Selection dropped into the trash bin
+    merged: [item_id, into] for rows the last undo put onto an identical live entry
+    """
+
+    __slots__ = ("rows", "merged")
+    KIND = "trash_many"
+
+    def __init__(self, rows, merged=None):
+        # [item_id, old_bar, item_name, expired_day(, quantity)] per trashed item
+        self.rows = [list(r) for r in rows]
+        self.merged = [list(m) for m in merged or ()]
+
+    def apply(self, manager):
+        into = dict(self.merged)
+        for item_id, old_bar, item_name, expired_day, *quantity in self.rows:
+            if item_id in into:
+                TrashUnits(into[item_id], item_id, quantity[0] if quantity else 1,
+                           item_name, expired_day, old_bar).apply(manager)
+        item_ids = [r[0] for r in self.rows if r[0] not in into]
+        manager.remove_items(item_ids, trashed=True)
+        run_async(trash_items, item_ids)
+
+    def revert(self, manager):
+        manager.place_items([
+            {
+                "item_id": item_id,
+                "item_name": item_name,
+                "expired_day": expired_day,
+                "bar_name": old_bar,
+                "quantity": quantity[0] if quantity else 1
+            }
+            for item_id, old_bar, item_name, expired_day, *quantity in self.rows
+        ], restored=True)
+        run_async(restore_items, [(r[0], r[1]) for r in self.rows],
+                  on_done=lambda rows: self._restored(manager, rows))
+
+    def _restored(self, manager, rows):
+        self.merged = [[r["item_id"], r["into"]] for r in rows if r["into"] is not None]
+        manager.fold_restored(rows)
+
+
+class DeleteBar(Command):
+    """Timeline removed (its balls are moved off by MoveItem in the same transaction)"""
+
+    __slots__ = ("bar_name",)
+    KIND = "delete_bar"
+
+    def __init__(self, bar_name):
+        self.bar_name = bar_name
+
+    def apply(self, manager):
+        bar = manager.bar_by_name(self.bar_name)
+        if bar:
+            manager._delete_bar(bar)
+
+    def revert(self, manager):
+        if manager.bar_by_name(self.bar_name) is None:
+            manager.add_bar(self.bar_name)
+
+
+class RenameBar(Command):
+    """Timeline renamed (one UPDATE each way)"""
+
+    __slots__ = ("old_name", "new_name")
+    KIND = "rename_bar"
+
+    def __init__(self, old_name, new_name):
+        self.old_name = old_name
+        self.new_name = new_name
+
+    def apply(self, manager):
+        manager.rename_bar(self.old_name, self.new_name)
+
+    def revert(self, manager):
+        manager.rename_bar(self.new_name, self.old_name)
+
+
+class MergeBars(Command):
+    """
+    Timeline merged into another (undo moves its own items back to a re-created timeline)
+    merged: [item_id, into, units, item_name, expired_day] for items that folded
+    into an identical entry of the other timeline
+    """
+
+    __slots__ = ("old_name", "new_name", "item_ids", "merged")
+    KIND = "merge_bars"
+
+    def __init__(self, old_name, new_name, item_ids, merged=None):
+        self.old_name = old_name
+        self.new_name = new_name
+        self.item_ids = list(item_ids)
+        self.merged = [list(m) for m in merged or ()]
+
+    def apply(self, manager):
+        self.merged = manager.rename_bar(self.old_name, self.new_name)
+
+    def revert(self, manager):
+        folded = {m[0]: m[1:] for m in self.merged}
+        for item_id in self.item_ids:
+            if item_id in folded:
+                split_item(manager, item_id, self.old_name, *folded[item_id])
+        manager.move_items([i for i in self.item_ids if i not in folded], self.old_name)
+
+
+class Transaction(Command):
+    """Group of commands undone / redone as one step"""
+
+    __slots__ = ("commands",)
+    KIND = "txn"
+
+    def __init__(self, commands):
+        self.commands = list(commands)
+
+    def apply(self, manager):
+        for cmd in self.commands:
+            cmd.apply(manager)
+
+    def revert(self, manager):
+        for cmd in reversed(self.commands):
+            cmd.revert(manager)
+
+    def to_record(self):
+        return [self.KIND, [cmd.to_record() for cmd in self.commands]]
+
+
+COMMAND_TYPES = {
+    cls.KIND: cls
+    for cls in (AddItem, AddUnits, MoveItem, MoveItems, TrashItem, TrashItems, TrashUnits,
+                RestoreItems, DeleteBar, RenameBar, MergeBars)
+}
+
+
+def command_from_record(record):
+    """Rebuild a command from its to_record() form"""
+    if record[0] == Transaction.KIND:
+        return Transaction(command_from_record(r) for r in record[1])
+    return COMMAND_TYPES[record[0]](*record[1:])
+
+
+class Journal:
+    """
+    Bounded undo / redo journal:
+    - record(): push a command (clears redo)
+    - transaction(): group a burst of commands into one undo step
+    - undo() / redo(): apply exactly one step, O(1) lookups via manager.ball_index
+    - Optional persistence in the journal table (one row insert / delete per step)
+    """
+
+    def __init__(self, manager, depth=200, persist=False):
+        self.manager = manager
+        self.depth = depth
+        self.persist = persist
+
+        # Entries are (seq, command); seq is the journal table row id when persisted
+        self.undo_stack = deque(maxlen=depth)
+        self.redo_stack = deque(maxlen=depth)
+
+        self._group = None
+        self._replaying = False
+
+        # Next journal table row id (assigned here so writes can be queued)
+        self._next_seq = 1
+
+        if self.persist:
+            self._load()
+
+    # ---- recording ----
+
+    def record(self, cmd):
+        """
+        Record one mutation (ignored while undo / redo is replaying)
+        """
+        if self._replaying:
+            return
+        if self._group is not None:
+            self._group.append(cmd)
+            return
+
+        self._push(self.undo_stack, "undo", cmd)
+        while self.redo_stack:
+            self._drop(self.redo_stack.pop())
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group every record() inside the block into one undo step
+        """
+        if self._group is not None:
+            # Nested: merge into the outer transaction
+            yield
+            return
+
+        self._group = []
+        try:
+            yield
+        finally:
+            commands, self._group = self._group, None
+            if len(commands) == 1:
+                self.record(commands[0])
+            elif commands:
+                self.record(Transaction(commands))
+
+    # ---- undo / redo ----
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self):
+        """
+        Revert the latest step
+        :return: True if something was undone
+        """
+        if not self.undo_stack:
+            return False
+        entry = self.undo_stack.pop()
+        self._drop(entry)
+
+        self._replay(entry[1].revert)
+        self._push(self.redo_stack, "redo", entry[1])
+        return True
+
+    def redo(self):
+        """
+        Re-apply the latest undone step
+        :return: True if something was redone
+        """
+        if not self.redo_stack:
+            return False
+        entry = self.redo_stack.pop()
+        self._drop(entry)
+
+        self._replay(entry[1].apply)
+        self._push(self.undo_stack, "undo", entry[1])
+        return True
+
+    def clear(self):
+        """
+        Forget history (after empty trash / import, ids may no longer exist)
+        """
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        if self.persist:
+            run_async(_clear_rows)
+
+    def _replay(self, fn):
+        self._replaying = True
+        try:
+            fn(self.manager)
+        finally:
+            self._replaying = False
+
+    # ---- bounded stacks + persistence ----
+
+    def _push(self, stack, name, cmd):
+        if len(stack) == stack.maxlen:
+            # Oldest entry falls off the bounded deque
+            self._drop(stack[0])
+
+        seq = None
+        if self.persist:
+            seq = self._next_seq
+            self._next_seq += 1
+            run_async(_insert_row, seq, name, json.dumps(cmd.to_record()))
+
+        stack.append((seq, cmd))
+
+    def _drop(self, entry):
+        if self.persist and entry[0] is not None:
+            run_async(_delete_row, entry[0])
+
+    def _load(self):
+        """
+        Create the journal table and reload the last `depth` steps
+        """
+        conn = _connect()
+        cur = conn.cursor()
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                stack TEXT NOT NULL,
+                payload TEXT NOT NULL
+            )
+        """)
+        for name, stack in (("undo", self.undo_stack), ("redo", self.redo_stack)):
+            cur.execute("""
+                SELECT seq, payload FROM (
+                    SELECT seq, payload FROM journal
+                    WHERE stack = ?
+                    ORDER BY seq DESC
+                    LIMIT ?
+                ) ORDER BY seq
+            """, (name, self.depth))
+            for seq, payload in cur.fetchall():
+                stack.append((seq, command_from_record(json.loads(payload))))
+
+            # Trim rows beyond depth
+            cur.execute("""
+                DELETE FROM journal
+                WHERE stack = ? AND seq NOT IN (
+                    SELECT seq FROM journal WHERE stack = ? ORDER BY seq DESC LIMIT ?
+                )
+            """, (name, name, self.depth))
+
+        cur.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM journal")
+        self._next_seq = cur.fetchone()[0]
+
+        conn.commit()
+        conn.close()
+
+
+def _insert_row(seq, stack, payload):
+    conn = _connect()
+    conn.execute("INSERT INTO journal(seq, stack, payload) VALUES (?, ?, ?)", (seq, stack, payload))
+    conn.commit()
+    conn.close()
+
+
+def _delete_row(seq):
+    conn = _connect()
+    conn.execute("DELETE FROM journal WHERE seq = ?", (seq,))
+    conn.commit()
+    conn.close()
+
+
+def _clear_rows():
+    conn = _connect()
+    conn.execute("DELETE FROM journal")
+    conn.commit()
+    conn.close()
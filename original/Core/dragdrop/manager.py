@@ -4,11 +4,26 @@ Code linking display structure and functionality
 Do not modify
 """
 import tkinter as tk
+from datetime import date
+from tkinter import Menu
 from .ball import DraggableBall
-from .bar import TimelineBar
+from .bar import TimelineBar, BallCluster
 from .trash_bin import TrashBin
-from Core.list_generate import generate_from_sql
-from Core.add_item_sql import update_item_bar_name
+from .tooltip import Tooltip
+from .journal import Journal, MoveItem, MoveItems, RenameBar, MergeBars
+from Core.add_item_sql import (
+    update_item_bar, update_items_bar, load_all_items,
+    rename_bar_items, move_bar_items, day_ordinal
+)
+from Core.profiles import load_profile_items
+from Core.db_worker import run_async
+from Core.snapshot import ExpirySnapshot
+from Core.events import (
+    EventBus, ItemAdded, ItemRemoved, ItemMoved, ItemTrashed, UnitsChanged, UnitsReturned,
+    BarDeleted, BarRenamed, DbReloaded
+)
+from GUI.bar_name_dialog import bar_name_dialog
+from GUI.split_bar_dialog import split_bar_dialog
 
 class DragDropManager:
     """
@@ -20,8 +35,22 @@ class DragDropManager:
     """
 
     LEFT_AREA_WIDTH = 200
+    LEFT_BASE_Y = 60     # First slot of the left spawn list
+    LEFT_GAP = 60        # Vertical gap between left slots
     TIMELINE_GAP = 120   # Vertical gap between timelines
 
+    # Balls this far (px) above / below the viewport are drawn too,
+    # so short scrolls do not create canvas items
+    VIEW_MARGIN = 300
+
+    HIGHLIGHT_COLOR = "#ff9800"  # Search hit outline / title color
+    SELECT_COLOR = "#e91e63"     # Selected ball outline / rubber band
+    SELECT_TAG = "selected"      # Canvas items of selected balls (a group drag moves the tag)
+    SHIFT_MASK = 0x0001          # Shift bit of event.state
+
+    JOURNAL_DEPTH = 200      # Undo steps kept in memory
+    JOURNAL_PERSIST = False  # Also keep undo history in SQL (journal table)
+
     def __init__(self, main_window, canvas):
         self.main_window = main_window  # ⭐ Save MainWindow
         self.canvas = canvas
@@ -29,17 +58,472 @@ class DragDropManager:
         self.items = []
         self.bars = []
 
+        # item_id → ball (every ball in the scene, left area or timeline)
+        # Balls of overlaid profiles are keyed (profile, item_id)
+        self.ball_index = {}
+
+        # Other profiles shown read-only on top of the active one
+        self.overlay_profiles = []
+
+        # Views: only balls near the viewport have canvas items
+        self.views = {}           # canvas item id → ball / timeline / count badge
+        self.shown = set()        # balls that currently have canvas items
+        self.highlighted = set()  # item_ids of search hits (applied when drawn)
+        self._view_top = 0
+        self._view_bottom = canvas.winfo_height()
+        self._refresh_pending = False
+        self._yscroll = None
+
+        # Timelines waiting for a relayout (badge counts), flushed once per idle cycle
+        self._layout_pending = set()
+        self.expanded_bar = None   # Timeline with a fanned-out count badge
+
+        # Drag state (one drag at a time), the tooltip shared by all balls
+        # and the right-click menu shared by all timelines
+        self.dragging = None
+        self.drag_from = None
+        self._drag_moved = False
+
+        # Multi-selection (shift-click / rubber band), moved or trashed as a group
+        self.selection = set()
+        self._band = None   # [x, y, rectangle id, add] while a rubber band is drawn
+        self._tooltip = None
+        self._bar_menu = None
+        self._merge_menu = None
+        self._menu_bar = None
+        self._bind_events()
+
+        # Scene changes for the views (Info panel, trash preview, expiry alerts),
+        # delivered in one batch per idle cycle
+        self.events = EventBus(canvas)
+
+        # Columnar copy of the live items (whole-inventory bucket counts),
+        # subscribed first so it is current when the views get the same batch
+        self.snapshot = ExpirySnapshot()
+        self.events.subscribe(self.snapshot.on_events, *ExpirySnapshot.EVENT_KINDS)
+
+        # Undo / redo history
+        self.journal = Journal(self, depth=self.JOURNAL_DEPTH, persist=self.JOURNAL_PERSIST)
+
         # Correctly create trash bin
         self.trash_bin = TrashBin(self.main_window, self)
 
 
-    def create_ball(self, name, expired_day):
+    def create_ball(self, name, expired_day, item_id=None, quantity=1):
         """Create a new food ball (spawn in left area)"""
-        ball = DraggableBall(self.canvas, self, name, expired_day, 0, 0)
+        ball = DraggableBall(self, name, expired_day, item_id=item_id, quantity=quantity)
         self.items.append(ball)
+        if item_id is not None:
+            self._index_ball(item_id, ball)
         self.rebuild_left_area()
         return ball
 
+    def _index_ball(self, item_id, ball, restored=False):
+        """
+        Register ball under item_id and publish item_added
+        (call again after the item's data changed)
+        """
+        self.ball_index[item_id] = ball
+        if not ball.read_only:
+            self.events.publish(ItemAdded(
+                item_id, ball.name, ball.expired_day, _bar_name(ball), restored, ball.quantity
+            ))
+
+    def _unindex_ball(self, item_id, trashed=False):
+        """
+        Forget item_id and publish item_removed / item_trashed
+        (call before the ball leaves its timeline)
+        :return: its ball, or None
+        """
+        ball = self.ball_index.pop(item_id, None)
+        if ball is not None and not ball.read_only:
+            if trashed:
+                self.events.publish(ItemTrashed(
+                    item_id, ball.name, ball.expired_day, _bar_name(ball), ball.quantity
+                ))
+            else:
+                self.events.publish(ItemRemoved(item_id, ball.expired_day, _bar_name(ball), ball.quantity))
+        return ball
+
+    def _ball_moved(self, ball, old_bar_name):
+        """Publish item_moved for an indexed ball that changed timeline"""
+        if ball.read_only or self.ball_index.get(ball.item_id) is not ball:
+            return
+        self.events.publish(ItemMoved(
+            ball.item_id, ball.name, ball.expired_day, old_bar_name, _bar_name(ball), ball.quantity
+        ))
+
+    def _units_changed(self, ball, old_quantity):
+        """Publish units_changed for an indexed ball whose quantity changed in place"""
+        if ball.read_only or ball.quantity == old_quantity or self.ball_index.get(ball.item_id) is not ball:
+            return
+        self.events.publish(UnitsChanged(
+            ball.item_id, ball.name, ball.expired_day, _bar_name(ball), ball.quantity,
+            ball.quantity - old_quantity
+        ))
+
+    # ---- ball views ----
+
+    @property
+    def tooltip(self):
+        """Tooltip shared by every ball (created on first hover)"""
+        if self._tooltip is None:
+            self._tooltip = Tooltip(self.canvas.winfo_toplevel(), "")
+        return self._tooltip
+
+    def _bind_events(self):
+        """
+        One set of bindings on the "ball" and "bar" tags, made once for the
+        whole canvas (tag_bind creates a Tcl command per call, never freed);
+        the ball / timeline is found from the canvas item under the pointer
+        """
+        tag = DraggableBall.TAG
+        self.canvas.tag_bind(tag, "<ButtonPress-1>", self._on_ball_press)
+        self.canvas.tag_bind(tag, "<B1-Motion>", self._on_ball_drag)
+        self.canvas.tag_bind(tag, "<ButtonRelease-1>", self._on_ball_release)
+        self.canvas.tag_bind(tag, "<Enter>", self._on_ball_enter)
+        self.canvas.tag_bind(tag, "<Leave>", self._on_ball_leave)
+
+        self.canvas.tag_bind(TimelineBar.TAG, "<Button-3>", self._on_bar_menu)
+
+        self.canvas.tag_bind(TimelineBar.BADGE_TAG, "<Enter>", self._on_badge_enter)
+        self.canvas.bind("<Motion>", self._on_motion, add="+")
+
+        # Rubber band on the canvas itself (item bindings run first)
+        self.canvas.bind("<ButtonPress-1>", self._on_band_press, add="+")
+        self.canvas.bind("<B1-Motion>", self._on_band_drag, add="+")
+        self.canvas.bind("<ButtonRelease-1>", self._on_band_release, add="+")
+
+    def _view_at_pointer(self):
+        """Ball / timeline of the canvas item under the pointer (None if neither)"""
+        current = self.canvas.find_withtag("current")
+        return self.views.get(current[0]) if current else None
+
+    def _ball_at_pointer(self):
+        view = self._view_at_pointer()
+        return view if isinstance(view, DraggableBall) else None
+
+    def _on_ball_press(self, event):
+        ball = self._ball_at_pointer()
+        if event.state & self.SHIFT_MASK:
+            # Shift-click: add to / remove from the selection, no drag
+            self.dragging = None
+            if ball is not None:
+                self.toggle_selected(ball)
+            return
+
+        if ball not in self.selection:
+            self.clear_selection()
+        self.dragging = ball
+        self._drag_moved = False
+        if ball is not None:
+            ball.on_press(event)
+
+    def _on_ball_drag(self, event):
+        ball = self.dragging
+        if ball is None:
+            return
+        self._drag_moved = True
+        if self._group_drag(ball):
+            self._drag_group(ball, event)
+        else:
+            ball.on_drag(event)
+
+    def _on_ball_release(self, event):
+        ball, self.dragging = self.dragging, None
+        if ball is None:
+            return
+        if self._group_drag(ball):
+            self.drag_from = None
+            if self._drag_moved:
+                self.drop_selection(ball)
+            return
+        ball.on_release(event)
+
+    def _group_drag(self, ball):
+        return ball in self.selection and len(self.selection) > 1
+
+    def _drag_group(self, ball, event):
+        """Every drawn selected ball follows the pointer (one move of the selection tag)"""
+        if self.drag_from is None:
+            return
+        last_x, last_y = self.drag_from
+        dx = event.x - last_x
+        dy = event.y - last_y
+
+        self.canvas.tag_raise(self.SELECT_TAG)
+        self.canvas.move(self.SELECT_TAG, dx, dy)
+        ball.x += dx
+        ball.y += dy
+
+        self.drag_from = (event.x, event.y)
+
+    def _on_ball_enter(self, event):
+        ball = self._ball_at_pointer()
+        if ball is None or self.dragging is not None:
+            return
+        r = DraggableBall.RADIUS
+
+        # Canvas coordinate → absolute screen coordinate
+        screen_x = self.canvas.winfo_rootx() + ball.x - self.canvas.canvasx(0) + r + 4
+        screen_y = self.canvas.winfo_rooty() + ball.y - self.canvas.canvasy(0) + r + 4
+
+        self.tooltip.text = ball.tooltip_text()
+        self.tooltip.show(screen_x, screen_y)
+
+    def _on_ball_leave(self, event):
+        self.hide_tooltip()
+
+    def hide_tooltip(self):
+        if self._tooltip is not None:
+            self._tooltip.hide()
+
+    def _on_badge_enter(self, event):
+        """Hover on a count badge: fan its balls out"""
+        cluster = self._view_at_pointer()
+        if not isinstance(cluster, BallCluster) or self.dragging is not None:
+            return
+        cluster.bar.expand(cluster)
+
+    def _on_motion(self, event):
+        """Fold the fanned-out badge back once the pointer leaves its area"""
+        bar = self.expanded_bar
+        if bar is None or bar.expanded is None or self.dragging is not None:
+            return
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        x1, y1, x2, y2 = bar.expanded.area
+        if not (x1 <= x <= x2 and y1 <= y <= y2):
+            bar.collapse()
+
+    # ---- selection ----
+
+    def select(self, balls, add=False):
+        """Select balls (read-only balls are skipped); add keeps the current selection"""
+        if not add:
+            self.clear_selection()
+        for ball in balls:
+            if not ball.read_only and ball not in self.selection:
+                self.selection.add(ball)
+                ball.restyle()
+
+    def toggle_selected(self, ball):
+        if ball in self.selection:
+            self.selection.discard(ball)
+            ball.restyle()
+        else:
+            self.select([ball], add=True)
+
+    def clear_selection(self):
+        selection, self.selection = self.selection, set()
+        for ball in selection:
+            ball.restyle()
+
+    def live_selection(self):
+        """Selected balls still in the scene"""
+        return [b for b in self.selection if self.ball_index.get(b.item_id) is b]
+
+    def balls_in_area(self, x1, y1, x2, y2):
+        """
+        Balls centered inside a canvas rectangle, drawn or not
+        (only the left list and the timelines crossing the rectangle are visited)
+        """
+        x1, x2 = sorted((x1, x2))
+        y1, y2 = sorted((y1, y2))
+
+        def inside(b):
+            return x1 <= b.x <= x2 and y1 <= b.y <= y2
+
+        found = [b for b in self.items if b.current_bar is None and inside(b)]
+        for bar in self.bars:
+            if bar.y + bar.HEIGHT >= y1 and bar.y <= y2:
+                found.extend(b for b in bar.balls if inside(b))
+        return [b for b in found if not b.read_only]
+
+    def _on_band_press(self, event):
+        if self.dragging is not None or isinstance(self._view_at_pointer(), (DraggableBall, BallCluster)):
+            return
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        self._band = [x, y, None, bool(event.state & self.SHIFT_MASK)]
+
+    def _on_band_drag(self, event):
+        if self._band is None:
+            return
+        x0, y0, rect, _ = self._band
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        if rect is None:
+            self._band[2] = self.canvas.create_rectangle(
+                x0, y0, x, y, outline=self.SELECT_COLOR, dash=(4, 2)
+            )
+        else:
+            self.canvas.coords(rect, x0, y0, x, y)
+
+    def _on_band_release(self, event):
+        """Select what the band covers (a plain click on empty canvas clears the selection)"""
+        band, self._band = self._band, None
+        if band is None:
+            return
+        x0, y0, rect, add = band
+        if rect is not None:
+            self.canvas.delete(rect)
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        self.select(self.balls_in_area(x0, y0, x, y), add=add)
+
+    def drop_selection(self, ball):
+        """
+        Selection released with ball under the pointer: same targets as a single
+        ball (timeline, trash, otherwise the left area), applied to the whole group
+        """
+        balls = self.live_selection()
+        bar = self.bar_at(ball.y)
+        if bar is not None:
+            self.move_balls(balls, bar)
+        elif self.over_trash(ball):
+            self.trash_bin.put_balls_in_trash(balls)
+        else:
+            self.move_balls(balls, None)
+
+    def collapse_expanded(self):
+        if self.expanded_bar is not None:
+            self.expanded_bar.collapse()
+
+    def schedule_layout(self, bar):
+        """Lay a timeline out again once per idle cycle (bulk removals)"""
+        if not self._layout_pending:
+            self.canvas.after_idle(self._flush_layouts)
+        self._layout_pending.add(bar)
+
+    def _flush_layouts(self):
+        pending, self._layout_pending = self._layout_pending, set()
+        for bar in pending:
+            if bar in self.bars:
+                bar._layout_balls()
+
+    def _on_bar_menu(self, event):
+        """Right-click on a timeline: shared menu, acting on that timeline"""
+        bar = self._view_at_pointer()
+        if not isinstance(bar, TimelineBar):
+            return
+        if self._bar_menu is None:
+            self._bar_menu = Menu(self.canvas, tearoff=0)
+            self._merge_menu = Menu(self._bar_menu, tearoff=0)
+            self._bar_menu.add_command(label="Rename...", command=self._rename_menu_bar)
+            self._bar_menu.add_cascade(label="Merge Into", menu=self._merge_menu)
+            self._bar_menu.add_command(label="Split...", command=self._split_menu_bar)
+            self._bar_menu.add_separator()
+            self._bar_menu.add_command(label="Delete This Bar", command=self._delete_menu_bar)
+
+        # Merge targets: every other timeline
+        self._merge_menu.delete(0, "end")
+        for other in self.bars:
+            if other is not bar:
+                self._merge_menu.add_command(
+                    label=other.bar_name,
+                    command=lambda name=other.bar_name: self._merge_menu_bar(name)
+                )
+
+        self._menu_bar = bar
+        self._bar_menu.tk_popup(event.x_root, event.y_root)
+
+    def _take_menu_bar(self):
+        """Timeline the menu was opened on (None if it is gone meanwhile)"""
+        bar, self._menu_bar = self._menu_bar, None
+        return bar if bar in self.bars else None
+
+    def _delete_menu_bar(self):
+        bar = self._take_menu_bar()
+        if bar is not None:
+            bar._delete_self()
+
+    def _rename_menu_bar(self):
+        bar = self._take_menu_bar()
+        if bar is None:
+            return
+        name = bar_name_dialog(self.canvas, title="Rename Bar",
+                               prompt="New name (an existing bar is merged):")
+        if name:
+            self.rename_bar(bar.bar_name, name)
+
+    def _merge_menu_bar(self, target_name):
+        bar = self._take_menu_bar()
+        if bar is not None:
+            self.rename_bar(bar.bar_name, target_name)
+
+    def _split_menu_bar(self):
+        bar = self._take_menu_bar()
+        if bar is None:
+            return
+        data = split_bar_dialog(self.canvas, bar.bar_name)
+        if not data:
+            return
+        new_name, min_days, max_days, name_filter = data
+
+        # Days left → expiry day ordinals
+        today = date.today().toordinal()
+        self.split_bar(
+            bar.bar_name, new_name,
+            None if min_days is None else today + min_days,
+            None if max_days is None else today + max_days,
+            name_filter
+        )
+
+    def set_scrollbar(self, scrollbar):
+        """Connect the vertical scrollbar (yscrollcommand also refreshes the views)"""
+        self._yscroll = scrollbar.set
+        scrollbar.config(command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+
+    def _on_yscroll(self, first, last):
+        if self._yscroll is not None:
+            self._yscroll(first, last)
+        self.schedule_refresh()
+
+    def in_view(self, y):
+        """Whether a ball at canvas y should be drawn (viewport of the last refresh)"""
+        return self._view_top - self.VIEW_MARGIN <= y <= self._view_bottom + self.VIEW_MARGIN
+
+    def schedule_refresh(self):
+        """refresh_visible once per idle cycle (scroll events come in bursts)"""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.canvas.after_idle(self.refresh_visible)
+
+    def refresh_visible(self):
+        """
+        Draw the balls near the viewport and drop the canvas items of the others
+        (scroll / resize); only left slots and timelines in range are visited
+        """
+        self._refresh_pending = False
+        self._view_top = self.canvas.canvasy(0)
+        self._view_bottom = self._view_top + self.canvas.winfo_height()
+        low = self._view_top - self.VIEW_MARGIN
+        high = self._view_bottom + self.VIEW_MARGIN
+
+        wanted = set()
+        left_balls = [b for b in self.items if b.current_bar is None]
+        first = max(0, int((low - self.LEFT_BASE_Y) // self.LEFT_GAP))
+        last = max(0, int((high - self.LEFT_BASE_Y) // self.LEFT_GAP) + 1)
+        wanted.update(b for b in left_balls[first:last] if low <= b.y <= high)
+
+        for bar in self.bars:
+            if bar.y + bar.HEIGHT >= low and bar.y <= high:
+                wanted.update(bar.drawn_balls())
+
+        for ball in self.shown - wanted:
+            if ball is not self.dragging:
+                ball.hide()
+        for ball in wanted - self.shown:
+            ball.show()
+
+    def content_height(self):
+        """Height of the laid-out scene (left list or timelines, whichever is longer)"""
+        left = self.LEFT_BASE_Y + len(self.items) * self.LEFT_GAP
+        bars = 50 + len(self.bars) * self.TIMELINE_GAP
+        return max(left, bars)
+
+    def update_scrollregion(self):
+        """Scroll region from the layout (not bbox("all"): most balls are not drawn)"""
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), self.content_height()))
+
     def _on_release(self, event):
         """Snapping logic"""
         # Try snapping to timeline
@@ -60,30 +544,49 @@ class DragDropManager:
         - Removing from timeline if present
         - Ensuring it is in items list
         - Rebuilding left area layout
+        :return: fold record (see fold_ball) if it folded into an identical entry, else None
         """
 
         # Remove from timeline if needed
         if ball.current_bar:
+            old_bar_name = ball.current_bar.bar_name
+            into = self.fold_targets([ball], None).get(ball)
+            if into is not None:
+                # Identical entry in the left area: it takes the units
+                merged = self.fold_ball(ball, into)
+                self.journal.record(MoveItem(ball.item_id, old_bar_name, None, merged))
+                run_async(update_item_bar, ball.item_id, None,
+                          on_done=lambda row: self._landed({ball.item_id: into.item_id}, [row]))
+                return merged
+            self.journal.record(MoveItem(ball.item_id, old_bar_name, None))
             ball.current_bar.remove_ball(ball)
             ball.current_bar = None
+            self._ball_moved(ball, old_bar_name)
 
         # Add back to items list
         if ball not in self.items:
-            update_item_bar_name(ball.name, None)
             self.items.append(ball)
+            run_async(update_item_bar, ball.item_id, None,
+                      on_done=lambda row: self._landed({ball.item_id: None}, [row]))
 
         self.rebuild_left_area()
+        return None
 
-    def rebuild_left_area(self):
-        """Rebuild left spawn list"""
+    def rebuild_left_area(self, start=0):
+        """
+        Rebuild left spawn list
+        :param start: first slot that may have changed (slots above keep their position)
+        """
         left_balls = [b for b in self.items if b.current_bar is None]
 
         base_x = self.LEFT_AREA_WIDTH // 2
-        base_y = 60
-        gap = 60
+        base_y = self.LEFT_BASE_Y
+        gap = self.LEFT_GAP
+
+        for i in range(start, len(left_balls)):
+            left_balls[i].set_position(base_x, base_y + i * gap)
 
-        for i, ball in enumerate(left_balls):
-            ball.set_position(base_x, base_y + i * gap)
+        self.update_scrollregion()
 
 
     def add_bar(self, bar_name):
@@ -91,6 +594,326 @@ class DragDropManager:
         y = 50 + len(self.bars) * self.TIMELINE_GAP
         bar = TimelineBar(canvas=self.canvas, manager=self, y=y, bar_name=bar_name)
         self.bars.append(bar)
+        self.update_scrollregion()
+        return bar
+
+    def bar_by_name(self, bar_name):
+        """Find timeline by name (None if not present)"""
+        for bar in self.bars:
+            if bar.bar_name == bar_name:
+                return bar
+        return None
+
+    def move_item(self, item_id, bar_name):
+        """
+        Move one item to a timeline (created if missing) or back to the left (bar_name None)
+        Used by undo / redo
+        :return: fold record (see fold_ball) if it folded into an identical entry, else None
+        """
+        ball = self.ball_index.get(item_id)
+        if ball is None:
+            return None
+
+        if bar_name is None:
+            return self.return_ball_to_left(ball)
+        bar = self.bar_by_name(bar_name) or self.add_bar(bar_name)
+        return bar.snap_ball(ball)
+
+    def move_items(self, item_ids, bar_name):
+        """
+        Move many items to a timeline (created if missing) or back to the left
+        (bar_name None). Used by undo / redo of a group move
+        :return: fold records (see move_balls)
+        """
+        balls = [self.ball_index[i] for i in item_ids if i in self.ball_index]
+        bar = None if bar_name is None else (self.bar_by_name(bar_name) or self.add_bar(bar_name))
+        return self.move_balls(balls, bar)
+
+    def move_balls(self, balls, bar, sql=None):
+        """
+        Move many balls onto a timeline (bar None = left area) as one step:
+        one journal entry, one SQL transaction, one relayout per touched timeline.
+        Balls identical to an entry there fold into it (see fold_targets)
+        :param sql: (function, *args) queued instead of update_items_bar, for callers
+                    that move the rows by timeline / filter (same result rows)
+        :return: fold records [item_id, into, units, item_name, expired_day]
+        """
+        balls = [b for b in balls if not b.read_only and self.ball_index.get(b.item_id) is b]
+        moving = [b for b in balls if b.current_bar is not bar]
+        sources = {b.current_bar for b in moving}
+        merged = []
+
+        if moving:
+            new_name = bar.bar_name if bar else None
+            old_names = [_bar_name(b) for b in moving]
+            folds = self.fold_targets(moving, bar)
+            expected = {b.item_id: (folds[b].item_id if b in folds else None) for b in moving}
+
+            # Folded balls leave the scene (published under the timeline they left)
+            for b in folds:
+                self._unindex_ball(b.item_id)
+
+            moving_set = set(moving)
+            self.selection -= folds.keys()
+            for source in sources:
+                if source is None:
+                    self.items[:] = [b for b in self.items if b not in moving_set]
+                else:
+                    source.detach_balls(moving_set)
+
+            target = bar.balls if bar else self.items
+            for b, old_name in zip(moving, old_names):
+                if b in folds:
+                    continue
+                b.current_bar = bar
+                target.append(b)
+                self._ball_moved(b, old_name)
+
+            if folds:
+                self.hide_tooltip()
+            for b, into in folds.items():
+                b.delete_graphics()
+                self.add_units(into.item_id, b.quantity)
+                merged.append([b.item_id, into.item_id, b.quantity, b.name, b.expired_day])
+
+            self.journal.record(MoveItems([b.item_id for b in moving], old_names, new_name, merged))
+
+            func, *args = sql or (update_items_bar, [b.item_id for b in moving], new_name)
+            run_async(func, *args, on_done=lambda rows: self._landed(expected, rows))
+
+        # Balls already on the target were dragged too: lay it out as well
+        for b in (sources | {bar}) - {None}:
+            if b in self.bars:
+                b._layout_balls()
+        if bar is None or None in sources:
+            self.rebuild_left_area()
+        return merged
+
+    def fold_targets(self, balls, bar):
+        """
+        Entries the given balls fold into when they land on bar (None = left area),
+        as _land_rows decides in SQL: an identical (name, expiry date) entry already
+        there (lowest item_id), else the lowest item_id of the identical balls landing
+        :return: {ball: entry ball} for the balls that fold
+        """
+        landing = set(balls)
+        here = bar.balls if bar else [b for b in self.items if b.current_bar is None]
+
+        entries = {}
+        for b in here:
+            if b.read_only or b in landing:
+                continue
+            key = (b.name, b.expired_day)
+            if key not in entries or b.item_id < entries[key].item_id:
+                entries[key] = b
+
+        folds = {}
+        for b in sorted(balls, key=lambda b: b.item_id):
+            key = (b.name, b.expired_day)
+            if key in entries:
+                folds[b] = entries[key]
+            else:
+                entries[key] = b
+        return folds
+
+    def fold_ball(self, ball, into):
+        """
+        Ball landed next to an identical entry: it leaves the scene, into takes its units
+        :return: fold record [into, units, item_name, expired_day] (MoveItem.merged)
+        """
+        merged = [into.item_id, ball.quantity, ball.name, ball.expired_day]
+        self.selection.discard(ball)
+        self.remove_item(ball.item_id)
+        self.add_units(into.item_id, merged[1])
+        return merged
+
+    def _landed(self, expected, rows):
+        """
+        SQL result of a move (update_items_bar & co.): if the rows folded otherwise
+        than the canvas did (scene out of date), re-read the scene
+        :param expected: {item_id: entry it folded into, or None} as done on the canvas
+        """
+        if {r["item_id"]: r["into"] for r in rows if r is not None} != expected:
+            self.reconcile_async()
+
+    def rename_bar(self, bar_name, new_name):
+        """
+        Rename a timeline, or merge it into the timeline already called new_name
+        (items identical to an entry there fold into it): one SQL transaction and
+        one canvas update, whatever the item count
+        :return: fold records (see move_balls)
+        """
+        bar = self.bar_by_name(bar_name)
+        if bar is None or not new_name or new_name == bar_name:
+            return []
+        target = self.bar_by_name(new_name)
+        own = [b for b in bar.balls if not b.read_only]
+        merged = []
+
+        if target is None:
+            expected = {b.item_id: None for b in own}
+            self.journal.record(RenameBar(bar_name, new_name))
+            bar.rename(new_name)
+        else:
+            # Items identical to an entry of the target fold into it
+            folds = self.fold_targets(own, target)
+            expected = {b.item_id: (folds[b].item_id if b in folds else None) for b in own}
+            for b, into in folds.items():
+                merged.append([b.item_id, into.item_id, b.quantity, b.name, b.expired_day])
+                self._unindex_ball(b.item_id)
+                b.delete_graphics()
+                self.add_units(into.item_id, b.quantity)
+            self.selection -= folds.keys()
+            self.journal.record(MergeBars(bar_name, new_name, [b.item_id for b in own], merged))
+
+            balls, bar.balls = [b for b in bar.balls if b not in folds], []
+            for b in balls:
+                b.current_bar = target
+            target.balls.extend(balls)
+            target._layout_balls()
+            self._delete_bar(bar)
+
+        # One event for the whole timeline (views relabel / recount), not one per item
+        self.events.publish(BarRenamed(bar_name, new_name))
+        run_async(rename_bar_items, bar_name, new_name, on_done=lambda rows: self._landed(expected, rows))
+        return merged
+
+    def split_bar(self, bar_name, new_name, first_day=None, last_day=None, name_filter=None):
+        """
+        Move the items of a timeline that match an expiry range (day ordinals,
+        inclusive) and / or a name filter (case-sensitive substring) to new_name
+        (created if missing): one SQL transaction, one group move on the canvas
+        :return: number of moved items
+        """
+        bar = self.bar_by_name(bar_name)
+        if bar is None or not new_name or new_name == bar_name:
+            return 0
+
+        days = {}   # expired_day → ordinal (a few hundred distinct dates)
+
+        def matches(ball):
+            if name_filter and name_filter not in ball.name:
+                return False
+            if first_day is None and last_day is None:
+                return True
+            if ball.expired_day not in days:
+                days[ball.expired_day] = day_ordinal(ball.expired_day)
+            day = days[ball.expired_day]
+            return day is not None and (first_day is None or day >= first_day) \
+                and (last_day is None or day <= last_day)
+
+        balls = [b for b in bar.balls if not b.read_only and matches(b)]
+        if not balls:
+            return 0
+
+        target = self.bar_by_name(new_name) or self.add_bar(new_name)
+        self.move_balls(balls, target, sql=(move_bar_items, bar_name, new_name, first_day, last_day, name_filter))
+        return len(balls)
+
+    def place_item(self, row, restored=False):
+        """
+        Create a ball for one SQL row and put it on its timeline or in the left area
+        Used by undo / redo (restored: the row came back from the trash)
+        """
+        self.place_items([row], restored)
+
+    def place_items(self, rows, restored=False):
+        """
+        Create balls for many SQL rows, then one relayout per touched timeline
+        and one of the left area
+        """
+        left_start = len(self.items)
+        bars = {bar.bar_name: bar for bar in self.bars}
+        touched = set()
+
+        for row in rows:
+            ball = DraggableBall(
+                self, row["item_name"], row["expired_day"],
+                item_id=row["item_id"], quantity=row.get("quantity", 1)
+            )
+            if row["bar_name"] is not None:
+                bar = bars.get(row["bar_name"])
+                if bar is None:
+                    bar = bars[row["bar_name"]] = self.add_bar(row["bar_name"])
+                bar.balls.append(ball)
+                ball.current_bar = bar
+                touched.add(bar)
+            else:
+                self.items.append(ball)
+            self._index_ball(row["item_id"], ball, restored)
+
+        for bar in touched:
+            bar._layout_balls()
+        if len(self.items) > left_start:
+            self.rebuild_left_area(left_start)
+
+    def add_units(self, item_id, delta):
+        """
+        Change the quantity shown on an entry's ball (no SQL)
+        Used by Add Item (units stocked onto an existing entry), trash, undo / redo
+        """
+        ball = self.ball_index.get(item_id)
+        if ball is not None:
+            old_quantity = ball.quantity
+            ball.set_quantity(max(1, ball.quantity + delta))
+            self._units_changed(ball, old_quantity)
+
+    def return_ball_home(self, ball):
+        """Put a dragged ball back in its slot (timeline position or left list)"""
+        if ball.current_bar:
+            ball.current_bar._layout_balls()
+        elif ball in self.items:
+            self.rebuild_left_area(self.items.index(ball))
+
+    def remove_item(self, item_id, trashed=False):
+        """
+        Remove one ball from the scene (no SQL)
+        Used by undo / redo (trashed: the row goes to the trash)
+        """
+        ball = self._unindex_ball(item_id, trashed)
+        if ball is None:
+            return
+
+        if ball.current_bar:
+            ball.current_bar.remove_ball(ball)
+        else:
+            index = self.items.index(ball)
+            self.items.pop(index)
+            self.rebuild_left_area(index)
+
+        self.hide_tooltip()
+        ball.delete_graphics()
+
+    def remove_items(self, item_ids, trashed=False):
+        """Remove many balls from the scene (no SQL). Used by undo / redo"""
+        self.remove_balls([self.ball_index[i] for i in item_ids if i in self.ball_index], trashed)
+
+    def remove_balls(self, balls, trashed=False):
+        """
+        Remove many balls from the scene (no SQL): one pass per timeline they
+        leave, one relayout each, one relayout of the left area
+        """
+        balls = [b for b in balls if self.ball_index.get(b.item_id) is b]
+        for b in balls:
+            self._unindex_ball(b.item_id, trashed)
+
+        gone = set(balls)
+        self.selection -= gone
+        sources = {b.current_bar for b in balls}
+        for source in sources:
+            if source is None:
+                self.items[:] = [b for b in self.items if b not in gone]
+            else:
+                source.detach_balls(gone)
+
+        self.hide_tooltip()
+        for b in balls:
+            b.delete_graphics()
+
+        for source in sources - {None}:
+            source._layout_balls()
+        if None in sources:
+            self.rebuild_left_area()
 
     def _delete_bar(self, bar):
         """
@@ -102,11 +925,11 @@ class DragDropManager:
         bar.delete_graphics()
 
         self.bars.remove(bar)
+        self.events.publish(BarDeleted(bar.bar_name))
 
-        # Reposition remaining timelines
+        # Shift the timelines below up (one tag move each, nothing is redrawn)
         for i, b in enumerate(self.bars):
-            b.y = 50 + i * self.TIMELINE_GAP
-            b.redraw()
+            b.move_to(50 + i * self.TIMELINE_GAP)
 
         # Rebuild left area
         self.rebuild_left_area()
@@ -123,24 +946,94 @@ class DragDropManager:
             if ball.current_bar:
                 ball.current_bar._reposition_ball(ball)
 
+        self.update_scrollregion()
+        self.refresh_visible()
+
+    def highlight_items(self, item_ids, bar_names=()):
+        """
+        Highlight search hits by tagging canvas items (no redraw):
+        - balls get the "search_hit" tag (balls drawn later get it in DraggableBall.show)
+        - timeline titles get the "search_hit_bar" tag
+        :return: first highlighted ball (or None)
+        """
+        self.clear_highlight()
+        self.highlighted = set(item_ids)
+
+        first = None
+        for item_id in item_ids:
+            ball = self.ball_index.get(item_id)
+            if ball is None:
+                continue
+            if ball.ball_id is not None:
+                self.canvas.addtag_withtag("search_hit", ball.ball_id)
+            if first is None:
+                first = ball
+
+        for bar in self.bars:
+            if bar.bar_name in bar_names and bar.text_ids:
+                self.canvas.addtag_withtag("search_hit_bar", bar.text_ids[0])
+
+        self.canvas.itemconfig("search_hit", outline=self.HIGHLIGHT_COLOR, width=4)
+        self.canvas.itemconfig("search_hit_bar", fill=self.HIGHLIGHT_COLOR)
+
+        # Hits hidden behind a count badge outline the badge
+        for bar in self.bars:
+            bar.highlight_badges()
+        return first
+
+    def clear_highlight(self):
+        """Remove search highlight from every tagged item"""
+        self.highlighted = set()
+        self.canvas.itemconfig("search_hit", outline="black", width=2)
+        self.canvas.itemconfig("search_hit_bar", fill="black")
+        self.canvas.dtag("search_hit", "search_hit")
+        self.canvas.dtag("search_hit_bar", "search_hit_bar")
+        for bar in self.bars:
+            bar.highlight_badges()
+
+    def scroll_to_ball(self, ball):
+        """
+        Scroll the canvas vertically so the ball is in view
+        """
+        self.update_scrollregion()
+
+        height = self.content_height()
+        view = self.canvas.winfo_height()
+        if height <= view:
+            return
+
+        _, y = ball._center()
+        self.canvas.yview_moveto(max(0.0, (y - view / 2) / height))
+        self.refresh_visible()
+
     def try_snap_to_bar(self, ball):
         """
         Try snapping ball onto a timeline
         """
-        bx, by = ball._center()
+        bar = self.bar_at(ball.y)
+        if bar is None:
+            return False
+        bar.snap_ball(ball)
+        return True
 
+    def bar_at(self, y):
+        """Timeline a ball dropped at canvas y snaps to (None if none)"""
         for bar in self.bars:
-            if abs(by - bar.y) < 40:
-                bar.snap_ball(ball)
-                return True
-
-        return False
+            if abs(y - bar.y) < 40:
+                return bar
+        return None
 
     def try_snap_to_trash(self, ball):
         """
         Check whether ball enters trash bin hitbox
         """
+        if not self.over_trash(ball):
+            return False
+        self.trash_bin.put_ball_in_trash(ball)
+        return True
 
+    def over_trash(self, ball):
+        """Whether ball's center is over the trash bin widget"""
         bx, by = ball._center()
 
         # Trash bin widget screen coordinates
@@ -150,40 +1043,236 @@ class DragDropManager:
         x2 = x1 + bin_widget.winfo_width()
         y2 = y1 + bin_widget.winfo_height()
 
-        # Canvas → screen coordinate
-        screen_x = self.canvas.winfo_rootx() + bx
-        screen_y = self.canvas.winfo_rooty() + by
+        # Canvas → screen coordinate (the canvas may be scrolled)
+        screen_x = self.canvas.winfo_rootx() + bx - self.canvas.canvasx(0)
+        screen_y = self.canvas.winfo_rooty() + by - self.canvas.canvasy(0)
 
         # Check if ball is inside trash area
-        if x1 <= screen_x <= x2 and y1 <= screen_y <= y2:
-            self.trash_bin.put_ball_in_trash(ball)
-            return True
-
-        return False
+        return x1 <= screen_x <= x2 and y1 <= screen_y <= y2
 
 
     def load_from_sql_initial(self):
         """
         Initial loading on program start:
-        - Do not clear UI (since no balls/timelines created yet)
-        - Create timelines + balls directly from SQL data
+        - Scene is empty, so reconciliation simply creates everything
+        """
+        self.reconcile_from_sql()
+
+    def reload_from_sql(self, on_done=None):
+        """
+        Re-hydrate the scene in place (after database import / profile switch).
+        Rows are read on the DB worker; the canvas diff is applied on the Tk thread.
         """
+        self.journal.clear()
 
-        items_list, bar_name_list = generate_from_sql()
+        def reloaded(changed):
+            self.events.publish(DbReloaded())
+            if on_done is not None:
+                on_done(changed)
 
-        # Create timelines
-        for bar_name in bar_name_list:
-            self.add_bar(bar_name)
+        self.reconcile_async(reloaded)
 
-        # Create balls
-        for item_name, expired_day, bar_name in items_list:
-            ball = self.create_ball(item_name, expired_day)
+    def set_overlay_profiles(self, profiles):
+        """
+        Show items of other profiles (read-only, grey) next to the active ones.
+        Only the difference is applied to the canvas.
+        """
+        self.overlay_profiles = list(profiles)
+        self.reconcile_async()
 
-            # If ball belongs to timeline, snap it
-            for bar in self.bars:
-                if bar.bar_name == bar_name:
-                    bar.snap_ball(ball)
-                    break
+    def restore_balls(self, rows):
+        """
+        Create balls for rows restored from the trash in the left area, then one relayout
+        Rows whose units went onto an identical live entry (row["into"]) raise its count
+        :param rows: dicts with item_id / item_name / expired_day / quantity / into
+        """
+        start = len(self.items)
+        merged = []
+        for row in rows:
+            if row.get("into") is not None:
+                merged.append(row)
+                continue
+            ball = DraggableBall(
+                self, row["item_name"], row["expired_day"],
+                item_id=row["item_id"], quantity=row.get("quantity", 1)
+            )
+            self.items.append(ball)
+            self._index_ball(row["item_id"], ball, restored=True)
 
-        # Rebuild left spawn area
-        self.rebuild_left_area()
+        self.rebuild_left_area(start)
+
+        for row in merged:
+            self.add_units(row["into"], row["quantity"])
+            self.events.publish(UnitsReturned(row["into"], row["item_id"]))
+
+    def fold_restored(self, rows):
+        """
+        Settle balls placed ahead of a restore (undo / redo) with its SQL result:
+        a row whose units went onto an identical live entry loses its ball,
+        the entry's count goes up
+        :param rows: restored rows from restore_item / restore_items
+        """
+        for row in rows:
+            if row["into"] is not None:
+                self.remove_item(row["item_id"])
+                self.add_units(row["into"], row["quantity"])
+
+    def reconcile_from_sql(self):
+        """
+        Bring the scene in line with the SQL contents (synchronous read)
+        :return: number of changed items
+        """
+        return self.apply_scene_rows(load_scene_rows(self.overlay_profiles))
+
+    def reconcile_async(self, on_done=None):
+        """
+        Same as reconcile_from_sql, but the SQL read runs on the DB worker
+        :param on_done: optional callback(changed_count) on the Tk thread
+        """
+        def apply(wanted):
+            changed = self.apply_scene_rows(wanted)
+            if on_done is not None:
+                on_done(changed)
+
+        run_async(load_scene_rows, list(self.overlay_profiles), on_done=apply)
+
+    def apply_scene_rows(self, wanted):
+        """
+        Diff the scene against wanted rows, keyed by item_id.
+        Only balls / timelines that actually differ are created, moved or deleted;
+        layout is applied once at the end.
+        :param wanted: {item_id: row} from load_scene_rows
+        :return: number of changed items
+        """
+        wanted_bars = sorted({row["bar_name"] for row in wanted.values() if row["bar_name"] is not None})
+
+        # Timelines holding items now; an empty one (just created, not filled yet) stays
+        held = {bar for bar in self.bars if bar.balls}
+
+        changed = 0
+        left_start = None   # first left slot that shifted
+        left_added = []
+        reposition = []
+
+        # 1. Delete balls that no longer exist
+        for item_id in [i for i in self.ball_index if i not in wanted]:
+            ball = self._unindex_ball(item_id)
+            if ball.current_bar:
+                ball.current_bar.remove_ball(ball)
+            else:
+                left_start = self._remove_from_left(ball, left_start)
+            ball.delete_graphics()
+            changed += 1
+
+        # 2. Create missing timelines
+        bars_by_name = {bar.bar_name: bar for bar in self.bars}
+        for bar_name in wanted_bars:
+            if bar_name not in bars_by_name:
+                self.add_bar(bar_name)
+                bars_by_name[bar_name] = self.bars[-1]
+
+        # 3. Create new balls, move / update changed ones
+        for item_id, row in wanted.items():
+            target = bars_by_name.get(row["bar_name"]) if row["bar_name"] is not None else None
+            ball = self.ball_index.get(item_id)
+
+            if ball is None:
+                ball = DraggableBall(
+                    self, row["item_name"], row["expired_day"],
+                    item_id=item_id, read_only=isinstance(item_id, tuple),
+                    quantity=row.get("quantity", 1)
+                )
+                if target:
+                    target.attach_ball(ball)
+                    reposition.append(ball)
+                else:
+                    self.items.append(ball)
+                    left_added.append(ball)
+                self._index_ball(item_id, ball)
+                changed += 1
+                continue
+
+            # Units changed: label only (same entry, same place)
+            quantity_changed = ball.quantity != row.get("quantity", 1)
+            if quantity_changed:
+                old_quantity = ball.quantity
+                ball.set_quantity(row.get("quantity", 1))
+                self._units_changed(ball, old_quantity)
+
+            moved = ball.current_bar is not target
+            data_changed = ball.name != row["item_name"] or ball.expired_day != row["expired_day"]
+            if not moved and not data_changed:
+                changed += quantity_changed
+                continue
+            changed += 1
+
+            if data_changed:
+                self._unindex_ball(item_id)
+            days_changed = ball.update_data(row["item_name"], row["expired_day"]) if data_changed else False
+
+            if moved:
+                if ball.current_bar is None:
+                    left_start = self._remove_from_left(ball, left_start)
+                if target:
+                    target.attach_ball(ball)
+                    reposition.append(ball)
+                else:
+                    old_bar_name = ball.current_bar.bar_name
+                    ball.current_bar.remove_ball(ball)
+                    self.items.append(ball)
+                    left_added.append(ball)
+                    self._ball_moved(ball, old_bar_name)
+            elif days_changed and ball.current_bar:
+                reposition.append(ball)
+
+            if data_changed:
+                self._index_ball(item_id, ball)
+
+        # 4. Remove timelines whose items all left SQL
+        wanted_set = set(wanted_bars)
+        stale_bars = [bar for bar in self.bars if bar in held and bar.bar_name not in wanted_set]
+        for bar in stale_bars:
+            bar.delete_graphics()
+            self.bars.remove(bar)
+            self.events.publish(BarDeleted(bar.bar_name))
+        if stale_bars:
+            for i, b in enumerate(self.bars):
+                b.move_to(50 + i * self.TIMELINE_GAP)
+            self.update_scrollregion()
+
+        # 5. Apply layout once (one pass per timeline that changed)
+        for bar in dict.fromkeys(ball.current_bar for ball in reposition):
+            bar._layout_balls()
+
+        if left_start is not None or left_added:
+            if left_start is None:
+                left_start = len(self.items) - len(left_added)
+            self.rebuild_left_area(left_start)
+
+        return changed
+
+    def _remove_from_left(self, ball, left_start):
+        """
+        Remove ball from the left list, remember the first slot that shifts
+        """
+        index = self.items.index(ball)
+        self.items.pop(index)
+        return index if left_start is None else min(left_start, index)
+
+
+def _bar_name(ball):
+    """Timeline name of a ball (None = left area)"""
+    return ball.current_bar.bar_name if ball.current_bar else None
+
+
+def load_scene_rows(overlay_profiles=()):
+    """
+    Read everything the canvas shows (safe to run on the DB worker):
+    live items of the active profile keyed by item_id,
+    plus overlaid profiles keyed (profile, item_id)
+    """
+    wanted = {row["item_id"]: row for row in load_all_items()}
+    if overlay_profiles:
+        for row in load_profile_items(overlay_profiles):
+            wanted[(row["profile"], row["item_id"])] = row
+    return wanted
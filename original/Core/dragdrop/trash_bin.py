@@ -5,15 +5,16 @@ Please do not modify lightly.
 import os
 import tkinter as tk
 from tkinter import Menu
-from Core.add_item_sql import delete_item
-
-from Core.add_item_sql import update_item_bar_name
+from Core.add_item_sql import trash_item, trash_items, restore_trash, empty_trash
+from Core.db_worker import run_async
+from Core.events import TrashEmptied
+from .journal import TrashItem, TrashItems, TrashUnits, RestoreItems
 
 from PIL import Image, ImageTk
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 IMG_PATH = os.path.join(BASE_DIR, "Utils", "MGb360-Front-View.PNG")
-IMG_PATH_2 = os.path.join(BASE_DIR, "Utils", "MGb360-Front-View2.PNG")
+IMG_PATH_2 = os.path.join(BASE_DIR, "Utils", "MGb360-Front-View2.png")
 
 # Save original images (for real-time resizing)
 img_original = Image.open(IMG_PATH)
@@ -27,10 +28,10 @@ img_2 = img_hover_original.resize((306, 126))
 class TrashBin:
     """
     Pure UI Trash Bin
-    - Drag into trash → soft delete (hide ball)
+    - Drag into trash → soft delete (deleted_at set in SQL, ball removed)
     - Right-click menu:
         1. Undo all trash
-        2. Empty trash bin (permanently delete Ball objects)
+        2. Empty trash bin (permanently delete trashed rows)
     """
 
     def __init__(self, main_window, manager):
@@ -50,9 +51,6 @@ class TrashBin:
         self.label = tk.Label(self.frame, image=self.trash_img)
         self.label.place(relx=0.5, rely=0.5, anchor="center")
 
-        # Store soft-deleted balls
-        self.trash_list = []
-
         # Right-click menu
         self.menu = Menu(self.frame, tearoff=0)
         self.menu.add_command(label="Undo All Trash", command=self.undo)
@@ -134,65 +132,87 @@ class TrashBin:
     def put_ball_in_trash(self, ball):
         """
         Called by DragDropManager:
-        - Ball is hidden from canvas but object remains in memory
+        - Row is soft-deleted in SQL (deleted_at set), survives a crash
+        - Ball object and its graphics are dropped
+        - A ball holding several units gives up one unit instead (see take_unit)
         """
+        if ball.quantity > 1:
+            self.take_unit(ball)
+            return
+
+        self.manager.journal.record(TrashItem(
+            ball.item_id, ball.current_bar.bar_name if ball.current_bar else None,
+            ball.name, ball.expired_day, ball.quantity
+        ))
+
+        self.manager._unindex_ball(ball.item_id, trashed=True)
         if ball.current_bar:
             ball.current_bar.remove_ball(ball)
         if ball in self.manager.items:
             self.manager.items.remove(ball)
-        ball.delete_graphics()
 
-        if ball not in self.trash_list:
-            self.trash_list.append(ball)
-        ball.tooltip.hide()
+        self.manager.hide_tooltip()
+        ball.delete_graphics()
 
-        print(len(self.trash_list))
+        run_async(trash_item, ball.item_id)
 
-        # Deprecated preview refresh
-        # self.main_window.lower_module.update_trash_preview()
+    def take_unit(self, ball):
+        """
+        One unit of a multi-unit ball is trashed: the ball goes back to its slot
+        with one unit less, the unit becomes its own trashed row (restorable)
+        """
+        manager = self.manager
+        manager.return_ball_home(ball)
 
+        # Recorded now, so an undo right away works; take() attaches the trashed row's id
+        cmd = TrashUnits(ball.item_id, None, 1, ball.name, ball.expired_day,
+                         ball.current_bar.bar_name if ball.current_bar else None)
+        manager.journal.record(cmd)
+        cmd.apply(manager)
 
-    def undo(self):
+    def put_balls_in_trash(self, balls):
         """
-        Undo: restore all deleted balls
+        Called by DragDropManager for a dropped selection:
+        one journal step, one relayout, one SQL transaction
         """
-        if not self.trash_list:
+        balls = [b for b in balls if not b.read_only]
+        if not balls:
             return
+        self.manager.journal.record(TrashItems(
+            [b.item_id, b.current_bar.bar_name if b.current_bar else None, b.name, b.expired_day, b.quantity]
+            for b in balls
+        ))
 
-        for ball in list(self.trash_list):
-            ball.rebuild_graphics()
-            ball.current_bar = None
-
-            self.trash_list.remove(ball)
+        self.manager.remove_balls(balls, trashed=True)
+        run_async(trash_items, [b.item_id for b in balls])
 
-            # Return to left area
-            self.manager.items.append(ball)
-            self.manager.rebuild_left_area()
 
-        print(len(self.trash_list))
-
-        # self.main_window.lower_module.update_trash_preview()
-
-
-    def clear_trash(self):
+    def undo(self):
         """
-        Empty trash bin (permanently delete Ball objects)
+        Undo: restore all trashed items (one UPDATE, one relayout)
         """
-        for ball in self.trash_list:
-            delete_item(ball.name)
-            ball.delete_graphics()
+        run_async(restore_trash, on_done=self._on_restored)
 
-        self.trash_list.clear()
+    def _on_restored(self, rows):
+        """
+        Restored rows arrive from the DB worker (Tk thread)
+        """
+        if not rows:
+            return
 
-        # Refresh SQL stats if desired
-        # self.main_window.lower_module.update_trash_preview()
-        # self.main_window.lower_module.update_sql_stats()
+        self.manager.restore_balls(rows)
+        self.manager.journal.record(RestoreItems(
+            ([r["item_id"], r["item_name"], r["expired_day"], r["quantity"]] for r in rows),
+            [[r["item_id"], r["into"]] for r in rows if r["into"] is not None]
+        ))
 
 
-    def clear_visual_only(self):
+    def clear_trash(self):
         """
-        Clear only visual remnants (for UI cleanup)
+        Empty trash bin (one DELETE for every trashed row)
         """
-        for ball in self.trash_list:
-            ball.delete_graphics()
-        self.trash_list.clear()
+        run_async(empty_trash)
+
+        # Purged items cannot be restored any more
+        self.manager.journal.clear()
+        self.manager.events.publish(TrashEmptied())
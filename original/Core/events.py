@@ -0,0 +1,164 @@
+"""
+In-process event bus between the canvas (DragDropManager / TrashBin) and the views
+(Info panel, trash preview, expiry alerts)
+- Events are queued and delivered as one batch per Tk idle cycle
+- A bulk operation (restore all, reload, undo of a transaction) therefore costs
+  each subscriber one call, not one per item
+"""
+
+
+class Event:
+    """
+    Base event: values are snapshots taken when the event is published
+    (the ball may have changed again by the time the batch is delivered)
+    """
+
+    __slots__ = ()
+    KIND = ""
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"{self.KIND}({', '.join(repr(getattr(self, n)) for n in self.__slots__)})"
+
+
+class ItemAdded(Event):
+    """Item appeared in the scene (new, restored from trash, or re-read from SQL)"""
+    __slots__ = ("item_id", "item_name", "expired_day", "bar_name", "restored", "quantity")
+    KIND = "item_added"
+
+
+class ItemRemoved(Event):
+    """Item left the scene without going to the trash (undo of an add, reload)"""
+    __slots__ = ("item_id", "expired_day", "bar_name", "quantity")
+    KIND = "item_removed"
+
+
+class ItemMoved(Event):
+    """Item changed timeline (bar_name None = left area)"""
+    __slots__ = ("item_id", "item_name", "expired_day", "old_bar", "new_bar", "quantity")
+    KIND = "item_moved"
+
+
+class ItemTrashed(Event):
+    """Item left the scene into the trash bin (with all its units)"""
+    __slots__ = ("item_id", "item_name", "expired_day", "bar_name", "quantity")
+    KIND = "item_trashed"
+
+
+class UnitsTrashed(Event):
+    """Some units of an entry went to the trash as their own row (trash_id); the entry stays"""
+    __slots__ = ("item_id", "trash_id", "item_name", "expired_day", "bar_name", "quantity")
+    KIND = "units_trashed"
+
+
+class UnitsChanged(Event):
+    """An entry's unit count changed in place (delta units; quantity is the new count)"""
+    __slots__ = ("item_id", "item_name", "expired_day", "bar_name", "quantity", "delta")
+    KIND = "units_changed"
+
+
+class UnitsReturned(Event):
+    """A trashed row's units are back on a live entry (undo of units_trashed, or a restore)"""
+    __slots__ = ("item_id", "trash_id")
+    KIND = "units_returned"
+
+
+class BarDeleted(Event):
+    """Timeline removed (its items were moved off first)"""
+    __slots__ = ("bar_name",)
+    KIND = "bar_deleted"
+
+
+class BarRenamed(Event):
+    """Timeline renamed, or merged into an existing one (its items now carry new_name)"""
+    __slots__ = ("old_name", "new_name")
+    KIND = "bar_renamed"
+
+
+class TrashEmptied(Event):
+    """Every trashed row was purged"""
+    __slots__ = ()
+    KIND = "trash_emptied"
+
+
+class DbReloaded(Event):
+    """Whole database may have changed (startup, import, profile switch, Clear)"""
+    __slots__ = ()
+    KIND = "db_reloaded"
+
+
+class EventBus:
+    """
+    - subscribe(handler, *kinds): handler(events) gets a list of events (only the
+      given kinds, all kinds if none given)
+    - publish(event): queue; the first publish of a cycle schedules one after_idle flush
+    - widget: any Tk widget (for after_idle); None delivers on flush() only
+    """
+
+    def __init__(self, widget=None):
+        self.widget = widget
+        self._subscribers = []   # (handler, kinds or None)
+        self._queue = []
+        self._scheduled = False
+
+    def subscribe(self, handler, *kinds):
+        self._subscribers.append((handler, set(kinds) or None))
+
+    def publish(self, event):
+        self._queue.append(event)
+        if not self._scheduled and self.widget is not None:
+            self._scheduled = True
+            self.widget.after_idle(self.flush)
+
+    def flush(self):
+        """Deliver everything queued so far (one call per subscriber)"""
+        self._scheduled = False
+        events, self._queue = self._queue, []
+        if not events:
+            return
+
+        events = coalesce(events)
+        for handler, kinds in self._subscribers:
+            batch = events if kinds is None else [e for e in events if e.KIND in kinds]
+            if batch:
+                try:
+                    handler(batch)
+                except Exception as e:
+                    print("Event handler error:", e)
+
+
+def coalesce(events):
+    """
+    Shrink one batch without changing its meaning:
+    - everything before the last db_reloaded is dropped (subscribers re-read SQL)
+    - back-to-back moves of one item become a single move (dropped if it ends where it began)
+    """
+    for i in range(len(events) - 1, -1, -1):
+        if events[i].KIND == DbReloaded.KIND:
+            events = events[i:]
+            break
+
+    out = []
+    last = {}   # item_id → index in out of its latest event
+    for event in events:
+        item_id = getattr(event, "item_id", None)
+        prev = last.get(item_id) if item_id is not None else None
+
+        if event.KIND == ItemMoved.KIND and prev is not None and out[prev] is not None \
+                and out[prev].KIND == ItemMoved.KIND:
+            first = out[prev]
+            out[prev] = None if first.old_bar == event.new_bar else \
+                ItemMoved(item_id, event.item_name, event.expired_day, first.old_bar, event.new_bar,
+                          event.quantity)
+            if out[prev] is None:
+                del last[item_id]
+            continue
+
+        if item_id is not None:
+            last[item_id] = len(out)
+        out.append(event)
+
+    return [e for e in out if e is not None]
@@ -2,9 +2,8 @@
 SQL recognition and generation content
 """
 import os
-import sqlite3
 from Utils import global_var
-from Core.add_item_sql import _db_path
+from Core.add_item_sql import _connect
 
 
 def generate_from_sql():
@@ -15,17 +14,15 @@ def generate_from_sql():
     """
     print("reach here")
 
-    # DB file under Utils directory
-    db_path = _db_path()
-
-    # Connect database
-    conn = sqlite3.connect(db_path)
+    # Connect database (active profile)
+    conn = _connect()
     cursor = conn.cursor()
 
     # Query all items
     query = """
         SELECT item_name, expired_day, bar_name
         FROM items
+        WHERE deleted_at IS NULL
         ORDER BY bar_name
     """
     cursor.execute(query)
@@ -0,0 +1,218 @@
+"""
+Event-driven expiry alerts ("3 items in Fridge expire tomorrow")
+- Next alert times are kept in a heap, one entry per (expiry day, alert kind)
+- Exactly one after() timer is armed, for the earliest entry; nothing polls the table
+- Scene events: add / remove / trash update the schedule incrementally (one re-arm
+  per batch); moves need no work because the timeline of each item is looked up
+  when the alert fires
+"""
+import heapq
+import time
+from datetime import date, datetime
+from Core.add_item_sql import day_ordinal
+from Core.sql_stats import items_expiring_between
+from Core.db_worker import run_async
+
+# Local time at which the alerts of a day are raised
+ALERT_HOUR = 9
+
+# Alert kinds: days before the expiry date → message
+ALERTS = {
+    1: "expire tomorrow",
+    0: "expire today",
+}
+
+# Entries due within this window are shown in the same notification (seconds)
+BATCH_WINDOW = 1.0
+
+# Longest single after() delay; the timer re-arms itself (guards against
+# Tk's 32-bit millisecond limit and system sleep / clock changes)
+MAX_SLEEP_MS = 6 * 3600 * 1000
+
+# Label used for items that are not on a timeline
+LEFT_AREA = "left area"
+
+
+def _fire_time(day, days_before):
+    """Epoch seconds of the alert for expiry day (ordinal) raised days_before earlier"""
+    alert_day = date.fromordinal(day - days_before)
+    return datetime.combine(alert_day, datetime.min.time()).timestamp() + ALERT_HOUR * 3600
+
+
+class ExpiryNotifier:
+    """
+    Alert scheduler:
+    - build(): load upcoming expiry days from the expiry index (DB worker)
+    - track(item_id, expired_day) / untrack(item_id): incremental updates
+    - show(lines) callback receives one batch of messages (Tk thread)
+    """
+
+    def __init__(self, root, manager, show):
+        self.root = root
+        self.manager = manager
+        self.show = show
+
+        self._days = {}        # expiry ordinal → set(item_id)
+        self._item_day = {}    # item_id → expiry ordinal
+        self._heap = []        # (fire_time, day, days_before)
+        self._queued = set()   # (day, days_before) present in the heap
+
+        self._timer = None
+        self._timer_at = None
+
+    # ---- building ----
+
+    def build(self):
+        """Rebuild from SQL: live items expiring today or later"""
+        run_async(items_expiring_between, 0, None, on_done=self._on_built)
+
+    def _on_built(self, rows):
+        self._days.clear()
+        self._item_day.clear()
+        self._heap.clear()
+        self._queued.clear()
+
+        today = date.today().toordinal()
+        for item_id, _, _, _, remaining, _ in rows:
+            self._add(item_id, today + remaining)
+
+        # Alerts already due today are raised right away (app started late)
+        now = time.time()
+        for day in self._days:
+            for days_before in ALERTS:
+                if day - days_before == today:
+                    self._push(max(now, _fire_time(day, days_before)), day, days_before)
+                else:
+                    self._push(_fire_time(day, days_before), day, days_before)
+
+        self._arm()
+
+    # ---- incremental updates ----
+
+    EVENT_KINDS = ("item_added", "item_removed", "item_trashed", "db_reloaded")
+
+    def on_events(self, events):
+        """Scene event batch (DragDropManager.events): update, then re-arm once"""
+        if any(e.KIND == "db_reloaded" for e in events):
+            self.build()
+            return
+        for e in events:
+            if e.KIND == "item_added":
+                self._track(e.item_id, e.expired_day)
+            else:
+                self.untrack(e.item_id)
+        self._arm()
+
+    def track(self, item_id, expired_day):
+        """An item was added (or restored / re-dated)"""
+        self._track(item_id, expired_day)
+        self._arm()
+
+    def _track(self, item_id, expired_day):
+        self.untrack(item_id)
+        day = day_ordinal(expired_day)
+        if day is None or day < date.today().toordinal():
+            return
+
+        new_day = day not in self._days
+        self._add(item_id, day)
+        if new_day:
+            for days_before in ALERTS:
+                self._push(_fire_time(day, days_before), day, days_before)
+
+    def untrack(self, item_id):
+        """An item was trashed or removed; its heap entries expire lazily"""
+        day = self._item_day.pop(item_id, None)
+        if day is None:
+            return
+        ids = self._days[day]
+        ids.discard(item_id)
+        if not ids:
+            del self._days[day]
+
+    def _add(self, item_id, day):
+        self._days.setdefault(day, set()).add(item_id)
+        self._item_day[item_id] = day
+
+    def _push(self, fire_at, day, days_before):
+        """Queue one alert (past ones are skipped, duplicates ignored)"""
+        key = (day, days_before)
+        if key in self._queued or fire_at < time.time() - BATCH_WINDOW:
+            return
+        heapq.heappush(self._heap, (fire_at, day, days_before))
+        self._queued.add(key)
+
+    # ---- timer ----
+
+    def _arm(self):
+        """Keep exactly one timer, set for the earliest heap entry"""
+        if not self._heap:
+            return
+        fire_at = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer_at <= fire_at:
+                return
+            self.root.after_cancel(self._timer)
+
+        delay = max(0, int((fire_at - time.time()) * 1000))
+        self._timer_at = fire_at
+        self._timer = self.root.after(min(delay, MAX_SLEEP_MS), self._on_timer)
+
+    def cancel(self):
+        """Stop the pending timer (window closing)"""
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+
+    def _on_timer(self):
+        self._timer = None
+        due = time.time() + BATCH_WINDOW
+
+        batch = []
+        while self._heap and self._heap[0][0] <= due:
+            _, day, days_before = heapq.heappop(self._heap)
+            self._queued.discard((day, days_before))
+            batch.append((day, days_before))
+
+        lines = self._messages(batch)
+        if lines:
+            self.show(lines)
+
+        # After its last alert a day is dropped
+        last = min(ALERTS)
+        for day, days_before in batch:
+            if days_before == last:
+                for item_id in self._days.pop(day, ()):
+                    self._item_day.pop(item_id, None)
+
+        self._arm()
+
+    def _messages(self, batch):
+        """
+        One line per (timeline, alert kind), counting units:
+        "3 items in Fridge expire tomorrow"
+        """
+        counts = {}
+        for day, days_before in batch:
+            for item_id in self._days.get(day, ()):
+                ball = self.manager.ball_index.get(item_id)
+                if ball is None:
+                    continue  # Trashed before the SQL rebuild arrived
+                bar = ball.current_bar.bar_name if ball.current_bar else LEFT_AREA
+                key = (days_before, bar)
+                counts[key] = counts.get(key, 0) + ball.quantity
+
+        lines = []
+        for (days_before, bar), n in sorted(counts.items()):
+            noun = "item" if n == 1 else "items"
+            verb = ALERTS[days_before]
+            if n == 1:
+                verb = verb.replace("expire", "expires", 1)
+            lines.append(f"{n} {noun} in {bar} {verb}")
+        return lines
+
+    def next_alert(self):
+        """datetime of the next scheduled alert (None if nothing is queued)"""
+        if not self._heap:
+            return None
+        return datetime.fromtimestamp(self._heap[0][0])
@@ -1,13 +1,73 @@
 """
 SQL export/import system
 """
-import os
-import shutil
+import queue
+import threading
 from tkinter import filedialog, messagebox
-from Core.add_item_sql import _db_path
+from Core.backup import backup_to, restore_from
+from Core.db_worker import get_worker
+from GUI.progress_dialog import ProgressDialog
+
+# How often the Tk thread polls the worker for progress (ms)
+POLL_MS = 50
+
+
+def _run_with_progress(app, title, job, on_success, serialized=False):
+    """
+    Run job(progress) off the Tk thread:
+    - serialized: as a DB worker job, queued in order with every other SQL write
+      and running on the worker's own connection
+    - else in a thread of its own
+    Progress and result are passed back through a queue / the worker's callbacks and
+    applied on the Tk thread via after(), so the UI never blocks.
+    """
+    dialog = ProgressDialog(app.root, title)
+    updates = queue.Queue()
+    finished = []
+
+    def progress(done, total):
+        updates.put(("progress", done, total))
+
+    def finish(error=None):
+        finished.append(True)
+        dialog.close()
+        if error is None:
+            on_success()
+        else:
+            messagebox.showerror("Error", f"{title} failed:\n{error}")
+
+    def worker():
+        try:
+            job(progress)
+            updates.put(("done",))
+        except Exception as e:
+            updates.put(("error", e))
+
+    def poll():
+        try:
+            while not finished:
+                msg = updates.get_nowait()
+                if msg[0] == "progress":
+                    dialog.update(msg[1], msg[2])
+                elif msg[0] == "done":
+                    finish()
+                else:
+                    finish(msg[1])
+        except queue.Empty:
+            pass
+        if not finished:
+            app.root.after(POLL_MS, poll)
+
+    db_worker = get_worker() if serialized else None
+    if db_worker is not None:
+        db_worker.submit(job, progress, on_done=lambda _: finish(), on_error=finish)
+    else:
+        threading.Thread(target=worker, daemon=True).start()
+    poll()
+
 
 def export_db(app):
-    """Export database (Utils/test.db)"""
+    """Export database through the SQLite backup API"""
     export_path = filedialog.asksaveasfilename(
         title="Export Database",
         defaultextension=".db",
@@ -16,16 +76,19 @@ def export_db(app):
     if not export_path:
         return
 
-    try:
-        shutil.copyfile(_db_path(), export_path)
+    def on_success():
         messagebox.showinfo("Success", f"Database exported to:\n{export_path}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Export failed:\n{e}")
+
+    _run_with_progress(
+        app, "Export",
+        lambda progress: backup_to(export_path, progress),
+        on_success
+    )
 
 
 def import_db(app):
     """
-    Import database and refresh UI
+    Import database into the live connection and refresh UI in place
     """
     import_path = filedialog.askopenfilename(
         title="Select Database File",
@@ -41,13 +104,16 @@ def import_db(app):
     if not confirm:
         return
 
-    try:
-        shutil.copyfile(import_path, _db_path())
-        messagebox.showinfo("Success", "Database imported successfully! Please restart the program to see data.")
-
-        # Refresh UI automatically
-        app.lower_model.update_sql_stats()
-        app.lower_model.update_trash_preview()
+    def on_success():
+        # Re-hydrate canvas from the restored data (no restart needed);
+        # the panels follow through the db_reloaded event
+        app.upper_model.manager.reload_from_sql()
+        messagebox.showinfo("Success", "Database imported successfully!")
 
-    except Exception as e:
-        messagebox.showerror("Error", f"Import failed:\n{e}")
\ No newline at end of file
+    # On the DB worker: a drag / add still queued cannot commit halfway through the copy
+    _run_with_progress(
+        app, "Import",
+        lambda progress: restore_from(import_path, progress),
+        on_success,
+        serialized=True
+    )
@@ -0,0 +1,152 @@
+"""
+Inventory profiles (home / office kitchen / storeroom ...)
+Each profile is its own .db file; cross-profile queries ATTACH them to one connection
+"""
+import re
+import sqlite3
+from datetime import date
+from Utils.global_var import list_profile_names, ensure_writable_db
+from Core import add_item_sql
+
+# SQLite default limit of attached databases per connection
+MAX_ATTACHED = 10
+
+_NAME_RE = re.compile(r"^[\w\- ]{1,40}$", re.UNICODE)
+
+# Profile files already migrated in this session
+_migrated = set()
+
+
+def _profile_path(name):
+    """Database path of a profile, set up / migrated once per session"""
+    path = ensure_writable_db(name)
+    if path not in _migrated:
+        add_item_sql.setup_database(path)
+        _migrated.add(path)
+    return path
+
+
+def list_profiles():
+    """Names of all profiles (default first)"""
+    return list_profile_names()
+
+
+def active_profile():
+    """Name of the profile the app is working on"""
+    return add_item_sql.ACTIVE_PROFILE
+
+
+def create_profile(name):
+    """
+    Create a new profile database
+    :raise ValueError: invalid or existing name
+    """
+    name = name.strip()
+    if not _NAME_RE.match(name):
+        raise ValueError("Profile name may only use letters, digits, space, '-' and '_'")
+    if name in list_profiles():
+        raise ValueError(f"Profile '{name}' already exists")
+
+    _profile_path(name)
+    return name
+
+
+def switch_profile(name):
+    """Make name the active profile for every SQL function"""
+    add_item_sql.set_active_profile(name)
+
+
+def open_profiles(names):
+    """
+    One connection on the active profile with the other profiles ATTACHed.
+    :return: (conn, {profile_name: schema_name})
+    """
+    active = active_profile()
+    conn = sqlite3.connect(add_item_sql._db_path())
+    schemas = {active: "main"}
+
+    others = [n for n in names if n != active]
+    if len(others) > MAX_ATTACHED:
+        raise ValueError(f"At most {MAX_ATTACHED} profiles can be attached at once")
+
+    for i, name in enumerate(others):
+        schema = f"p{i}"
+        conn.execute("ATTACH DATABASE ? AS " + schema, (_profile_path(name),))
+        schemas[name] = schema
+
+    return conn, schemas
+
+
+def load_profile_items(names):
+    """
+    Live items of several profiles in one UNION ALL query
+    :return: [dict(profile, item_id, item_name, expired_day, bar_name, quantity), ...]
+    """
+    conn, schemas = open_profiles(names)
+    try:
+        parts = []
+        params = []
+        for name, schema in schemas.items():
+            if name not in names:
+                continue
+            parts.append(f"""
+                SELECT ?, item_id, item_name, expired_day, bar_name, quantity
+                FROM {schema}.items
+                WHERE deleted_at IS NULL
+            """)
+            params.append(name)
+        if not parts:
+            return []
+        rows = conn.execute(" UNION ALL ".join(parts), params).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "profile": r[0],
+            "item_id": r[1],
+            "item_name": r[2],
+            "expired_day": r[3],
+            "bar_name": r[4],
+            "quantity": r[5]
+        }
+        for r in rows
+    ]
+
+
+def cross_profile_stats(names=None):
+    """
+    Bucket unit counts (>30 / 7~30 / <7 / expired) for every profile, one query
+    :return: {profile: {bucket: units}}
+    """
+    names = names or list_profiles()
+    conn, schemas = open_profiles(names)
+    today = date.today().toordinal()
+
+    bucket_sql = """
+        CASE
+            WHEN expiry_ord - ? > 30 THEN '>30'
+            WHEN expiry_ord - ? >= 7 THEN '7~30'
+            WHEN expiry_ord - ? >= 0 THEN '<7'
+            ELSE 'expired'
+        END
+    """
+    try:
+        parts = []
+        params = []
+        for name, schema in schemas.items():
+            parts.append(f"""
+                SELECT ?, {bucket_sql}, SUM(quantity)
+                FROM {schema}.items
+                WHERE deleted_at IS NULL AND expiry_ord IS NOT NULL
+                GROUP BY 2
+            """)
+            params += [name, today, today, today]
+        rows = conn.execute(" UNION ALL ".join(parts), params).fetchall()
+    finally:
+        conn.close()
+
+    stats = {name: {">30": 0, "7~30": 0, "<7": 0, "expired": 0} for name in schemas}
+    for name, bucket, count in rows:
+        stats[name][bucket] = count
+    return stats
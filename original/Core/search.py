@@ -0,0 +1,70 @@
+"""
+Item / bar name search (backs the search box above the canvas)
+"""
+import re
+from Core.add_item_sql import _connect
+
+# Word characters kept from the query; everything else separates tokens
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts_query(text):
+    """
+    Turn user input into an FTS5 prefix query:
+    "mil fri" → "mil"* AND "fri"*
+    """
+    tokens = _TOKEN_RE.findall(text)
+    return " AND ".join(f'"{t}"*' for t in tokens)
+
+
+def _has_fts(cur):
+    cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'")
+    return cur.fetchone() is not None
+
+
+def search_items(text, limit=200):
+    """
+    Find live (not trashed) items whose item name or bar name
+    contains a word starting with every typed token.
+    :param text: raw search box text
+    :param limit: max hits returned
+    :return: [(item_id, item_name, bar_name), ...]
+    """
+    if not _TOKEN_RE.search(text):
+        return []
+
+    conn = _connect()
+    cur = conn.cursor()
+
+    if _has_fts(cur):
+        cur.execute("""
+            SELECT i.item_id, i.item_name, i.bar_name
+            FROM items_fts f
+            JOIN items i ON i.item_id = f.rowid
+            WHERE items_fts MATCH ? AND i.deleted_at IS NULL
+            LIMIT ?
+        """, (_fts_query(text), limit))
+    else:
+        # Fallback: name prefix served by idx_items_name_nocase
+        # (wildcards dropped: LIKE with ESCAPE cannot use the index)
+        prefix = text.strip().replace("%", "").replace("_", "")
+        cur.execute("""
+            SELECT item_id, item_name, bar_name
+            FROM items
+            WHERE item_name LIKE ? AND deleted_at IS NULL
+            LIMIT ?
+        """, (prefix + "%", limit))
+
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def name_matches(text, name):
+    """
+    Same rule as search_items, applied to one name in memory
+    (used for timeline titles, which are few)
+    """
+    tokens = [t.lower() for t in _TOKEN_RE.findall(text)]
+    words = [w.lower() for w in _TOKEN_RE.findall(name or "")]
+    return bool(tokens) and all(any(w.startswith(t) for w in words) for t in tokens)
@@ -0,0 +1,265 @@
+"""
+Columnar snapshot of live items for whole-inventory expiry math
+- Four parallel columns: item_id, expiry day ordinal, timeline id
+  (index into bar_names; the left area is the timeline named None), units
+- Bucket counts (units) are array operations, no per-item date parsing; timeline x of
+  many balls (timeline_layout) is the same kind of array math
+- Scene events are queued as changes and merged into the columns on the next query
+- NumPy is optional: without it the same answers come from plain Python loops
+"""
+from datetime import date
+from Core.add_item_sql import _connect, day_ordinal
+from Core.sql_stats import BUCKETS
+from Core.db_worker import run_async
+
+try:
+    import numpy as np
+except ImportError:   # Optional dependency: list columns, Python loops
+    np = None
+
+# Remaining days at which a ball reaches the left end of its timeline
+TIMELINE_DAYS = 40
+
+# Buckets ordered by first remaining day; _EDGES are the boundaries between them
+_ORDER = sorted(BUCKETS, key=lambda b: float("-inf") if BUCKETS[b][0] is None else BUCKETS[b][0])
+_EDGES = [BUCKETS[b][0] for b in _ORDER[1:]]
+
+
+def timeline_x(remaining_days, left, right, days=TIMELINE_DAYS):
+    """
+    Timeline X of remaining days: 0 (or expired) → right end, days or more → left end
+    :param remaining_days: int, or NumPy array for many balls at once
+    """
+    if np is not None and isinstance(remaining_days, np.ndarray):
+        clamped = np.clip(remaining_days, 0, days)
+    else:
+        clamped = max(0, min(remaining_days, days))
+    return left + (1 - clamped / days) * (right - left)
+
+
+def stack_ranks(values):
+    """
+    Rank of each value among the equal values before it ([5, 3, 5, 5] → [0, 0, 1, 2]),
+    used to stack balls that share a timeline position
+    """
+    if np is not None:
+        values = np.asarray(values)
+        n = len(values)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        order = np.argsort(values, kind="stable")
+        ordered = values[order]
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        ranks = np.empty(n, dtype=np.int64)
+        ranks[order] = np.arange(n) - np.repeat(starts, sizes)
+        return ranks
+
+    seen = {}
+    ranks = []
+    for v in values:
+        ranks.append(seen.get(v, 0))
+        seen[v] = ranks[-1] + 1
+    return ranks
+
+
+def timeline_layout(remaining_days, left, right, days=TIMELINE_DAYS):
+    """
+    X and stack rank of many balls in one pass (balls on the same day stack up)
+    :param remaining_days: list of remaining days, in timeline order
+    :return: (x list, rank list)
+    """
+    if np is not None:
+        clamped = np.clip(np.asarray(remaining_days, dtype=np.int64), 0, days)
+        return timeline_x(clamped, left, right, days).tolist(), stack_ranks(clamped).tolist()
+    clamped = [max(0, min(r, days)) for r in remaining_days]
+    return [timeline_x(r, left, right, days) for r in clamped], stack_ranks(clamped)
+
+
+def read_columns(conn=None):
+    """
+    Live items straight from a cursor into columns (safe to run on the DB worker)
+    :return: (item_ids, days, bar_ids, quantities, bar_names)
+    """
+    own = conn is None
+    if own:
+        conn = _connect()
+    try:
+        cur = conn.execute("""
+            SELECT item_id, expiry_ord, bar_name, quantity
+            FROM items
+            WHERE deleted_at IS NULL AND expiry_ord IS NOT NULL
+        """)
+        bar_ids = {}
+        rows = ((item_id, day, bar_ids.setdefault(bar, len(bar_ids)), qty)
+                for item_id, day, bar, qty in cur)
+
+        if np is not None:
+            table = np.fromiter(rows, dtype=[("id", np.int64), ("day", np.int32), ("bar", np.int32),
+                                             ("qty", np.int64)])
+            columns = (table["id"].copy(), table["day"].copy(), table["bar"].copy(), table["qty"].copy())
+        else:
+            table = list(rows)
+            columns = tuple([r[i] for r in table] for i in range(4))
+    finally:
+        if own:
+            conn.close()
+
+    return columns + (list(bar_ids),)
+
+
+class ExpirySnapshot:
+    """
+    In-memory columns of the live inventory:
+    - load() / reload_async(): read from SQL
+    - add / remove, or on_events as a DragDropManager.events subscriber: incremental
+    - bucket_counts: whole-inventory answer (Info panel recounts)
+    """
+
+    EVENT_KINDS = ("item_added", "item_removed", "item_moved", "item_trashed", "units_changed",
+                   "bar_renamed", "db_reloaded")
+
+    def __init__(self):
+        self.bar_names = []    # timeline id → bar_name (None = left area)
+        self._bar_ids = {}     # bar_name → timeline id
+        self._set_columns(_empty("int64"), _empty("int32"), _empty("int32"), _empty("int64"), [])
+        self._changes = {}     # item_id → (day, bar_name, quantity), None = removed; merged lazily
+        self.loaded = False
+
+    # ---- loading ----
+
+    def load(self, conn=None):
+        """Read every live item (synchronous)"""
+        self._changes = {}
+        self._set_columns(*read_columns(conn))
+
+    def reload_async(self, on_done=None):
+        """
+        Read on the DB worker; changes received meanwhile are kept and merged
+        on top (a change is the item's final state, so re-applying it is harmless)
+        """
+        self._changes = {}
+        self.loaded = False
+
+        def loaded(columns):
+            self._set_columns(*columns)
+            if on_done is not None:
+                on_done(self)
+
+        run_async(read_columns, on_done=loaded)
+
+    def _set_columns(self, item_ids, days, bar_ids, quantities, bar_names):
+        self.item_ids = item_ids
+        self.days = days
+        self.bars = bar_ids
+        self.quantities = quantities
+        self.bar_names = list(bar_names)
+        self._bar_ids = {name: i for i, name in enumerate(self.bar_names)}
+        self.loaded = True
+
+    # ---- incremental updates ----
+
+    def on_events(self, events):
+        """Scene event batch (DragDropManager.events)"""
+        for e in events:
+            if e.KIND == "db_reloaded":
+                self.reload_async()
+            elif e.KIND in ("item_added", "units_changed"):
+                self.add(e.item_id, e.expired_day, e.bar_name, e.quantity)
+            elif e.KIND == "item_moved":
+                self.add(e.item_id, e.expired_day, e.new_bar, e.quantity)
+            elif e.KIND == "bar_renamed":
+                self.rename_bar(e.old_name, e.new_name)
+            else:
+                self.remove(e.item_id)
+
+    def add(self, item_id, expired_day, bar_name, quantity=1):
+        """Item added, moved, re-dated or re-counted (replaces its previous row)"""
+        day = day_ordinal(expired_day)
+        self._changes[item_id] = (day, bar_name, quantity) if day is not None else None
+
+    def remove(self, item_id):
+        self._changes[item_id] = None
+
+    def rename_bar(self, old_name, new_name):
+        """
+        Timeline renamed: relabel its id; merged into an existing timeline:
+        its rows take that timeline's id (one array operation)
+        """
+        self._merge()
+        old = self._bar_ids.pop(old_name, None)
+        if old is None:
+            return
+        new = self._bar_ids.get(new_name)
+        if new is None:
+            self.bar_names[old] = new_name
+            self._bar_ids[new_name] = old
+        elif np is not None:
+            self.bars[self.bars == old] = new
+        else:
+            self.bars = [new if bar == old else bar for bar in self.bars]
+
+    def _merge(self):
+        """Apply queued changes: drop the changed rows, append their new state"""
+        if not self._changes:
+            return
+        changes, self._changes = self._changes, {}
+        added = [(item_id, row[0], self._bar_id(row[1]), row[2])
+                 for item_id, row in changes.items() if row is not None]
+
+        if np is not None:
+            changed = np.fromiter(changes, dtype=np.int64, count=len(changes))
+            keep = ~np.isin(self.item_ids, changed)
+            self.item_ids = np.concatenate([self.item_ids[keep], np.array([r[0] for r in added], np.int64)])
+            self.days = np.concatenate([self.days[keep], np.array([r[1] for r in added], np.int32)])
+            self.bars = np.concatenate([self.bars[keep], np.array([r[2] for r in added], np.int32)])
+            self.quantities = np.concatenate([self.quantities[keep],
+                                              np.array([r[3] for r in added], np.int64)])
+        else:
+            keep = [i for i, item_id in enumerate(self.item_ids) if item_id not in changes]
+            self.item_ids = [self.item_ids[i] for i in keep] + [r[0] for r in added]
+            self.days = [self.days[i] for i in keep] + [r[1] for r in added]
+            self.bars = [self.bars[i] for i in keep] + [r[2] for r in added]
+            self.quantities = [self.quantities[i] for i in keep] + [r[3] for r in added]
+
+    def _bar_id(self, bar_name):
+        bar = self._bar_ids.get(bar_name)
+        if bar is None:
+            bar = self._bar_ids[bar_name] = len(self.bar_names)
+            self.bar_names.append(bar_name)
+        return bar
+
+    def __len__(self):
+        self._merge()
+        return len(self.item_ids)
+
+    # ---- whole-inventory answers ----
+
+    def bucket_counts(self, today=None):
+        """
+        Live units per (bucket, bar_name), same result as sql_stats.bucket_counts
+        :return: {(bucket, bar_name): units}
+        """
+        self._merge()
+        today = date.today().toordinal() if today is None else today
+        n_bars = max(1, len(self.bar_names))
+
+        if np is not None:
+            # Bucket edges shifted to day ordinals: no remaining-days column needed
+            buckets = np.searchsorted(np.array(_EDGES, np.int32) + today, self.days, side="right")
+            counts = np.bincount(buckets * n_bars + self.bars, weights=self.quantities,
+                                 minlength=len(_ORDER) * n_bars).astype(np.int64)
+            return {
+                (_ORDER[key // n_bars], self.bar_names[key % n_bars]): int(counts[key])
+                for key in np.flatnonzero(counts)
+            }
+
+        counts = {}
+        for day, bar, qty in zip(self.days, self.bars, self.quantities):
+            key = (_ORDER[sum(1 for edge in _EDGES if day - today >= edge)], self.bar_names[bar])
+            counts[key] = counts.get(key, 0) + qty
+        return counts
+
+
+def _empty(dtype):
+    return np.zeros(0, dtype=dtype) if np is not None else []
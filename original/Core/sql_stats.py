@@ -1,54 +1,217 @@
 """
 SQL data statistics code
+Expiry questions are answered by range queries on the indexed expiry_ord column
 """
-import sqlite3
 import os
-from datetime import datetime, date
-from Core.add_item_sql import _db_path
+from datetime import date
+from Core.add_item_sql import _connect, load_trash_page
 
+# bar_name filter default: do not filter by bar
+ALL_BARS = object()
 
-def get_sql_stats():
+# Info panel buckets: name → (first remaining day, last remaining day), None = open end
+BUCKETS = {
+    ">30": (31, None),
+    "7~30": (7, 30),
+    "<7": (0, 6),
+    "expired": (None, -1),
+}
+
+
+def bucket_of(remaining_days):
+    """Info panel bucket name for a number of remaining days"""
+    for name, (start, end) in BUCKETS.items():
+        if (start is None or remaining_days >= start) and (end is None or remaining_days <= end):
+            return name
+    return None
+
+
+def _range_where(start_day, end_day, bar_name):
     """
-    Return SQL statistical information, including:
-    - Quantity of each category
-    - Item name list corresponding to each category
+    Build WHERE clause + params for a remaining-days window
+    (days are relative to today, both ends inclusive)
     """
+    today = date.today().toordinal()
+    where = ["deleted_at IS NULL", "expiry_ord IS NOT NULL"]
+    params = []
+
+    if start_day is not None:
+        where.append("expiry_ord >= ?")
+        params.append(today + start_day)
+    if end_day is not None:
+        where.append("expiry_ord <= ?")
+        params.append(today + end_day)
+    if bar_name is not ALL_BARS:
+        if bar_name is None:
+            where.append("bar_name IS NULL")
+        else:
+            where.append("bar_name = ?")
+            params.append(bar_name)
 
-    conn = sqlite3.connect(_db_path())
-    cur = conn.cursor()
+    return " AND ".join(where), params
+
+
+def items_expiring_between(start_day=None, end_day=None, bar_name=ALL_BARS,
+                           limit=None, offset=0, after=None, conn=None):
+    """
+    Items whose remaining days fall in [start_day, end_day], ordered by expiry.
+    Served by idx_items_live_expiry / idx_items_live_bar_expiry.
 
-    cur.execute("""
-        SELECT item_name, expired_day
+    Args:
+        start_day (int | None): first remaining day (e.g. 0 = today, -3 = expired 3 days ago)
+        end_day (int | None): last remaining day
+        bar_name: ALL_BARS (no filter), None (left area) or a bar name
+        limit (int | None): page size
+        offset (int): page start
+        after (tuple | None): keyset paging, only rows after this (expiry_ord, item_id)
+        conn: optional open connection (kept open)
+
+    Return:
+        [(item_id, item_name, expired_day, bar_name, remaining_days, quantity), ...]
+    """
+    where, params = _range_where(start_day, end_day, bar_name)
+    today = date.today().toordinal()
+
+    if after is not None:
+        where += " AND (expiry_ord, item_id) > (?, ?)"
+        params += list(after)
+
+    sql = f"""
+        SELECT item_id, item_name, expired_day, bar_name, expiry_ord - ?, quantity
         FROM items
-    """)
+        WHERE {where}
+        ORDER BY expiry_ord, item_id
+    """
+    params = [today] + params
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+    own = conn is None
+    if own:
+        conn = _connect()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        if own:
+            conn.close()
+
+
+def count_expiring_between(start_day=None, end_day=None, bar_name=ALL_BARS, conn=None):
+    """
+    Number of units whose remaining days fall in [start_day, end_day]
+    (same arguments as items_expiring_between)
+    """
+    where, params = _range_where(start_day, end_day, bar_name)
+
+    own = conn is None
+    if own:
+        conn = _connect()
+    try:
+        return conn.execute(f"SELECT COALESCE(SUM(quantity), 0) FROM items WHERE {where}",
+                            params).fetchone()[0]
+    finally:
+        if own:
+            conn.close()
 
-    rows = cur.fetchall()
-    conn.close()
 
-    # Four category structure
-    stats = {
-        ">30": [],
-        "7~30": [],
-        "<7": [],
-        "expired": []
+def bucket_counts():
+    """
+    Live units per (bucket, bar_name) in one grouped query
+    (bar_name None = left area; an entry of 12 yogurts counts 12)
+    :return: {(bucket, bar_name): units}
+    """
+    today = date.today().toordinal()
+    cases = []
+    params = []
+    for name, (start, end) in BUCKETS.items():
+        cond = []
+        if start is not None:
+            cond.append("expiry_ord - ? >= ?")
+            params += [today, start]
+        if end is not None:
+            cond.append("expiry_ord - ? <= ?")
+            params += [today, end]
+        cases.append(f"WHEN {' AND '.join(cond)} THEN ?")
+        params.append(name)
+
+    conn = _connect()
+    try:
+        rows = conn.execute(f"""
+            SELECT CASE {' '.join(cases)} END, bar_name, SUM(quantity)
+            FROM items
+            WHERE deleted_at IS NULL AND expiry_ord IS NOT NULL
+            GROUP BY 1, 2
+        """, params).fetchall()
+    finally:
+        conn.close()
+
+    return {(bucket, bar_name): count for bucket, bar_name, count in rows}
+
+
+def inventory_summary():
+    """
+    Whole-inventory unit counts (command line, HTTP API):
+    total, per bucket, per (bucket, bar_name), and the number of trashed items
+    """
+    counts = bucket_counts()
+    _, trashed = load_trash_page(1)
+    return {
+        "total": sum(counts.values()),
+        "buckets": {name: sum(n for (b, _), n in counts.items() if b == name) for name in BUCKETS},
+        "bars": [
+            {"bucket": bucket, "bar_name": bar_name, "count": n}
+            for (bucket, bar_name), n in sorted(counts.items(), key=lambda kv: (kv[0][0], kv[0][1] or ""))
+        ],
+        "trash": trashed,
     }
 
-    today = date.today()
-
-    for item_name, expired_day in rows:
-        try:
-            d = datetime.strptime(expired_day, "%Y-%m-%d").date()
-            diff = (d - today).days
-        except:
-            continue
-
-        if diff > 30:
-            stats[">30"].append(item_name)
-        elif 7 <= diff <= 30:
-            stats["7~30"].append(item_name)
-        elif 0 <= diff < 7:
-            stats["<7"].append(item_name)
-        else:
-            stats["expired"].append(item_name)
 
-    return stats
\ No newline at end of file
+def waste_report(months=12):
+    """
+    Item history per timeline per month, read from the monthly rollup only
+    (item_events itself is never scanned, so this stays fast with years of history)
+
+    Args:
+        months (int | None): newest months to include (None = all)
+
+    Return:
+        [(month 'YYYY-MM', bar_name (None = left area), added, consumed, discarded, expired), ...]
+        newest month first
+    """
+    sql = "SELECT month, bar_name, added, consumed, discarded, expired FROM waste_by_bar_month"
+    params = []
+    if months is not None:
+        sql += """
+            WHERE month >= (
+                SELECT MIN(month) FROM (
+                    SELECT DISTINCT month FROM item_events_monthly ORDER BY month DESC LIMIT ?
+                )
+            )
+        """
+        params.append(months)
+    sql += " ORDER BY month DESC, bar_name"
+
+    conn = _connect()
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    return [(month, bar or None, *counts) for month, bar, *counts in rows]
+
+
+def get_sql_stats():
+    """
+    Return SQL statistical information, including:
+    - Quantity of each category
+    - Item name list corresponding to each category (ordered by expiry)
+    """
+    conn = _connect()
+    try:
+        return {
+            name: [row[1] for row in items_expiring_between(start, end, conn=conn)]
+            for name, (start, end) in BUCKETS.items()
+        }
+    finally:
+        conn.close()
@@ -8,11 +8,12 @@ from datetime import date
 
 def custom_input_dialog(parent):
     """
-    Create custom input dialog for entering item name and expiration date.
+    Create custom input dialog for entering item name, expiration date and quantity.
 
     This dialog contains:
     - Item name input field
     - Expiration date selection (year/month/day dropdowns)
+    - Quantity spinbox (units bought, default 1)
     - Automatic date validation and day updates
     - Input auto-jump feature
 
@@ -20,9 +21,10 @@ def custom_input_dialog(parent):
         parent: Parent window, usually the main window or the window calling this dialog
 
     Returns:
-        tuple: If the user confirms input, return (item_name, expired_date)
+        tuple: If the user confirms input, return (item_name, expired_date, quantity)
                item_name (str): Name of the item
-               expired_date (datetime.date): Expiration date
+               expired_date (str): Expiration date, YYYY-MM-DD
+               quantity (int): Number of units, at least 1
                If the user cancels or closes the dialog, return None
 
     Features:
@@ -34,7 +36,7 @@ def custom_input_dialog(parent):
     """
     dialog = tk.Toplevel(parent)
     dialog.title("Add Item")
-    dialog.geometry("360x260")
+    dialog.geometry("360x320")
     dialog.grab_set()
 
     today = date.today()
@@ -140,6 +142,11 @@ def custom_input_dialog(parent):
     # Initial day list
     update_days()
 
+    # Quantity
+    ttk.Label(dialog, text="Quantity:").pack(pady=(10, 3))
+    quantity_var = tk.StringVar(value="1")
+    ttk.Spinbox(dialog, from_=1, to=999, textvariable=quantity_var, width=6).pack()
+
 
     def on_year_input(event):
         """Auto-jump to month field after entering 4 digits of year"""
@@ -170,10 +177,11 @@ def custom_input_dialog(parent):
         3. Year/month/day must be numeric.
         4. Date must be a real valid calendar date.
         5. Expiration date must not be earlier than today.
+        6. Quantity must be a whole number of at least 1.
 
         If all validations pass:
             - Format the date as YYYY-MM-DD
-            - Store (name, formatted_date) into result["value"]
+            - Store (name, formatted_date, quantity) into result["value"]
             - Close the dialog
 
         If any validation fails:
@@ -214,8 +222,17 @@ def custom_input_dialog(parent):
             messagebox.showerror("Error", "Expiration date cannot be earlier than today")
             return
 
+        # Quantity check
+        try:
+            quantity = int(quantity_var.get().strip())
+        except ValueError:
+            quantity = 0
+        if quantity < 1:
+            messagebox.showerror("Error", "Quantity must be a whole number of at least 1")
+            return
+
         day_str = f"{y:04d}-{m:02d}-{d:02d}"
-        result["value"] = (name, day_str)
+        result["value"] = (name, day_str, quantity)
         dialog.destroy()
 
     ttk.Button(dialog, text="Confirm", command=on_confirm).pack(pady=10)
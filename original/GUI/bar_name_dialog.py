@@ -5,16 +5,17 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 
 
-def bar_name_dialog(parent):
+def bar_name_dialog(parent, title="Add New Bar", prompt="Please enter category name:"):
     """
     Popup input dialog, return bar_name
+    (title / prompt can be changed to reuse it for other names)
     """
     dialog = tk.Toplevel(parent)
-    dialog.title("Add New Bar")
+    dialog.title(title)
     dialog.geometry("260x130")
     dialog.grab_set()
 
-    ttk.Label(dialog, text="Please enter category name:").pack(pady=10)
+    ttk.Label(dialog, text=prompt).pack(pady=10)
 
     name_var = tk.StringVar()
     entry = ttk.Entry(dialog, textvariable=name_var, width=20)
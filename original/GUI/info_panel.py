@@ -0,0 +1,320 @@
+"""
+Info panel: collapsible expiry overview (bucket → timeline → item)
+- Only counts are loaded up front; item rows are loaded a page at a time
+  when a timeline is expanded or its "load more" row scrolls into view
+- Scene events are applied as single-row inserts / removals, one batch per idle cycle
+"""
+import bisect
+from datetime import date
+from tkinter import ttk
+from Core.add_item_sql import day_ordinal
+from Core.sql_stats import BUCKETS, bucket_of, bucket_counts, items_expiring_between
+from Core.db_worker import run_async
+from Core.dragdrop.ball import entry_label
+
+
+class _Group:
+    """Loaded state of one (bucket, timeline) node"""
+
+    __slots__ = ("iid", "keys", "complete", "loading", "pending", "more_iid")
+
+    def __init__(self, iid):
+        self.iid = iid
+        self.keys = []          # Sorted (expiry_ord, item_id) of inserted rows
+        self.complete = False   # Every row of the group is inserted
+        self.loading = False
+        self.pending = []       # Scene changes received while a page was loading
+        self.more_iid = None
+
+
+class InfoPanel:
+    """
+    ttk.Treeview view of live items:
+    - Level 1: buckets (> 30 days / 7 ~ 30 days / < 7 days / Expired) with unit counts
+    - Level 2: timelines in the bucket (left area first) with unit counts
+    - Level 3: items ordered by expiry ("Yogurt ×12"), PAGE_SIZE rows per SQL page
+    - snapshot (optional ExpirySnapshot): recounts after large batches / midnight
+      come from it instead of SQL
+    """
+
+    PAGE_SIZE = 200
+    RELOAD_THRESHOLD = 500   # Event batches larger than this re-read counts instead
+
+    BUCKET_LABELS = {
+        ">30": "> 30 days",
+        "7~30": "7 ~ 30 days",
+        "<7": "< 7 days",
+        "expired": "Expired",
+    }
+    LEFT_AREA = "(left area)"
+    MORE_TEXT = "Load more..."
+
+    def __init__(self, parent, snapshot=None):
+        self.tree = ttk.Treeview(parent, columns=("expiry", "days"), show="tree headings",
+                                 selectmode="browse")
+        self.tree.heading("#0", text="Item")
+        self.tree.heading("expiry", text="Expiry")
+        self.tree.heading("days", text="Days")
+        self.tree.column("#0", width=200, stretch=True)
+        self.tree.column("expiry", width=90, stretch=False, anchor="center")
+        self.tree.column("days", width=50, stretch=False, anchor="e")
+
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        self._yscroll = None
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+        self.snapshot = snapshot
+        self._counts = {}      # (bucket, bar_name) → units
+        self._groups = {}      # (bucket, bar_name) → _Group
+        self._group_keys = {}  # group iid → (bucket, bar_name)
+        self._more = {}        # "load more" iid → (bucket, bar_name)
+        self._filled = set()   # Buckets whose timeline nodes are inserted
+        self._today = date.today().toordinal()
+        self._next_iid = 0
+
+        self._build_buckets()
+
+    def grid(self, **kw):
+        self.tree.grid(**kw)
+
+    def set_scrollbar(self, scrollbar):
+        """Connect a vertical scrollbar (yscrollcommand is shared with lazy loading)"""
+        self._yscroll = scrollbar.set
+        scrollbar.config(command=self.tree.yview)
+
+    # ---- full load ----
+
+    def reload(self):
+        """Re-read counts from SQL (startup, import, profile switch, new day)"""
+        run_async(bucket_counts, on_done=self._on_counts)
+
+    def _recount(self):
+        """Counts from the snapshot if it is loaded (already holds this batch), else SQL"""
+        if self.snapshot is not None and self.snapshot.loaded:
+            self._on_counts(self.snapshot.bucket_counts())
+        else:
+            self.reload()
+
+    def _on_counts(self, counts):
+        opened = [key for key, group in self._groups.items() if self.tree.item(group.iid, "open")]
+        opened_buckets = [b for b in BUCKETS if self.tree.item(b, "open")]
+
+        self._counts = dict(counts)
+        self._today = date.today().toordinal()
+        self._build_buckets()
+
+        for bucket in opened_buckets:
+            self.tree.item(bucket, open=True)
+            self._fill_bucket(bucket)
+        for key in opened:
+            group = self._groups.get(key)
+            if group is not None:
+                self.tree.item(group.iid, open=True)
+                self._load_page(key)
+
+    def _build_buckets(self):
+        self.tree.delete(*self.tree.get_children())
+        self._groups.clear()
+        self._group_keys.clear()
+        self._more.clear()
+        self._filled.clear()
+
+        for bucket in BUCKETS:
+            self.tree.insert("", "end", iid=bucket, text=self._bucket_text(bucket))
+            # Placeholder child so the bucket can be expanded
+            self.tree.insert(bucket, "end", text="")
+
+    def _bucket_text(self, bucket):
+        total = sum(n for (b, _), n in self._counts.items() if b == bucket)
+        return f"{self.BUCKET_LABELS[bucket]} ({total})"
+
+    def _group_text(self, key):
+        bar_name = key[1]
+        return f"{bar_name if bar_name is not None else self.LEFT_AREA} ({self._counts.get(key, 0)})"
+
+    # ---- lazy loading ----
+
+    def _on_open(self, event=None):
+        iid = self.tree.focus()
+        if iid in BUCKETS:
+            self._fill_bucket(iid)
+        elif iid in self._group_keys:
+            key = self._group_keys[iid]
+            if not self._groups[key].keys:
+                self._load_page(key)
+
+    def _fill_bucket(self, bucket):
+        """Insert the timeline nodes of a bucket (counts are already in memory)"""
+        if bucket in self._filled:
+            return
+        self._filled.add(bucket)
+        self.tree.delete(*self.tree.get_children(bucket))
+        bars = sorted((bar for (b, bar), n in self._counts.items() if b == bucket and n > 0),
+                      key=self._bar_sort_key)
+        for bar_name in bars:
+            self._insert_group((bucket, bar_name), "end")
+
+    @staticmethod
+    def _bar_sort_key(bar_name):
+        return (bar_name is not None, bar_name or "")
+
+    def _insert_group(self, key, index):
+        self._next_iid += 1
+        iid = f"g{self._next_iid}"
+        self.tree.insert(key[0], index, iid=iid, text=self._group_text(key))
+        self.tree.insert(iid, "end", text="")   # Placeholder until the first page
+        self._groups[key] = _Group(iid)
+        self._group_keys[iid] = key
+        return self._groups[key]
+
+    def _load_page(self, key):
+        """Fetch the next PAGE_SIZE rows of a group after its last inserted key"""
+        group = self._groups[key]
+        if group.loading or group.complete:
+            return
+        group.loading = True
+
+        start, end = BUCKETS[key[0]]
+        run_async(
+            items_expiring_between, start, end, bar_name=key[1],
+            limit=self.PAGE_SIZE, after=group.keys[-1] if group.keys else None,
+            on_done=lambda rows: self._on_page(key, group, rows)
+        )
+
+    def _on_page(self, key, group, rows):
+        if self._groups.get(key) is not group:
+            return  # Reloaded meanwhile
+        group.loading = False
+
+        if not group.keys:
+            self.tree.delete(*self.tree.get_children(group.iid))
+        if group.more_iid is not None:
+            self.tree.delete(group.more_iid)
+            self._more.pop(group.more_iid, None)
+            group.more_iid = None
+
+        for item_id, name, expired_day, _, remaining, quantity in rows:
+            if self.tree.exists(f"i{item_id}"):
+                continue
+            group.keys.append((self._today + remaining, item_id))
+            self.tree.insert(group.iid, "end", iid=f"i{item_id}", text=entry_label(name, quantity),
+                             values=(expired_day, remaining))
+
+        if len(rows) < self.PAGE_SIZE:
+            group.complete = True
+        else:
+            self._next_iid += 1
+            group.more_iid = f"m{self._next_iid}"
+            self.tree.insert(group.iid, "end", iid=group.more_iid, text=self.MORE_TEXT)
+            self._more[group.more_iid] = key
+
+        pending, group.pending = group.pending, []
+        for change in pending:
+            change()
+
+    def _on_select(self, event=None):
+        for iid in self.tree.selection():
+            if iid in self._more:
+                self._load_page(self._more[iid])
+
+    def _on_scroll(self, first, last):
+        """Load the next page of any "load more" row that became visible"""
+        if self._yscroll is not None:
+            self._yscroll(first, last)
+        for iid, key in list(self._more.items()):
+            if self.tree.bbox(iid):
+                self._load_page(key)
+
+    # ---- scene events (DragDropManager.events) ----
+
+    EVENT_KINDS = ("item_added", "item_removed", "item_moved", "item_trashed", "units_changed",
+                   "bar_renamed", "db_reloaded")
+
+    def on_events(self, events):
+        """One batch per idle cycle; large batches are cheaper as one recount"""
+        if any(e.KIND == "db_reloaded" for e in events):
+            self.reload()
+            return
+        if len(events) > self.RELOAD_THRESHOLD or date.today().toordinal() != self._today \
+                or any(e.KIND == "bar_renamed" for e in events):
+            self._recount()   # Many changes, buckets shifted at midnight, or groups relabeled
+            return
+
+        for e in events:
+            if e.KIND == "item_added":
+                self._apply(e.item_id, e.item_name, e.expired_day, e.bar_name, e.quantity, e.quantity)
+            elif e.KIND in ("item_removed", "item_trashed"):
+                self._apply(e.item_id, None, e.expired_day, e.bar_name, -e.quantity, 0)
+            elif e.KIND == "item_moved":
+                self._apply(e.item_id, e.item_name, e.expired_day, e.old_bar, -e.quantity, 0)
+                self._apply(e.item_id, e.item_name, e.expired_day, e.new_bar, e.quantity, e.quantity)
+            elif e.KIND == "units_changed":
+                self._apply(e.item_id, e.item_name, e.expired_day, e.bar_name, e.delta, e.quantity)
+
+    def _apply(self, item_id, name, expired_day, bar_name, delta, quantity):
+        """
+        Unit count change + single-row insert / relabel / removal in one (bucket, timeline) group
+        :param delta: units gained (+) or lost (-) by the group
+        :param quantity: the entry's units after the change, 0 = its row leaves the group
+        """
+        day = day_ordinal(expired_day)
+        if day is None:
+            return
+        bucket = bucket_of(day - self._today)
+        key = (bucket, bar_name)
+
+        count = self._counts.get(key, 0) + delta
+        self._counts[key] = max(0, count)
+        self.tree.item(bucket, text=self._bucket_text(bucket))
+
+        group = self._groups.get(key)
+        if group is None:
+            if delta > 0 and bucket in self._filled:
+                # New timeline node in sorted position
+                sort_key = self._bar_sort_key(bar_name)
+                index = sum(1 for b, bar in self._groups
+                            if b == bucket and self._bar_sort_key(bar) < sort_key)
+                self._insert_group(key, index)
+            return
+
+        if self._counts[key] == 0:
+            self.tree.delete(group.iid)
+            del self._groups[key]
+            del self._group_keys[group.iid]
+            if group.more_iid is not None:
+                self._more.pop(group.more_iid, None)
+            return
+
+        self.tree.item(group.iid, text=self._group_text(key))
+
+        row = ((day, item_id), name, expired_day)
+        if group.loading:
+            group.pending.append(lambda: self._apply_row(group, row, quantity))
+        else:
+            self._apply_row(group, row, quantity)
+
+    def _apply_row(self, group, row, quantity):
+        item_key, name, expired_day = row
+        iid = f"i{item_key[1]}"
+        if quantity == 0:
+            if self.tree.exists(iid):
+                pos = bisect.bisect_left(group.keys, item_key)
+                if pos < len(group.keys) and group.keys[pos] == item_key:
+                    del group.keys[pos]
+                self.tree.delete(iid)
+            return
+
+        if self.tree.exists(iid):
+            self.tree.item(iid, text=entry_label(name, quantity))   # Units changed
+            return
+        if not group.keys and not group.complete:
+            return  # Group never expanded: row comes with the first page
+        if not group.complete and item_key > group.keys[-1]:
+            return  # Beyond the loaded window: comes with a later page
+
+        pos = bisect.bisect(group.keys, item_key)
+        group.keys.insert(pos, item_key)
+        self.tree.insert(group.iid, pos, iid=iid, text=entry_label(name, quantity),
+                         values=(expired_day, item_key[0] - self._today))
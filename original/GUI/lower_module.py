@@ -4,7 +4,11 @@ Main module design for lower area, main frame uses Grid
 import tkinter as tk
 from tkinter import ttk
 from GUI.add_item import custom_input_dialog
-from Core.add_item_sql import insert_products
+from Core.add_item_sql import stock_item
+from Core.dragdrop.journal import AddItem, AddUnits
+from Core.db_worker import run_async
+from GUI.info_panel import InfoPanel
+from GUI.trash_panel import TrashPanel
 
 from PIL import Image, ImageTk
 import os
@@ -21,6 +25,9 @@ class LowerModule:
     Must use grid layout only; pack is disabled to ensure horizontal arrangement.
     """
 
+    # Trashed items shown in the preview (newest first)
+    TRASH_PAGE_SIZE = 200
+
     def __init__(self, parent, manager):
         self.parent = parent
         self.manager = manager
@@ -106,21 +113,26 @@ class LowerModule:
     def add_item_via_dialog(self):
         """
         Open input dialog, write into SQL, generate ball, refresh statistics
+        Units of an item already in the left area (same name and date) join its ball
         """
         data = custom_input_dialog(self.frame)
         if not data:
             return  # User canceled
 
-        name, expired_day = data
-
-        # Write to database
-        insert_products(name, expired_day)
+        name, expired_day, quantity = data
 
-        # Generate new ball
-        self.manager.create_ball(name, expired_day)
+        def on_stocked(result):
+            item_id, total, created = result
+            if created:
+                # Generate new ball (panels are updated through the manager's events)
+                self.manager.create_ball(name, expired_day, item_id, quantity=total)
+                self.manager.journal.record(AddItem(item_id, name, expired_day, total))
+            else:
+                self.manager.add_units(item_id, quantity)
+                self.manager.journal.record(AddUnits(item_id, quantity))
 
-        # Refresh stats
-        self.update_sql_stats()
+        # Write to database (DB worker), ball is created / updated once the row is known
+        run_async(stock_item, name, expired_day, quantity, on_done=on_stocked)
 
 
     def _build_middle_block(self):
@@ -142,45 +154,20 @@ class LowerModule:
         scroll = ttk.Scrollbar(middle)
         scroll.grid(row=1, column=1, sticky="ns")
 
-        # Text display (read-only)
-        self.stats_text = tk.Text(
-            middle,
-            wrap="word",
-            font=("Arial", 9),
-            state="disabled"
-        )
-        self.stats_text.grid(row=1, column=0, sticky="nsew", padx=(5, 0), pady=5)
+        # Expiry tree (bucket → timeline → item), rows loaded on expand / scroll
+        self.info_panel = InfoPanel(middle, snapshot=self.manager.snapshot)
+        self.info_panel.grid(row=1, column=0, sticky="nsew", padx=(5, 0), pady=5)
+        self.info_panel.set_scrollbar(scroll)
 
-        scroll.config(command=self.stats_text.yview)
-        self.stats_text.config(yscrollcommand=scroll.set)
+        # Scene changes (add / trash / move) are applied row by row, once per idle cycle
+        self.manager.events.subscribe(self.info_panel.on_events, *InfoPanel.EVENT_KINDS)
 
     def update_sql_stats(self):
         """
-        Read statistics from SQL and display them in scrollable text box
+        Reload Info panel counts from SQL
+        (done on the db_reloaded event: startup, import, profile switch, Clear)
         """
-        from Core.sql_stats import get_sql_stats
-        stats = get_sql_stats()
-
-        def lst_text(lst):
-            """
-            Display internal SQL variable statistics
-            """
-            if not lst:
-                return "(none)"
-            return "\n".join(f"- {item}" for item in lst)
-
-        text = (
-            f"Total: {sum(len(v) for v in stats.values())}\n\n"
-            f"> 30 days ({len(stats['>30'])}):\n{lst_text(stats['>30'])}\n\n"
-            f"7 ~ 30 days ({len(stats['7~30'])}):\n{lst_text(stats['7~30'])}\n\n"
-            f"< 7 days ({len(stats['<7'])}):\n{lst_text(stats['<7'])}\n\n"
-            f"Expired ({len(stats['expired'])}):\n{lst_text(stats['expired'])}"
-        )
-
-        self.stats_text.config(state="normal")
-        self.stats_text.delete("1.0", "end")
-        self.stats_text.insert("end", text)
-        self.stats_text.config(state="disabled")
+        self.info_panel.reload()
 
 
     def _build_right_block(self):
@@ -194,44 +181,27 @@ class LowerModule:
         right.grid_rowconfigure(1, weight=1)
         right.grid_propagate(False)
 
-        title = ttk.Label(right, text="Trash Preview", font=("Arial", 10, "bold"))
+        self.trash_title = tk.StringVar(value=TrashPanel.TITLE)
+        title = ttk.Label(right, textvariable=self.trash_title, font=("Arial", 10, "bold"))
         title.grid(row=0, column=0, sticky="w", padx=5, pady=5)
 
         refresh_btn = ttk.Button(right, text="Refresh", command=self.update_trash_preview)
         refresh_btn.grid(row=0, column=1, sticky="e", padx=5, pady=5)
 
-        # Trash preview Text + Scrollbar
+        # Trash preview list + Scrollbar
         scroll = ttk.Scrollbar(right)
         scroll.grid(row=1, column=1, sticky="ns")
 
-        self.trash_preview = tk.Text(
-            right,
-            wrap="word",
-            font=("Arial", 9),
-            state="disabled"
-        )
-        self.trash_preview.grid(row=1, column=0, sticky="nsew", padx=(5, 0), pady=5)
+        self.trash_panel = TrashPanel(right, title_var=self.trash_title)
+        self.trash_panel.grid(row=1, column=0, sticky="nsew", padx=(5, 0), pady=5)
+        self.trash_panel.set_scrollbar(scroll)
 
-        scroll.config(command=self.trash_preview.yview)
-        self.trash_preview.config(yscrollcommand=scroll.set)
+        # Trash / restore / empty are applied row by row, once per idle cycle
+        self.manager.events.subscribe(self.trash_panel.on_events, *TrashPanel.EVENT_KINDS)
 
     def update_trash_preview(self):
         """
-        Trash display function; if trash bin is empty show (none),
-        refresh content through refresh button
+        Reload the trash preview from SQL (Refresh button);
+        day-to-day changes arrive through the manager's events
         """
-        self.update_sql_stats()
-        trash_list = self.manager.trash_bin.trash_list
-
-        if not trash_list:
-            text = "(no trash)"
-        else:
-            lines = []
-            for b in trash_list:
-                lines.append(f"- {b.name} ({b.expired_day})")
-            text = "\n".join(lines)
-
-        self.trash_preview.config(state="normal")
-        self.trash_preview.delete("1.0", "end")
-        self.trash_preview.insert("end", text)
-        self.trash_preview.config(state="disabled")
\ No newline at end of file
+        self.trash_panel.reload()
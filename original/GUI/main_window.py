@@ -6,6 +6,11 @@ from tkinter import ttk
 from .menu import create_menu
 from .upper_model import UpperModule
 from .lower_module import LowerModule
+from Core.db_worker import start_worker, stop_worker, run_async
+from Core.add_item_sql import log_expired_items
+from Core.notifier import ExpiryNotifier
+from Core.events import DbReloaded
+from .toast import Toast
 
 
 class StorageTracker:
@@ -33,6 +38,10 @@ class StorageTracker:
         self.root.geometry(f"{win_w}x{win_h}+{pos_x}+{pos_y}")
         self.root.minsize(800, 600)
 
+        # All SQL issued from the UI runs on this thread; results come back via after()
+        start_worker(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
         self.root.grid_rowconfigure(0, weight=3, minsize=0)
         self.root.grid_rowconfigure(1, weight=2, minsize=0)
         self.root.grid_columnconfigure(0, weight=1)
@@ -41,7 +50,16 @@ class StorageTracker:
 
         self.lower_model = LowerModule(self.root, self.upper_model.manager)
 
-        self.lower_model.update_sql_stats()
+        # Expiry alerts: one timer for the next alert, fed by scene events
+        self.toast = Toast(self.root)
+        self.notifier = ExpiryNotifier(self.root, self.upper_model.manager, show=self.toast.show)
+        self.upper_model.manager.events.subscribe(self.notifier.on_events, *ExpiryNotifier.EVENT_KINDS)
+
+        # Views load their first state the same way they follow a database import
+        self.upper_model.manager.events.publish(DbReloaded())
+
+        # Waste history: items that went off while the app was closed
+        run_async(log_expired_items)
 
         create_menu(self)
 
@@ -51,4 +69,12 @@ class StorageTracker:
         Main loop runner
         """
 
-        self.root.mainloop()
\ No newline at end of file
+        self.root.mainloop()
+
+    def close(self):
+        """
+        Let queued SQL writes finish, then close the window
+        """
+        self.notifier.cancel()
+        stop_worker()
+        self.root.destroy()
\ No newline at end of file
@@ -3,9 +3,13 @@ Top menu structure code
 """
 import tkinter as tk
 from tkinter import messagebox
-from Core.add_item_sql import clear_all_items
+from Core.add_item_sql import clear_all_items, log_expired_items
+from Core.sql_stats import waste_report
 from Core.list_generate import generate_from_sql
 from Core.port_in_out import export_db, import_db
+from Core import profiles
+from Core.db_worker import run_async, get_worker
+from GUI.bar_name_dialog import bar_name_dialog
 
 
 def create_menu(app):
@@ -33,12 +37,114 @@ def create_menu(app):
 
     file_menu.add_command(label="Instruction", command=new_window)
     file_menu.add_command(label="Test", command=lambda: generate_from_sql())
-    file_menu.add_command(label="Clear", command=lambda: clear_all_items())
+    def clear():
+        # Worker queue is FIFO: the reload reads after the delete has run;
+        # canvas and panels follow through the db_reloaded event
+        run_async(clear_all_items)
+        app.upper_model.manager.reload_from_sql()
+
+    file_menu.add_command(label="Clear", command=clear)
     file_menu.add_command(label="Export Database", command=lambda: export_db(app))
     file_menu.add_command(label="Import Database", command=lambda: import_db(app))
 
     file_menu.add_separator()
-    file_menu.add_command(label="Exit", command=app.root.quit)
+    file_menu.add_command(label="Exit", command=app.close)
+
+
+    edit_menu = tk.Menu(menubar, tearoff=0)
+    menubar.add_cascade(label="Edit", menu=edit_menu)
+
+    # Panels follow undo / redo through the manager's events
+    def undo(event=None):
+        app.upper_model.manager.journal.undo()
+
+    def redo(event=None):
+        app.upper_model.manager.journal.redo()
+
+    edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=undo)
+    edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=redo)
+    app.root.bind_all("<Control-z>", undo)
+    app.root.bind_all("<Control-y>", redo)
+
+
+    profile_menu = tk.Menu(menubar, tearoff=0)
+    menubar.add_cascade(label="Profile", menu=profile_menu)
+    overlay_menu = tk.Menu(profile_menu, tearoff=0)
+
+    active_var = tk.StringVar(value=profiles.active_profile())
+    overlay_vars = {}
+
+    def refresh_views():
+        # Info panel / trash preview reload on the db_reloaded event
+        app.root.title(f"Food Management System - {profiles.active_profile()}")
+
+    def switch_to(name):
+        manager = app.upper_model.manager
+        manager.overlay_profiles = [p for p in manager.overlay_profiles if p != name]
+        if name in overlay_vars:
+            overlay_vars[name].set(False)
+        # Switch on the DB worker so queued writes still land in the old profile,
+        # then diff-reload: only items that differ between the two inventories are redrawn
+        run_async(profiles.switch_profile, name)
+        manager.reload_from_sql(on_done=lambda _: refresh_views())
+
+    def toggle_overlay():
+        manager = app.upper_model.manager
+        manager.set_overlay_profiles(
+            [name for name, var in overlay_vars.items() if var.get()]
+        )
+
+    def new_profile():
+        name = bar_name_dialog(app.root, title="New Profile", prompt="Please enter profile name:")
+        if not name:
+            return
+
+        def on_created(created):
+            active_var.set(created)
+            switch_to(created)
+
+        run_async(
+            profiles.create_profile, name,
+            on_done=on_created,
+            on_error=lambda e: messagebox.showerror("Error", str(e))
+        )
+
+    def show_cross_stats():
+        run_async(profiles.cross_profile_stats, on_done=show_stats_box)
+
+    def show_stats_box(stats):
+        lines = []
+        for name, buckets in stats.items():
+            lines.append(
+                f"{name}: total {sum(buckets.values())}  "
+                f"(>30: {buckets['>30']}, 7~30: {buckets['7~30']}, "
+                f"<7: {buckets['<7']}, expired: {buckets['expired']})"
+            )
+        messagebox.showinfo("Cross-Profile Stats", "\n".join(lines))
+
+    def rebuild_profile_menu():
+        """Profile list is read when the menu opens"""
+        profile_menu.delete(0, "end")
+        overlay_menu.delete(0, "end")
+        active = profiles.active_profile()
+        active_var.set(active)
+
+        for name in profiles.list_profiles():
+            profile_menu.add_radiobutton(
+                label=name, value=name, variable=active_var,
+                command=lambda n=name: switch_to(n)
+            )
+            if name != active:
+                var = overlay_vars.setdefault(name, tk.BooleanVar(value=False))
+                overlay_menu.add_checkbutton(label=name, variable=var, command=toggle_overlay)
+
+        profile_menu.add_separator()
+        profile_menu.add_command(label="New Profile...", command=new_profile)
+        profile_menu.add_cascade(label="Overlay", menu=overlay_menu)
+        profile_menu.add_command(label="Cross-Profile Stats", command=show_cross_stats)
+
+    profile_menu.configure(postcommand=rebuild_profile_menu)
+    rebuild_profile_menu()
 
 
     help_menu = tk.Menu(menubar, tearoff=0)
@@ -53,4 +159,43 @@ def create_menu(app):
             "Version V3.5 (I experienced two structure collapses — this is the third major rebuild, fifth conceptual result.)"
         )
 
-    help_menu.add_command(label="About", command=about)
\ No newline at end of file
+    def worker_stats():
+        worker = get_worker()
+        if worker is None:
+            messagebox.showinfo("DB Worker", "No background worker is running.")
+            return
+        m = worker.metrics()
+        messagebox.showinfo(
+            "DB Worker",
+            f"Queued jobs: {m['queue_depth']}\n"
+            f"Completed: {m['completed']}  Failed: {m['failed']}\n\n"
+            f"Wait (ms): avg {m['wait_ms']['avg']:.1f}, p95 {m['wait_ms']['p95']:.1f}, "
+            f"max {m['wait_ms']['max']:.1f}\n"
+            f"Run (ms): avg {m['run_ms']['avg']:.1f}, p95 {m['run_ms']['p95']:.1f}, "
+            f"max {m['run_ms']['max']:.1f}"
+        )
+
+    def show_waste_report():
+        # FIFO worker: items that went off since startup are logged before the report reads
+        run_async(log_expired_items)
+        run_async(waste_report, on_done=show_waste_box)
+
+    def show_waste_box(rows):
+        if not rows:
+            messagebox.showinfo("Waste Report", "No history yet.")
+            return
+        lines = []
+        month = None
+        for m, bar_name, added, consumed, discarded, expired in rows:
+            if m != month:
+                month = m
+                lines.append(f"{month}")
+            lines.append(
+                f"    {bar_name or 'left area'}: wasted {discarded}  "
+                f"(used {consumed}, added {added}, went off {expired})"
+            )
+        messagebox.showinfo("Waste Report (last 12 months)", "\n".join(lines))
+
+    help_menu.add_command(label="About", command=about)
+    help_menu.add_command(label="DB Worker Stats", command=worker_stats)
+    help_menu.add_command(label="Waste Report", command=show_waste_report)
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Non-blocking progress popup (used by database export/import)
+"""
+import tkinter as tk
+from tkinter import ttk
+
+
+class ProgressDialog:
+    """
+    Small progress window:
+    - Title + status text
+    - Determinate progress bar
+    - Does not block the main loop (caller updates it)
+    """
+
+    def __init__(self, parent, title, text="Working..."):
+        self.top = tk.Toplevel(parent)
+        self.top.title(title)
+        self.top.geometry("320x100")
+        self.top.resizable(False, False)
+        self.top.transient(parent)
+        # Closing is ignored until the job finishes
+        self.top.protocol("WM_DELETE_WINDOW", lambda: None)
+
+        self.label_var = tk.StringVar(value=text)
+        ttk.Label(self.top, textvariable=self.label_var).pack(pady=(15, 5))
+
+        self.bar = ttk.Progressbar(self.top, mode="determinate", length=260, maximum=100)
+        self.bar.pack(pady=5)
+
+    def update(self, done, total):
+        """
+        Show progress (pages done / total pages)
+        """
+        percent = 100 if total <= 0 else done * 100 / total
+        self.bar["value"] = percent
+        self.label_var.set(f"{percent:.0f}%  ({done}/{total} pages)")
+
+    def close(self):
+        """Close window"""
+        try:
+            self.top.destroy()
+        except tk.TclError:
+            pass
@@ -0,0 +1,64 @@
+"""
+Split a timeline
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+
+def split_bar_dialog(parent, bar_name):
+    """
+    Popup input dialog for splitting a timeline
+    Items matching every filled filter move to the target bar
+    :return: (new_name, min_days, max_days, name_filter), or None if canceled
+             (min_days / max_days: days left, None if empty; name_filter: "" if empty)
+    """
+    dialog = tk.Toplevel(parent)
+    dialog.title(f"Split Bar - {bar_name}")
+    dialog.geometry("300x250")
+    dialog.grab_set()
+
+    ttk.Label(dialog, text="Move matching items to bar:").pack(pady=(10, 3))
+    name_var = tk.StringVar()
+    entry = ttk.Entry(dialog, textvariable=name_var, width=24)
+    entry.pack()
+    entry.focus()
+
+    # Days left range
+    ttk.Label(dialog, text="Days left (from / to, empty = any):").pack(pady=(10, 3))
+    days_frame = ttk.Frame(dialog)
+    days_frame.pack()
+    min_var = tk.StringVar()
+    max_var = tk.StringVar()
+    ttk.Entry(days_frame, textvariable=min_var, width=6).grid(row=0, column=0, padx=3)
+    ttk.Label(days_frame, text="~").grid(row=0, column=1)
+    ttk.Entry(days_frame, textvariable=max_var, width=6).grid(row=0, column=2, padx=3)
+
+    ttk.Label(dialog, text="Item name contains:").pack(pady=(10, 3))
+    filter_var = tk.StringVar()
+    ttk.Entry(dialog, textvariable=filter_var, width=24).pack()
+
+    result = {"value": None}
+
+    def confirm():
+        """
+        Check the target name and the day range
+        """
+        name = name_var.get().strip()
+        if not name:
+            messagebox.showwarning("Error", "Name cannot be empty")
+            return
+        try:
+            days = [int(v.get()) if v.get().strip() else None for v in (min_var, max_var)]
+        except ValueError:
+            messagebox.showwarning("Error", "Days must be whole numbers")
+            return
+        result["value"] = (name, days[0], days[1], filter_var.get().strip())
+        dialog.destroy()
+
+    buttons = ttk.Frame(dialog)
+    buttons.pack(pady=12)
+    ttk.Button(buttons, text="Confirm", command=confirm).grid(row=0, column=0, padx=5)
+    ttk.Button(buttons, text="Cancel", command=dialog.destroy).grid(row=0, column=1, padx=5)
+
+    dialog.wait_window()
+    return result["value"]
@@ -0,0 +1,67 @@
+"""
+Small non-blocking notification popup (bottom-right of the main window)
+"""
+import tkinter as tk
+
+
+class Toast:
+    """
+    Notification window:
+    - Shown at the bottom-right corner of the parent window
+    - Closes itself after SHOW_MS, or on click
+    - A new message replaces the one on screen
+    """
+
+    BG_COLOR = "#f5f5dc"   # Beige, same as tooltips
+    FONT = ("Arial", 10)
+    SHOW_MS = 8000
+    MARGIN = 20
+
+    def __init__(self, parent, title="Expiry Alert"):
+        self.parent = parent
+        self.title = title
+        self.top = None
+        self._timer = None
+
+    def show(self, lines):
+        """
+        Show one notification
+        :param lines: message lines
+        """
+        self.close()
+
+        self.top = tk.Toplevel(self.parent)
+        self.top.withdraw()
+        self.top.overrideredirect(True)
+        self.top.attributes("-topmost", True)
+
+        frame = tk.Frame(self.top, bg=self.BG_COLOR, bd=1, relief="solid")
+        frame.pack(fill="both", expand=True)
+        tk.Label(frame, text=self.title, bg=self.BG_COLOR,
+                 font=(self.FONT[0], self.FONT[1], "bold")).pack(anchor="w", padx=10, pady=(8, 2))
+        tk.Label(frame, text="\n".join(lines), bg=self.BG_COLOR, font=self.FONT,
+                 justify="left").pack(anchor="w", padx=10, pady=(0, 8))
+
+        for widget in [frame] + frame.winfo_children():
+            widget.bind("<Button-1>", lambda e: self.close())
+
+        self.top.update_idletasks()
+        w, h = self.top.winfo_reqwidth(), self.top.winfo_reqheight()
+        x = self.parent.winfo_rootx() + self.parent.winfo_width() - w - self.MARGIN
+        y = self.parent.winfo_rooty() + self.parent.winfo_height() - h - self.MARGIN
+        self.top.geometry(f"+{max(0, x)}+{max(0, y)}")
+        self.top.deiconify()
+
+        self._timer = self.parent.after(self.SHOW_MS, self.close)
+
+    def close(self):
+        """Close the notification on screen (if any)"""
+        if self._timer is not None:
+            self.parent.after_cancel(self._timer)
+            self._timer = None
+        if self.top is not None:
+            try:
+                self.top.destroy()
+            except tk.TclError:
+                pass
+            self.top = None
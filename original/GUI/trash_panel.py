@@ -0,0 +1,167 @@
+"""
+Trash preview: trashed items, newest first
+- Rows are loaded a page at a time (keyset paging on idx_items_trash)
+  as the "load more" row scrolls into view
+- Trash / restore / empty events are applied as single-row inserts / removals,
+  one batch per idle cycle
+"""
+from tkinter import ttk
+from Core.add_item_sql import load_trash_page
+from Core.db_worker import run_async
+from Core.dragdrop.ball import entry_label
+
+
+class TrashPanel:
+    """
+    ttk.Treeview view of the trash bin
+    - title_var (optional StringVar) shows "Trash Preview (count)"
+    - on_events(batch): subscriber of DragDropManager.events
+    """
+
+    PAGE_SIZE = 200
+    RELOAD_THRESHOLD = 500   # Event batches larger than this re-read the first page instead
+    TITLE = "Trash Preview"
+    MORE_TEXT = "Load more..."
+    EMPTY_TEXT = "(no trash)"
+
+    def __init__(self, parent, title_var=None):
+        self.tree = ttk.Treeview(parent, columns=("expiry",), show="tree", selectmode="browse")
+        self.tree.column("#0", stretch=True)
+        self.tree.column("expiry", width=90, stretch=False, anchor="center")
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        self.title_var = title_var
+        self._yscroll = None
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+        self.total = 0
+        self._oldest = None      # (deleted_at, item_id) of the last SQL row inserted
+        self._complete = True    # Every trashed row is inserted
+        self._loading = False
+        self._pending = []       # Changes received while a page was loading
+        self._generation = 0     # Bumped by reload / empty, stale pages are dropped
+
+    def grid(self, **kw):
+        self.tree.grid(**kw)
+
+    def set_scrollbar(self, scrollbar):
+        """Connect a vertical scrollbar (yscrollcommand is shared with lazy loading)"""
+        self._yscroll = scrollbar.set
+        scrollbar.config(command=self.tree.yview)
+
+    # ---- loading ----
+
+    def reload(self):
+        """Re-read the first page (startup, import, profile switch, Refresh button)"""
+        self._reset()
+        self._complete = False
+        self._load_page()
+
+    def _reset(self):
+        self._generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self._oldest = None
+        self._complete = True
+        self._loading = False
+        self._pending = []
+
+    def _load_page(self):
+        if self._loading or self._complete:
+            return
+        self._loading = True
+
+        generation = self._generation
+        run_async(
+            load_trash_page, self.PAGE_SIZE, before=self._oldest,
+            on_done=lambda page: self._on_page(generation, page)
+        )
+
+    def _on_page(self, generation, page):
+        if generation != self._generation:
+            return
+        rows, total = page
+        self._loading = False
+
+        if self.tree.exists("more"):
+            self.tree.delete("more")
+        if self._oldest is None:
+            self.total = total
+
+        for item_id, name, expired_day, deleted_at, quantity in rows:
+            self._oldest = (deleted_at, item_id)
+            if not self.tree.exists(f"t{item_id}"):
+                self.tree.insert("", "end", iid=f"t{item_id}", text=entry_label(name, quantity),
+                                 values=(expired_day,))
+
+        if len(rows) < self.PAGE_SIZE:
+            self._complete = True
+        else:
+            self.tree.insert("", "end", iid="more", text=self.MORE_TEXT)
+
+        pending, self._pending = self._pending, []
+        for change in pending:
+            change()
+        self._show_total()
+
+    def _on_select(self, event=None):
+        if "more" in self.tree.selection():
+            self._load_page()
+
+    def _on_scroll(self, first, last):
+        """Load the next page when the "load more" row becomes visible"""
+        if self._yscroll is not None:
+            self._yscroll(first, last)
+        if self.tree.exists("more") and self.tree.bbox("more"):
+            self._load_page()
+
+    def _show_total(self):
+        if self.tree.exists("empty"):
+            self.tree.delete("empty")
+        if self.total == 0 and not self._loading:
+            self.tree.insert("", "end", iid="empty", text=self.EMPTY_TEXT)
+        if self.title_var is not None:
+            self.title_var.set(f"{self.TITLE} ({self.total})")
+
+    # ---- scene events (DragDropManager.events) ----
+
+    EVENT_KINDS = ("item_trashed", "item_added", "units_trashed", "units_returned",
+                   "trash_emptied", "db_reloaded")
+
+    def on_events(self, events):
+        """One batch per idle cycle: row inserts / removals, one title update"""
+        if len(events) > self.RELOAD_THRESHOLD or any(e.KIND == "db_reloaded" for e in events):
+            self.reload()
+            return
+
+        trashed = []
+        restored = []
+        for e in events:
+            if e.KIND == "item_trashed":
+                trashed.append((e.item_id, e.item_name, e.expired_day, e.quantity))
+            elif e.KIND == "units_trashed":
+                trashed.append((e.trash_id, e.item_name, e.expired_day, e.quantity))
+            elif e.KIND == "item_added" and e.restored:
+                restored.append(e.item_id)
+            elif e.KIND == "units_returned":
+                restored.append(e.trash_id)
+            elif e.KIND == "trash_emptied":
+                self._reset()
+                self.total = 0
+                trashed, restored = [], []
+
+        self.total = max(0, self.total + len(trashed) - len(restored))
+        if self._loading:
+            self._pending.append(lambda: self._apply(trashed, restored))
+        else:
+            self._apply(trashed, restored)
+        self._show_total()
+
+    def _apply(self, trashed, restored):
+        for item_id, name, expired_day, quantity in trashed:
+            if not self.tree.exists(f"t{item_id}"):
+                self.tree.insert("", 0, iid=f"t{item_id}", text=entry_label(name, quantity),
+                                 values=(expired_day,))
+
+        iids = [f"t{i}" for i in restored if self.tree.exists(f"t{i}")]
+        if iids:
+            self.tree.delete(*iids)
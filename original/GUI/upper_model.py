@@ -5,6 +5,8 @@ import tkinter as tk
 from tkinter import ttk
 from Core.dragdrop.manager import DragDropManager
 from Core.dragdrop.trash_bin import TrashBin
+from Core.search import search_items, name_matches
+from Core.db_worker import run_async
 from .bar_name_dialog import bar_name_dialog
 
 
@@ -15,8 +17,12 @@ class UpperModule:
     - Canvas (left birth area + right multiple timelines)
     - Add new bar button
     - Trash bin
+    - Search box
     """
 
+    SEARCH_DELAY_MS = 150   # Debounce delay for search-as-you-type
+    SEARCH_LIMIT = 500      # Max hits highlighted
+
 
     def __init__(self, parent):
         self.parent = parent
@@ -46,6 +52,17 @@ class UpperModule:
         add_btn = ttk.Button(top_bar, text="Add Bar", command=self._add_bar)
         add_btn.grid(row=0, column=0, padx=5)
 
+        # Search box (search as you type, debounced)
+        ttk.Label(top_bar, text="Search:").grid(row=0, column=1, padx=(20, 3))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(top_bar, textvariable=self.search_var, width=25)
+        search_entry.grid(row=0, column=2, padx=3)
+        self.search_info = ttk.Label(top_bar, text="")
+        self.search_info.grid(row=0, column=3, padx=5)
+
+        self._search_job = None
+        self.search_var.trace_add("write", self._on_search_changed)
+
 
     def _add_bar(self):
         """
@@ -58,6 +75,48 @@ class UpperModule:
         self.manager.redraw_timelines()
 
 
+    def _on_search_changed(self, *args):
+        """
+        Debounce: only search once typing pauses
+        """
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(self.SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        """
+        Query the search index, highlight hits and scroll to the first one
+        """
+        self._search_job = None
+        text = self.search_var.get()
+
+        if not text.strip():
+            self.manager.clear_highlight()
+            self.search_info.configure(text="")
+            return
+
+        run_async(
+            search_items, text, limit=self.SEARCH_LIMIT,
+            on_done=lambda rows: self._show_search(text, rows)
+        )
+
+    def _show_search(self, text, rows):
+        """
+        Apply search hits from the DB worker (Tk thread)
+        """
+        if text != self.search_var.get():
+            return  # Stale result, user kept typing
+
+        bar_names = {bar.bar_name for bar in self.manager.bars if name_matches(text, bar.bar_name)}
+
+        first = self.manager.highlight_items([r[0] for r in rows], bar_names)
+        if first is not None:
+            self.manager.scroll_to_ball(first)
+
+        count = f"{len(rows)}+" if len(rows) >= self.SEARCH_LIMIT else str(len(rows))
+        self.search_info.configure(text=f"{count} found")
+
+
     def _create_canvas_area(self):
         """
         Main creation logic of upper canvas area
@@ -74,14 +133,16 @@ class UpperModule:
         self.canvas.grid(row=0, column=0, sticky="nsew")
 
         # Scrollbar
-        scroll_y = ttk.Scrollbar(container, orient="vertical", command=self.canvas.yview)
+        scroll_y = ttk.Scrollbar(container, orient="vertical")
         scroll_y.grid(row=0, column=1, sticky="ns")
-        self.canvas.configure(yscrollcommand=scroll_y.set)
 
         # Correctly create Manager (must pass parent and canvas)
         from Core.dragdrop.manager import DragDropManager
         self.manager = DragDropManager(self.frame, self.canvas)
 
+        # Scrolling draws / drops ball graphics (only balls near the viewport are drawn)
+        self.manager.set_scrollbar(scroll_y)
+
         # Create trash bin and attach to manager
         from Core.dragdrop.trash_bin import TrashBin
         self.trash_bin = TrashBin(self.frame, self.manager)
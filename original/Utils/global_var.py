@@ -21,20 +21,49 @@ def get_user_data_dir() -> str:
     返回用户数据目录，例如：
     C:\\Users\\xxx\\AppData\\Roaming\\project_3
     """
-    base = os.environ.get("APPDATA")
+    # 非 Windows（无 APPDATA）时退回到用户主目录
+    base = os.environ.get("APPDATA") or os.path.expanduser("~")
     data_dir = os.path.join(base, APP_NAME)
     os.makedirs(data_dir, exist_ok=True)
     return data_dir
 
-def ensure_writable_db() -> str:
+DEFAULT_PROFILE = "default"  # 默认库存，对应原来的 test.db
+
+
+def profile_db_path(profile: str) -> str:
+    """
+    返回某个库存（profile）对应的数据库路径：
+    - 默认 profile：用户目录下的 test.db（兼容旧版本）
+    - 其他 profile：用户目录下 profiles/<name>.db
+    """
+    if profile == DEFAULT_PROFILE:
+        return os.path.join(get_user_data_dir(), "test.db")
+    profile_dir = os.path.join(get_user_data_dir(), "profiles")
+    os.makedirs(profile_dir, exist_ok=True)
+    return os.path.join(profile_dir, f"{profile}.db")
+
+
+def list_profile_names() -> list:
+    """
+    列出已存在的 profile（默认 profile 永远在第一个）
+    """
+    profile_dir = os.path.join(get_user_data_dir(), "profiles")
+    names = []
+    if os.path.isdir(profile_dir):
+        names = sorted(f[:-3] for f in os.listdir(profile_dir) if f.endswith(".db"))
+    return [DEFAULT_PROFILE] + [n for n in names if n != DEFAULT_PROFILE]
+
+
+def ensure_writable_db(profile: str = DEFAULT_PROFILE) -> str:
     """
     确保存在一个【可写】数据库：
     - 第一次运行：从打包资源复制 Utils/test.db
     - 之后运行：一直使用用户目录里的数据库
+    - 新 profile：空数据库，由 setup_database 建表
     """
-    user_db = os.path.join(get_user_data_dir(), "test.db")
+    user_db = profile_db_path(profile)
 
-    if not os.path.exists(user_db):
+    if profile == DEFAULT_PROFILE and not os.path.exists(user_db):
         bundled_db = resource_path(os.path.join("Utils", "test.db"))
         shutil.copyfile(bundled_db, user_db)
 
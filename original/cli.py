@@ -0,0 +1,362 @@
+"""
+Command-line interface (no Tk / PIL): scripting, cron jobs and shell pipelines
+Works on the same database as the app (the app shows changes on its next reload / start)
+
+    python cli.py add "Yogurt" 2026-11-02 --bar Fridge --quantity 12
+    python cli.py bulk-add < items.tsv          (name<TAB>expiry[<TAB>bar[<TAB>quantity]] or JSON lines)
+    python cli.py list --within 7               (JSON lines, one item per line)
+    python cli.py stats
+    python cli.py move 12 15 --bar Freezer      ("-" reads ids from stdin)
+    python cli.py trash 12 15
+    python cli.py empty-trash
+    python cli.py export backup.db              (.db: SQLite backup, .jsonl / -: JSON lines)
+    python cli.py import backup.db
+    python cli.py serve --port 8765             (HTTP/JSON API, see Core/api_server.py)
+    python cli.py archive-stats exports/ --since 2026-01   (monthly counts over many .db files)
+
+Output is JSON; errors go to stderr as {"error": ...} with exit status 1
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from Core import add_item_sql
+from Core.add_item_sql import (
+    day_ordinal, insert_products_many, stock_item, update_items_bar,
+    trash_items, empty_trash, load_trash_page
+)
+from Core.sql_stats import ALL_BARS, inventory_summary, items_expiring_between
+from Core.backup import backup_to, restore_from
+from Core.api_server import serve
+from Core.archive_stats import KINDS, find_archives, aggregate_archives
+
+# Rows per transaction for bulk input
+BATCH_SIZE = 1000
+
+# Rows per SQL page when listing
+PAGE_SIZE = 1000
+
+
+class CliError(Exception):
+    """Bad input: reported as {"error": ...}"""
+
+
+def _emit(value):
+    sys.stdout.write(json.dumps(value, ensure_ascii=False) + "\n")
+
+
+def _item(row):
+    item_id, name, expired_day, bar_name, remaining, quantity = row
+    return {
+        "item_id": item_id,
+        "item_name": name,
+        "expired_day": expired_day,
+        "bar_name": bar_name,
+        "quantity": quantity,
+        "remaining_days": remaining,
+    }
+
+
+def _check_date(expired_day):
+    if day_ordinal(expired_day) is None:
+        raise CliError(f"invalid date {expired_day!r} (expected YYYY-MM-DD)")
+    return expired_day
+
+
+def _check_quantity(quantity):
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        raise CliError(f"invalid quantity {quantity!r} (expected a whole number of at least 1)")
+    return quantity
+
+
+def _parse_line(line):
+    """
+    One bulk input line → (item_name, expired_day, bar_name, quantity)
+    JSON object ({"item_name", "expired_day", "bar_name", "quantity"})
+    or name<TAB>expiry[<TAB>bar[<TAB>quantity]]
+    """
+    if line.startswith("{"):
+        obj = json.loads(line)
+        name = obj.get("item_name", obj.get("name"))
+        expired_day = obj.get("expired_day", obj.get("expiry"))
+        bar_name = obj.get("bar_name", obj.get("bar"))
+        quantity = obj.get("quantity", 1)
+    else:
+        fields = line.split("\t")
+        if len(fields) < 2:
+            raise CliError(f"expected name<TAB>expiry[<TAB>bar[<TAB>quantity]]: {line!r}")
+        name, expired_day = fields[0], fields[1]
+        bar_name = fields[2] if len(fields) > 2 and fields[2] else None
+        quantity = int(fields[3]) if len(fields) > 3 and fields[3] else 1
+
+    if not name:
+        raise CliError(f"missing item name: {line!r}")
+    return name, _check_date(expired_day), bar_name or None, _check_quantity(quantity)
+
+
+def _read_ids(values):
+    """Item ids from the command line; "-" reads whitespace-separated ids from stdin"""
+    ids = []
+    for value in values:
+        tokens = sys.stdin.read().split() if value == "-" else [value]
+        try:
+            ids += [int(t) for t in tokens]
+        except ValueError:
+            raise CliError(f"item ids must be integers: {tokens}")
+    return ids
+
+
+def _bulk_add(lines, batch_size):
+    """
+    Insert parsed lines, one transaction per batch_size rows
+    (identical name / date / timeline lines become one entry with their units summed)
+    """
+    added = units = 0
+    entries = set()
+    batch = []
+
+    def flush():
+        nonlocal added, units
+        entries.update(insert_products_many(batch))
+        added += len(batch)
+        units += sum(row[3] for row in batch)
+        batch.clear()
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            batch.append(_parse_line(line))
+        except (CliError, ValueError) as e:
+            raise CliError(f"line {number}: {e}")
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    return {"added": added, "units": units, "entries": len(entries)}
+
+
+def _live_items(bar_name=ALL_BARS, start_day=None, end_day=None, limit=None):
+    """Live items ordered by expiry, read a page at a time (keyset paging)"""
+    after = None
+    left = limit
+    while left is None or left > 0:
+        size = PAGE_SIZE if left is None else min(PAGE_SIZE, left)
+        rows = items_expiring_between(start_day, end_day, bar_name, limit=size, after=after)
+        for row in rows:
+            yield row
+        if len(rows) < size:
+            return
+        after = (day_ordinal(row[2]), row[0])
+        if left is not None:
+            left -= len(rows)
+
+
+# ---- commands ----
+
+def cmd_add(args):
+    bar_name = args.bar or None
+    item_id, quantity, created = stock_item(
+        args.name, _check_date(args.expiry), _check_quantity(args.quantity), bar_name
+    )
+    _emit({"item_id": item_id, "item_name": args.name, "expired_day": args.expiry,
+           "bar_name": bar_name, "quantity": quantity, "created": created})
+
+
+def cmd_bulk_add(args):
+    _emit(_bulk_add(sys.stdin, args.batch))
+
+
+def cmd_list(args):
+    if args.trash:
+        before = None
+        while True:
+            rows, _ = load_trash_page(PAGE_SIZE, before=before)
+            for item_id, name, expired_day, deleted_at, quantity in rows:
+                _emit({"item_id": item_id, "item_name": name, "expired_day": expired_day,
+                       "quantity": quantity, "deleted_at": deleted_at})
+            if len(rows) < PAGE_SIZE:
+                return
+            before = (rows[-1][3], rows[-1][0])
+
+    bar_name = None if args.left else (args.bar if args.bar is not None else ALL_BARS)
+    end_day = -1 if args.expired else args.within
+    for row in _live_items(bar_name, None, end_day, args.limit):
+        _emit(_item(row))
+
+
+def cmd_stats(args):
+    _emit(inventory_summary())
+
+
+def cmd_move(args):
+    ids = _read_ids(args.ids)
+    bar_name = None if args.left else args.bar
+    moved = update_items_bar(ids, bar_name)
+    _emit({
+        "moved": len(moved),
+        "bar_name": bar_name,
+        "folded": [[r["item_id"], r["into"]] for r in moved if r["into"] is not None]
+    })
+
+
+def cmd_trash(args):
+    _emit({"trashed": trash_items(_read_ids(args.ids))})
+
+
+def cmd_empty_trash(args):
+    _emit({"deleted": empty_trash()})
+
+
+def cmd_export(args):
+    if args.path == "-" or args.path.endswith(".jsonl"):
+        out = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8")
+        count = 0
+        try:
+            for row in _live_items():
+                item = _item(row)
+                del item["remaining_days"]
+                out.write(json.dumps(item, ensure_ascii=False) + "\n")
+                count += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if out is not sys.stdout:
+            _emit({"exported": count, "path": args.path})
+        return
+
+    backup_to(args.path)
+    _emit({"exported": args.path})
+
+
+def cmd_import(args):
+    if args.path == "-" or args.path.endswith(".jsonl"):
+        if args.path == "-":
+            _emit(_bulk_add(sys.stdin, args.batch))
+        else:
+            with open(args.path, encoding="utf-8") as f:
+                _emit(_bulk_add(f, args.batch))
+        return
+
+    restore_from(args.path)
+    _emit({"imported": args.path})
+
+
+def cmd_serve(args):
+    serve(args.host, args.port, args.readers)
+
+
+def cmd_archive_stats(args):
+    if not os.path.isdir(args.directory):
+        raise CliError(f"not a directory: {args.directory}")
+    summary = aggregate_archives(
+        find_archives(args.directory),
+        merge="sum" if args.sum else "max",
+        since=args.since, until=args.until, workers=args.workers
+    )
+    if args.kind:
+        summary["months"] = {m: counts[args.kind] for m, counts in summary["months"].items()}
+        summary["rows"] = [r for r in summary["rows"] if r["kind"] == args.kind]
+    _emit(summary)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Food Management System (headless)")
+    parser.add_argument("--profile", help="inventory profile (default: the app's default profile)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("add", help="add one item")
+    p.add_argument("name")
+    p.add_argument("expiry", help="YYYY-MM-DD")
+    p.add_argument("--bar", help="timeline (default: left area)")
+    p.add_argument("--quantity", type=int, default=1, help="units (joins an identical entry if there is one)")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("bulk-add", help="add items from stdin")
+    p.add_argument("--batch", type=int, default=BATCH_SIZE, help="rows per transaction")
+    p.set_defaults(func=cmd_bulk_add)
+
+    p = sub.add_parser("list", help="list items ordered by expiry (JSON lines)")
+    where = p.add_mutually_exclusive_group()
+    where.add_argument("--bar", help="only this timeline")
+    where.add_argument("--left", action="store_true", help="only the left area")
+    when = p.add_mutually_exclusive_group()
+    when.add_argument("--within", type=int, metavar="DAYS", help="expiring within DAYS days (expired included)")
+    when.add_argument("--expired", action="store_true", help="only expired items")
+    when.add_argument("--trash", action="store_true", help="trashed items, newest first")
+    p.add_argument("--limit", type=int)
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("stats", help="item counts per expiry bucket and timeline")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("move", help="move items to a timeline or the left area")
+    p.add_argument("ids", nargs="+", help='item ids ("-" reads them from stdin)')
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--bar")
+    target.add_argument("--left", action="store_true")
+    p.set_defaults(func=cmd_move)
+
+    p = sub.add_parser("trash", help="move items to the trash")
+    p.add_argument("ids", nargs="+", help='item ids ("-" reads them from stdin)')
+    p.set_defaults(func=cmd_trash)
+
+    p = sub.add_parser("empty-trash", help="permanently delete trashed items")
+    p.set_defaults(func=cmd_empty_trash)
+
+    p = sub.add_parser("export", help="export the database (.db) or live items (.jsonl / -)")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", help="replace the database (.db) or add items (.jsonl / -)")
+    p.add_argument("path")
+    p.add_argument("--batch", type=int, default=BATCH_SIZE, help="rows per transaction (.jsonl)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("archive-stats", help="monthly item history over a directory of exported .db files")
+    p.add_argument("directory")
+    p.add_argument("--since", metavar="YYYY-MM", help="first month")
+    p.add_argument("--until", metavar="YYYY-MM", help="last month")
+    p.add_argument("--kind", choices=KINDS, help="only this event kind")
+    p.add_argument("--sum", action="store_true",
+                   help="files are different inventories (default: snapshots of one inventory)")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    p.set_defaults(func=cmd_archive_stats)
+
+    p = sub.add_parser("serve", help="serve the inventory as an HTTP/JSON API")
+    p.add_argument("--host", default="127.0.0.1", help="0.0.0.0 to share it on the LAN (no authentication)")
+    p.add_argument("--port", type=int, default=8765, help="0 picks a free port")
+    p.add_argument("--readers", type=int, default=4, help="read connections")
+    p.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.profile:
+        add_item_sql.set_active_profile(args.profile)
+    else:
+        add_item_sql.setup_database()
+
+    # One connection for the whole run (every helper reuses it)
+    conn = add_item_sql.open_connection()
+    add_item_sql.bind_thread_connection(conn)
+    try:
+        # Catch up on expiry events first, so history, stats, exports and backups see them
+        add_item_sql.log_expired_items()
+        args.func(args)
+    except (CliError, ValueError, OSError, sqlite3.Error) as e:
+        sys.stderr.write(json.dumps({"error": str(e)}) + "\n")
+        return 1
+    finally:
+        add_item_sql.bind_thread_connection(None)
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
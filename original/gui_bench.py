@@ -0,0 +1,376 @@
+"""
+GUI frame-time benchmark: canvas handlers under scripted resize / drag input
+Needs a display; on a server or CI run it under a virtual X server:
+
+    xvfb-run -a -s "-screen 0 1920x1080x24" python gui_bench.py -o bench.json
+    python gui_bench.py --bars 5,30 --balls 1000,20000 --repeat 50 --size 1600x900
+
+Each scene (N timelines, M items) is built in a throwaway database and shown by the
+real window (StorageTracker → UpperModule / DragDropManager / LowerModule), then
+driven with event_generate:
+- configure: <Configure> on the canvas at its current size (resize handlers only)
+- resize: the window is resized between two sizes (what the window manager does)
+- redraw: DragDropManager.redraw_timelines called directly
+- drag: press on a left-area ball, <B1-Motion> steps to a visible timeline, release
+  (snaps onto the timeline), then undo; press / motion / release are timed apart
+
+Per step (milliseconds):
+- dispatch: event_generate → return, i.e. the bound handlers
+- idle: update_idletasks() afterwards (canvas redisplay, geometry, after_idle jobs)
+- events: update() afterwards (Expose / Configure events the step caused)
+- frame: the three together
+Per handler: every call of the instrumented methods below, nested calls included
+
+Output is one JSON document (-o file, default stdout) for regression tracking;
+errors go to stderr as {"error": ...} with exit status 1
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tkinter as tk
+from datetime import date, datetime, timedelta
+from Core import add_item_sql
+from Core.dragdrop.ball import DraggableBall
+from Core.dragdrop.manager import DragDropManager
+from Core.dragdrop.trash_bin import TrashBin
+from GUI.lower_module import LowerModule
+from GUI.main_window import StorageTracker
+from GUI.upper_model import UpperModule
+
+# Methods timed on every call
+HANDLERS = (
+    (DragDropManager, "redraw_timelines"),
+    (DragDropManager, "_on_ball_press"),
+    (DragDropManager, "_on_ball_drag"),
+    (DragDropManager, "_on_ball_release"),
+    (DragDropManager, "try_snap_to_bar"),
+    (DraggableBall, "on_drag"),
+    (UpperModule, "_on_canvas_resize"),
+    (LowerModule, "_on_resize"),
+    (TrashBin, "_on_resize"),
+)
+
+# event.state bit of mouse button 1 (Tk Button1Mask)
+BUTTON1_MASK = 0x100
+
+# Rows per transaction when seeding a scene
+SEED_BATCH = 1000
+
+# Time given to after() jobs scheduled at start-up (trash bin resize, first page loads)
+SETTLE_SECONDS = 0.5
+
+
+class BenchError(Exception):
+    """Bad arguments or unusable scene: reported as {"error": ...}"""
+
+
+def _summary(values):
+    """count / avg / p50 / p95 / max of millisecond samples (same shape as DBWorker.metrics)"""
+    if not values:
+        return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+class HandlerTimer:
+    """
+    Wraps the HANDLERS methods on their classes while active
+    (before the window is built, so Tk bindings pick up the wrappers)
+    """
+
+    def __init__(self, handlers=HANDLERS):
+        self.handlers = handlers
+        self.samples = {}
+        self._originals = []
+
+    def __enter__(self):
+        for cls, name in self.handlers:
+            original = cls.__dict__[name]
+            self._originals.append((cls, name, original))
+            setattr(cls, name, self._timed(f"{cls.__name__}.{name}", original))
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+
+    def _timed(self, key, fn):
+        samples = self.samples.setdefault(key, [])
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                samples.append((time.perf_counter() - start) * 1000)
+        return timed
+
+    def reset(self):
+        for samples in self.samples.values():
+            samples.clear()
+
+    def report(self):
+        return {key: _summary(samples) for key, samples in sorted(self.samples.items()) if samples}
+
+
+class StepTimer:
+    """Frame time of scripted steps, split into dispatch / idle / events"""
+
+    def __init__(self, root):
+        self.root = root
+        self.steps = {}
+
+    def run(self, kind, fire):
+        """Run fire() (one generated event or call), then drain the Tk queues"""
+        start = time.perf_counter()
+        fire()
+        fired = time.perf_counter()
+        self.root.update_idletasks()
+        idle = time.perf_counter()
+        self.root.update()
+        done = time.perf_counter()
+
+        step = self.steps.setdefault(kind, {"dispatch": [], "idle": [], "events": [], "frame": []})
+        step["dispatch"].append((fired - start) * 1000)
+        step["idle"].append((idle - fired) * 1000)
+        step["events"].append((done - idle) * 1000)
+        step["frame"].append((done - start) * 1000)
+
+    def report(self):
+        return {
+            kind: {f"{part}_ms": _summary(values) for part, values in parts.items()}
+            for kind, parts in self.steps.items()
+        }
+
+
+def _parse_counts(text):
+    try:
+        counts = [int(v) for v in text.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated numbers: {text!r}")
+    if not counts or min(counts) < 0:
+        raise argparse.ArgumentTypeError(f"expected comma-separated numbers: {text!r}")
+    return counts
+
+
+def _parse_size(text):
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT: {text!r}")
+    return width, height
+
+
+def seed_scene(db_path, bars, balls, left_share):
+    """
+    Fill a new database with balls items: a left_share of them in the left area,
+    the rest spread over bars timelines, expiry dates over the next 90 days
+    """
+    add_item_sql.setup_database(db_path)
+    add_item_sql.DB_PATH = db_path   # Every helper and the DB worker follow it
+
+    left = balls if bars == 0 else round(balls * left_share)
+    today = date.today()
+    rows = []
+    for i in range(balls):
+        bar_name = None if i < left else f"Timeline {(i - left) % bars + 1}"
+        rows.append((f"Item {i}", (today + timedelta(days=i * 7 % 90)).isoformat(), bar_name))
+
+    for start in range(0, len(rows), SEED_BATCH):
+        add_item_sql.insert_products_many(rows[start:start + SEED_BATCH])
+
+
+def _settle(root, seconds=SETTLE_SECONDS):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        root.update()
+        time.sleep(0.01)
+
+
+def _window_xy(canvas, x, y):
+    """Canvas coordinates → widget coordinates (the canvas may be scrolled)"""
+    return int(x - canvas.canvasx(0)), int(y - canvas.canvasy(0))
+
+
+def _visible_bars(manager):
+    canvas = manager.canvas
+    top, height = canvas.canvasy(0), canvas.winfo_height()
+    return [bar for bar in manager.bars if top + 20 <= bar.y <= top + height - 20]
+
+
+def _drag_candidates(manager):
+    """Drawn, movable balls of the left area inside the viewport"""
+    canvas = manager.canvas
+    top, height = canvas.canvasy(0), canvas.winfo_height()
+    return [
+        ball for ball in manager.items
+        if ball.ball_id is not None and not ball.read_only and ball.current_bar is None
+        and top + ball.RADIUS <= ball.y <= top + height - ball.RADIUS
+    ]
+
+
+def bench_configure(root, canvas, steps, repeat):
+    width, height = canvas.winfo_width(), canvas.winfo_height()
+    for _ in range(repeat):
+        steps.run("configure", lambda: canvas.event_generate("<Configure>", width=width, height=height))
+
+
+def bench_resize(root, steps, repeat, size):
+    width, height = size
+    sizes = ((width, height), (int(width * 0.8), int(height * 0.85)))
+    for i in range(repeat):
+        w, h = sizes[(i + 1) % 2]
+        steps.run("resize", lambda: root.geometry(f"{w}x{h}"))
+    root.geometry(f"{width}x{height}")
+    root.update()
+
+
+def bench_redraw(steps, manager, repeat):
+    for _ in range(repeat):
+        steps.run("redraw", manager.redraw_timelines)
+
+
+def bench_drag(root, steps, manager, repeat, motion_steps):
+    """
+    Drag left-area balls onto timelines, one journal undo after each drop
+    :return: number of drags done (0 when no ball / timeline is in view)
+    """
+    canvas = manager.canvas
+    done = 0
+    for i in range(repeat):
+        balls, bars = _drag_candidates(manager), _visible_bars(manager)
+        if not balls or not bars:
+            break
+        ball, bar = balls[i % len(balls)], bars[i % len(bars)]
+
+        x0, y0 = _window_xy(canvas, ball.x, ball.y)
+        x1, y1 = _window_xy(canvas, manager.LEFT_AREA_WIDTH + (canvas.winfo_width() - manager.LEFT_AREA_WIDTH) // 2, bar.y)
+
+        # Pointer onto the ball first, so the canvas "current" item is set
+        canvas.event_generate("<Motion>", x=x0, y=y0)
+        root.update()
+
+        steps.run("press", lambda: canvas.event_generate("<ButtonPress-1>", x=x0, y=y0))
+        for n in range(1, motion_steps + 1):
+            x = x0 + (x1 - x0) * n // motion_steps
+            y = y0 + (y1 - y0) * n // motion_steps
+            steps.run("motion", lambda: canvas.event_generate("<Motion>", x=x, y=y, state=BUTTON1_MASK))
+        steps.run("release", lambda: canvas.event_generate("<ButtonRelease-1>", x=x1, y=y1, state=BUTTON1_MASK))
+
+        if ball.current_bar is bar:
+            done += 1
+            manager.journal.undo()
+        root.update()
+    return done
+
+
+def run_scene(workdir, bars, balls, args):
+    """Build one scene, script it, tear it down → result dict"""
+    db_path = os.path.join(workdir, f"bench_{bars}x{balls}.db")
+    seed_scene(db_path, bars, balls, args.left_share)
+
+    with HandlerTimer() as handlers:
+        started = time.perf_counter()
+        app = StorageTracker()
+        root = app.root
+        root.geometry("{}x{}+0+0".format(*args.size))
+        root.update()
+        build_ms = (time.perf_counter() - started) * 1000
+        _settle(root)
+
+        try:
+            manager = app.upper_model.manager
+            canvas = app.upper_model.canvas
+            handlers.reset()
+            steps = StepTimer(root)
+
+            bench_configure(root, canvas, steps, args.repeat)
+            bench_resize(root, steps, args.repeat, args.size)
+            bench_redraw(steps, manager, args.repeat)
+            drags = bench_drag(root, steps, manager, args.repeat, args.steps)
+
+            result = {
+                "bars": bars,
+                "balls": balls,
+                "left_area": len(manager.items),
+                "drawn": len(manager.shown),
+                "canvas": [canvas.winfo_width(), canvas.winfo_height()],
+                "build_ms": round(build_ms, 3),
+                "drags": drags,
+                "steps": steps.report(),
+                "handlers": handlers.report(),
+            }
+        finally:
+            app.close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--bars", type=_parse_counts, default=[5, 20],
+                        help="timeline counts, comma-separated (default 5,20)")
+    parser.add_argument("--balls", type=_parse_counts, default=[1000, 10000],
+                        help="item counts, comma-separated (default 1000,10000)")
+    parser.add_argument("--left-share", type=float, default=0.5,
+                        help="share of the items in the left area (default 0.5)")
+    parser.add_argument("--repeat", type=int, default=20, help="repetitions per step kind (default 20)")
+    parser.add_argument("--steps", type=int, default=20, help="motion events per drag (default 20)")
+    parser.add_argument("--size", type=_parse_size, default=(1280, 800),
+                        help="window size WIDTHxHEIGHT (default 1280x800)")
+    parser.add_argument("-o", "--output", default="-", help="JSON result file (default stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        if not 0.0 <= args.left_share <= 1.0:
+            raise BenchError("--left-share must be between 0 and 1")
+        if args.repeat < 1 or args.steps < 1:
+            raise BenchError("--repeat and --steps must be at least 1")
+
+        scenes = []
+        db_path = add_item_sql.DB_PATH
+        try:
+            with tempfile.TemporaryDirectory(prefix="gui_bench_") as workdir:
+                for bars in args.bars:
+                    for balls in args.balls:
+                        scenes.append(run_scene(workdir, bars, balls, args))
+        finally:
+            add_item_sql.DB_PATH = db_path
+
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "tk": tk.Tcl().call("info", "patchlevel"),
+            "platform": platform.platform(),
+            "display": os.environ.get("DISPLAY"),
+            "size": list(args.size),
+            "repeat": args.repeat,
+            "scenes": scenes,
+        }
+    except (BenchError, tk.TclError, OSError) as e:
+        sys.stderr.write(json.dumps({"error": str(e)}) + "\n")
+        return 1
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        sys.stdout.write(text + "\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,12 +19,12 @@ class Main:
         Return：
             None No return
         """
+        # Generate SQLite (before the UI loads items from it)
+        add_item_sql.setup_database()
+
         # Correct instantiation StorageTracker
         self.app = StorageTracker()
 
-        # Generate SQLite
-        add_item_sql.setup_database()
-
     def Main_run(self):
         """
         The main operating programme runs here.
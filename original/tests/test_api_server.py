@@ -0,0 +1,163 @@
+"""
+HTTP API end to end: a real ApiServer on a free port over a throwaway profile
+- The database lives in a temporary APPDATA, set before Core is imported
+- Run from this folder's parent: python -m unittest discover -s tests
+"""
+import http.client
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import date, timedelta
+
+_APPDATA = tempfile.mkdtemp()
+os.environ["APPDATA"] = _APPDATA
+os.environ["HOME"] = _APPDATA
+
+from Core import add_item_sql
+from Core.api_server import ApiServer
+
+
+def _day(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+class ApiServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        add_item_sql.set_active_profile("apitest")
+        cls.server = ApiServer("127.0.0.1", 0, readers=2)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.port = cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.close()
+        cls.thread.join(timeout=5)
+        shutil.rmtree(_APPDATA, ignore_errors=True)
+
+    def setUp(self):
+        add_item_sql.clear_all_items()
+
+    def request(self, method, path, body=None, headers=None):
+        """(status, headers, decoded JSON body or None)"""
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+        try:
+            headers = dict(headers or {})
+            data = None
+            if body is not None:
+                data = json.dumps(body)
+                headers["Content-Type"] = "application/json"
+            conn.request(method, path, data, headers)
+            response = conn.getresponse()
+            raw = response.read()
+            return response.status, dict(response.getheaders()), json.loads(raw) if raw else None
+        finally:
+            conn.close()
+
+    def test_post_returns_ids(self):
+        items = [{"item_name": "Yogurt", "expired_day": _day(10), "bar_name": "Fridge"},
+                 {"item_name": "Milk", "expired_day": _day(3)}]
+        status, _, body = self.request("POST", "/items", items)
+        self.assertEqual(status, 201)
+        self.assertEqual(len(body["item_ids"]), 2)
+
+        status, _, row = self.request("GET", f"/items/{body['item_ids'][0]}")
+        self.assertEqual(status, 200)
+        self.assertEqual((row["item_name"], row["bar_name"]), ("Yogurt", "Fridge"))
+
+    def test_post_rejects_bad_day(self):
+        status, _, _ = self.request("POST", "/items", {"item_name": "Milk", "expired_day": "tomorrow"})
+        self.assertEqual(status, 400)
+
+    def test_post_folds_identical_items(self):
+        item = {"item_name": "Yogurt", "expired_day": _day(10), "bar_name": "Fridge"}
+        status, _, body = self.request("POST", "/items", [item, item, dict(item, quantity=3)])
+        self.assertEqual(status, 201)
+        self.assertEqual(len(set(body["item_ids"])), 1)
+
+        status, _, again = self.request("POST", "/items", item)
+        self.assertEqual(status, 201)
+        self.assertEqual(again["item_id"], body["item_ids"][0])
+
+        status, _, row = self.request("GET", f"/items/{again['item_id']}")
+        self.assertEqual(status, 200)
+        self.assertEqual(row["quantity"], 6)
+
+    def test_post_rejects_bool_quantity(self):
+        status, _, _ = self.request("POST", "/items",
+                                    {"item_name": "Milk", "expired_day": _day(3), "quantity": True})
+        self.assertEqual(status, 400)
+
+    def test_items_pages_follow_cursor(self):
+        items = [{"item_name": f"item{i}", "expired_day": _day(i % 20 - 5)} for i in range(25)]
+        status, _, body = self.request("POST", "/items", items)
+        self.assertEqual(status, 201)
+
+        seen = []
+        path = "/items?limit=10"
+        pages = 0
+        while path:
+            status, _, page = self.request("GET", path)
+            self.assertEqual(status, 200)
+            self.assertLessEqual(len(page["items"]), 10)
+            seen += [item["item_id"] for item in page["items"]]
+            pages += 1
+            path = f"/items?limit=10&cursor={page['next']}" if page["next"] else None
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(seen), sorted(body["item_ids"]))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_trash_pages_follow_cursor(self):
+        items = [{"item_name": f"item{i}", "expired_day": _day(i)} for i in range(7)]
+        _, _, body = self.request("POST", "/items", items)
+        for item_id in body["item_ids"]:
+            self.request("DELETE", f"/items/{item_id}")
+
+        seen = []
+        path = "/trash?limit=3"
+        while path:
+            status, _, page = self.request("GET", path)
+            self.assertEqual(status, 200)
+            self.assertEqual(page["total"], 7)
+            seen += [item["item_id"] for item in page["items"]]
+            path = f"/trash?limit=3&cursor={page['next']}" if page["next"] else None
+
+        self.assertEqual(sorted(seen), sorted(body["item_ids"]))
+
+    def test_unchanged_data_answers_304(self):
+        self.request("POST", "/items", {"item_name": "Cheese", "expired_day": _day(20)})
+        status, headers, _ = self.request("GET", "/stats")
+        self.assertEqual(status, 200)
+        etag = headers["ETag"]
+
+        status, _, body = self.request("GET", "/stats", headers={"If-None-Match": etag})
+        self.assertEqual(status, 304)
+        self.assertIsNone(body)
+
+        self.request("POST", "/items", {"item_name": "Bread", "expired_day": _day(2)})
+        status, headers, _ = self.request("GET", "/stats", headers={"If-None-Match": etag})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], etag)
+
+    def test_restore_live_item_is_404(self):
+        _, _, body = self.request("POST", "/items", {"item_name": "Eggs", "expired_day": _day(5)})
+        item_id = body["item_id"]
+
+        status, _, _ = self.request("POST", f"/trash/{item_id}/restore")
+        self.assertEqual(status, 404)
+
+        self.request("DELETE", f"/items/{item_id}")
+        status, _, row = self.request("POST", f"/trash/{item_id}/restore", {"bar_name": "Fridge"})
+        self.assertEqual(status, 200)
+        self.assertEqual(row["bar_name"], "Fridge")
+
+
+if __name__ == "__main__":
+    unittest.main()